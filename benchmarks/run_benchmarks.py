@@ -0,0 +1,211 @@
+# run_benchmarks.py
+#
+# Pruebas de rendimiento de la simulación, el render, la interfaz y el
+# arranque. Escriben un JSON comparable entre ejecuciones y pueden fallar si
+# algo empeora respecto a una referencia guardada.
+#
+#   python benchmarks/run_benchmarks.py --output resultados.json
+#   python benchmarks/run_benchmarks.py --offscreen egl --baseline referencia.json --threshold 0.2
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from animation.offscreen import BACKENDS, select_platform
+
+UPDATE_MOONS = (0, 100, 1000, 10000)  # Lunas por planeta
+RENDER_MOONS = (0, 100, 1000)
+DEFAULT_THRESHOLD = 0.2  # Empeorar más de un 20 % cuenta como regresión
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento del Sistema Solar 3D")
+    parser.add_argument("--output", metavar="RUTA",
+                        help="Guardar los resultados como JSON")
+    parser.add_argument("--baseline", metavar="RUTA",
+                        help="Resultados de referencia con los que comparar")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Empeoramiento relativo admitido antes de fallar (0.2 = 20 %%)")
+    parser.add_argument("--offscreen", choices=BACKENDS,
+                        help="Medir también el render en un contexto OpenGL de software")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Repeticiones de cada medida (se usa la mediana)")
+    parser.add_argument("--only", nargs="+", metavar="PREFIJO",
+                        help="Ejecutar solo las pruebas cuyo nombre empiece así")
+    return parser.parse_args(argv)
+
+
+def measure(function, repeat, seconds=0.2):
+    """
+    Milisegundos por llamada de `function`: mediana de `repeat` tandas. El
+    tamaño de la tanda se ajusta para que cada una dure unos `seconds`.
+    """
+    function()  # Calentamiento (cachés, VBO, compilación de mallas)
+    start = time.perf_counter()
+    function()
+    single = max(time.perf_counter() - start, 1e-7)
+    number = max(1, int(seconds / single))
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - start) / number * 1000.0)
+    return {"ms": statistics.median(samples), "min_ms": min(samples), "calls": number * repeat}
+
+
+def make_system(moons):
+    from models.solar_system import SolarSystem
+    solar_system = SolarSystem()
+    for planet in solar_system.planets:
+        planet.set_number_of_moons(moons)
+    return solar_system
+
+
+def bench_update(args, results):
+    for moons in UPDATE_MOONS:
+        solar_system = make_system(moons)
+        result = measure(solar_system.update, args.repeat)
+        result["bodies"] = solar_system.engine.count
+        result["bodies_per_second"] = result["bodies"] / (result["ms"] / 1000.0)
+        results[f"update/moons={moons}"] = result
+        solar_system.cleanup()
+
+
+def bench_render(args, results):
+    if not args.offscreen:
+        return
+    from OpenGL.GL import glFinish
+    from animation.renderer import Renderer
+    from animation.scene import render_scene
+
+    def frame():
+        render_scene(renderer, 1.0)
+        glFinish()  # Contar el trabajo del renderizador, no solo el envío
+
+    for moons in RENDER_MOONS:
+        solar_system = make_system(moons)
+        solar_system.update()
+        renderer = Renderer(solar_system)
+        result = measure(frame, args.repeat)
+        result["bodies"] = solar_system.engine.count
+        result["drawn"] = renderer.culling_stats["drawn"]
+        results[f"render/moons={moons}"] = result
+        renderer.release()
+        solar_system.cleanup()
+
+
+def bench_hud(args, results):
+    import pygame
+    from ui.control_panel import ControlPanel
+
+    pygame.font.init()
+    screen = pygame.Surface((args.width, args.height))
+    solar_system = make_system(0)
+    panel = ControlPanel(solar_system)
+    # Sin cambios: el panel retenido solo copia la superficie compuesta
+    results["hud/steady"] = measure(lambda: panel.render(screen), args.repeat)
+
+    # Con el tiempo avanzando: los campos dinámicos se vuelven a renderizar
+    def changing():
+        solar_system.update()
+        panel.render(screen)
+    results["hud/changing"] = measure(changing, args.repeat)
+
+
+def bench_startup(args, results):
+    """
+    Tiempo desde lanzar el intérprete hasta terminar el primer fotograma
+    (con --offscreen). Sin contexto OpenGL headless.py no dibuja, así que
+    solo mide hasta crear los modelos y dar un paso ("startup/model_init").
+    """
+    command = [sys.executable, os.path.join(SRC, "headless.py"), "--frames", "1", "--json"]
+    name = "startup/model_init"
+    if args.offscreen:
+        command += ["--offscreen", args.offscreen, "--width", str(args.width), "--height", str(args.height)]
+        name = "startup/first_frame"
+    samples = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    results[name] = {"ms": statistics.median(samples), "min_ms": min(samples), "calls": args.repeat}
+
+
+BENCHMARKS = (("update", bench_update), ("render", bench_render),
+              ("hud", bench_hud), ("startup", bench_startup))
+
+
+def compare(results, baseline, threshold):
+    """Lista de (nombre, referencia, actual, cambio relativo) que empeoran más de `threshold`."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        change = result["ms"] / reference["ms"] - 1.0
+        if change > threshold:
+            regressions.append((name, reference["ms"], result["ms"], change))
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    context = None
+    if args.offscreen:
+        # Debe ocurrir antes de que cualquier módulo importe OpenGL
+        select_platform(args.offscreen)
+        from animation.offscreen import OffscreenContext
+        from animation.scene import init_opengl
+        context = OffscreenContext(args.offscreen, args.width, args.height)
+        init_opengl(args.width, args.height)
+
+    results = {}
+    for name, benchmark in BENCHMARKS:
+        if args.only and not any(name.startswith(prefix) for prefix in args.only):
+            continue
+        benchmark(args, results)
+    if context:
+        context.destroy()
+
+    for name, result in results.items():
+        print(f"{name:<24} {result['ms']:10.3f} ms")
+
+    report = {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "system": platform.system(), "cpus": os.cpu_count(), "offscreen": args.offscreen,
+                 "size": [args.width, args.height], "date": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as reference:
+            baseline = json.load(reference)
+        for key in ("offscreen", "size", "machine"):
+            if baseline["meta"].get(key) != report["meta"][key]:
+                print(f"Aviso: la referencia se midió con otro valor de '{key}': {baseline['meta'].get(key)}")
+        regressions = compare(results, baseline["results"], args.threshold)
+        for name, reference, current, change in regressions:
+            print(f"REGRESIÓN {name}: {reference:.3f} ms -> {current:.3f} ms (+{change:.0%})")
+        if regressions:
+            return 1
+        print(f"Sin regresiones por encima del {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
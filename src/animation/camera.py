@@ -0,0 +1,69 @@
+import numpy as np
+
+
+class CameraState:
+    """
+    Matrices de la cámara de un fotograma (el Renderer las lee de OpenGL
+    una sola vez; este módulo no depende de OpenGL).
+
+    A partir de ellas se obtienen la posición del ojo en coordenadas del
+    mundo, la escala de proyección (para el nivel de detalle) y los seis
+    planos del frustum (para descartar cuerpos fuera de pantalla).
+    """
+    def __init__(self):
+        self.modelview = np.identity(4)
+        self.projection = np.identity(4)
+        self.viewport = np.array([0, 0, 1, 1])
+        self.eye = np.zeros(3)
+        self.pixel_scale = 0.0  # Píxeles por unidad a distancia 1 de la cámara
+        self.planes = np.zeros((6, 4))
+
+    def set_view(self, modelview, projection, viewport):
+        """Fija la vista del fotograma (matrices 4x4 en orden de filas y viewport x, y, ancho, alto)."""
+        self.modelview = np.asarray(modelview, dtype=np.float64).reshape(4, 4)
+        self.projection = np.asarray(projection, dtype=np.float64).reshape(4, 4)
+        self.viewport = np.asarray(viewport)
+        self._derive()
+
+    def _derive(self):
+        rotation = self.modelview[:3, :3]
+        translation = self.modelview[:3, 3]
+        self.eye = -rotation.T @ translation
+        self.pixel_scale = self.viewport[3] * self.projection[1, 1] / 2.0
+
+        # Planos del frustum (Gribb-Hartmann) en coordenadas del mundo:
+        # izquierdo, derecho, inferior, superior, cercano y lejano
+        clip = self.projection @ self.modelview
+        planes = np.array([
+            clip[3] + clip[0], clip[3] - clip[0],
+            clip[3] + clip[1], clip[3] - clip[1],
+            clip[3] + clip[2], clip[3] - clip[2],
+        ])
+        planes /= np.linalg.norm(planes[:, :3], axis=1)[:, None]
+        self.planes = planes
+
+    def ray(self, x, y):
+        """
+        Rayo del mundo que pasa por el píxel (x, y) de la ventana, con el
+        origen arriba a la izquierda como en pygame. Devuelve (origen,
+        dirección unitaria), partiendo del plano cercano.
+        """
+        vx, vy, width, height = self.viewport
+        ndc_x = 2.0 * (x - vx) / width - 1.0
+        ndc_y = 1.0 - 2.0 * (y - vy) / height
+        inverse = np.linalg.inv(self.projection @ self.modelview)
+        points = np.array([[ndc_x, ndc_y, -1.0, 1.0],
+                           [ndc_x, ndc_y, 1.0, 1.0]]) @ inverse.T
+        near, far = points[:, :3] / points[:, 3:]
+        direction = far - near
+        return near, direction / np.linalg.norm(direction)
+
+    def sphere_distances(self, centers, radii):
+        """
+        Distancia con signo de cada esfera al plano más restrictivo.
+        Devuelve (visible, dentro): visible si toca el frustum, dentro si
+        está completamente contenida.
+        """
+        distances = centers @ self.planes[:, :3].T + self.planes[:, 3]
+        nearest = distances.min(axis=-1)
+        return nearest >= -radii, nearest >= radii
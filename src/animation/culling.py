@@ -0,0 +1,210 @@
+import numpy as np
+
+LEAF_SIZE = 8
+REBUILD_INTERVAL = 120  # Reajustes antes de reconstruir la jerarquía
+MORTON_BITS = 10  # Bits por eje del código de Morton (30 en total)
+
+
+def morton_codes(points):
+    """
+    Código de Morton (curva Z) de cada punto dentro de su caja envolvente:
+    intercala los bits de las tres coordenadas cuantizadas.
+    """
+    low = points.min(axis=0)
+    extent = np.maximum(points.max(axis=0) - low, 1e-12)
+    scale = (1 << MORTON_BITS) - 1
+    cells = ((points - low) / extent * scale).astype(np.uint64)
+    codes = np.zeros(len(points), dtype=np.uint64)
+    for axis in range(3):
+        value = cells[:, axis]
+        # Separar los bits dejando dos ceros entre cada uno
+        value = (value | (value << np.uint64(16))) & np.uint64(0x030000FF)
+        value = (value | (value << np.uint64(8))) & np.uint64(0x0300F00F)
+        value = (value | (value << np.uint64(4))) & np.uint64(0x030C30C3)
+        value = (value | (value << np.uint64(2))) & np.uint64(0x09249249)
+        codes |= value << np.uint64(axis)
+    return codes
+
+
+class BoundingSphereBVH:
+    """
+    Jerarquía de esferas envolventes sobre todos los cuerpos del motor.
+
+    Se construye ordenando los cuerpos por su código de Morton y partiendo
+    cada tramo por la mitad, un nivel entero a la vez. Como los cuerpos se
+    mueven poco entre fotogramas, después de cada paso solo se reajustan
+    los radios de los nodos (refit) y la topología se reconstruye cuando
+    cambia el número de cuerpos o cada REBUILD_INTERVAL reajustes.
+    Las consultas recorren el árbol por niveles, probando todos los nodos
+    de un nivel contra el frustum en una sola operación vectorizada.
+    """
+    def __init__(self, leaf_size=LEAF_SIZE, rebuild_interval=REBUILD_INTERVAL):
+        self.leaf_size = leaf_size
+        self.rebuild_interval = rebuild_interval
+        self.count = 0
+        self.refits = 0
+        self.order = np.zeros(0, dtype=np.int64)
+        self._centers = np.zeros((0, 3))
+        self._radii = np.zeros(0)
+
+    def update(self, centers, radii):
+        """Reconstruye o reajusta el índice con las posiciones actuales."""
+        self._centers = centers
+        self._radii = radii
+        if len(centers) != self.count or self.refits >= self.rebuild_interval:
+            self.build()
+        else:
+            self.refit()
+
+    def build(self):
+        count = len(self._centers)
+        self.count = count
+        self.refits = 0
+        # Ordenar los cuerpos por su código de Morton deja juntos en `order`
+        # los que están cerca en el espacio; partir cada tramo por la mitad
+        # da entonces nodos compactos sin recorrer nodo a nodo en Python
+        self.order = np.argsort(morton_codes(self._centers), kind="stable") if count else np.zeros(0, dtype=np.int64)
+
+        # Árbol por niveles: cada nodo cubre un tramo contiguo de `order`
+        starts, ends, depths = [np.zeros(1, dtype=np.int64)], [np.array([count])], [np.zeros(1, dtype=np.int64)]
+        children = []
+        level_starts, level_ends = starts[0], ends[0]
+        first_id, depth = 0, 0
+        while True:
+            split = (level_ends - level_starts) > self.leaf_size
+            level_children = np.full((len(level_starts), 2), -1, dtype=np.int64)
+            children.append(level_children)
+            parents = np.flatnonzero(split)
+            if len(parents) == 0:
+                break
+            middle = level_starts[parents] + (level_ends[parents] - level_starts[parents]) // 2
+            next_id = first_id + len(level_starts)
+            level_children[parents, 0] = next_id + 2 * np.arange(len(parents))
+            level_children[parents, 1] = level_children[parents, 0] + 1
+            level_starts = np.column_stack((level_starts[parents], middle)).ravel()
+            level_ends = np.column_stack((middle, level_ends[parents])).ravel()
+            depth += 1
+            first_id = next_id
+            starts.append(level_starts)
+            ends.append(level_ends)
+            depths.append(np.full(len(level_starts), depth, dtype=np.int64))
+
+        self.starts = np.concatenate(starts)
+        self.ends = np.concatenate(ends)
+        self.children = np.concatenate(children)
+        self.depths = np.concatenate(depths)
+        self.is_leaf = self.children[:, 0] < 0
+        self.node_centers = np.zeros((len(self.starts), 3))
+        self.node_radii = np.zeros(len(self.starts))
+        self.refit()
+
+    def refit(self):
+        """Recalcula las esferas de los nodos manteniendo la topología."""
+        self.refits += 1
+        if self.count == 0:
+            return
+        centers = self._centers[self.order]
+        radii = self._radii[self.order]
+
+        # Hojas: esfera centrada en la caja envolvente de sus cuerpos
+        # (ordenadas por inicio, sus tramos cubren `order` sin huecos)
+        leaves = np.flatnonzero(self.is_leaf)
+        leaves = leaves[np.argsort(self.starts[leaves])]
+        starts = self.starts[leaves]
+        lows = np.minimum.reduceat(centers, starts)
+        highs = np.maximum.reduceat(centers, starts)
+        leaf_centers = (lows + highs) / 2
+        reach = np.linalg.norm(centers - np.repeat(leaf_centers, self.ends[leaves] - starts, axis=0), axis=1) + radii
+        self.node_centers[leaves] = leaf_centers
+        self.node_radii[leaves] = np.maximum.reduceat(reach, starts)
+
+        # Nodos internos, del nivel más profundo a la raíz
+        for depth in range(self.depths.max() - 1, -1, -1):
+            nodes = np.flatnonzero((self.depths == depth) & ~self.is_leaf)
+            if len(nodes) == 0:
+                continue
+            left, right = self.children[nodes, 0], self.children[nodes, 1]
+            self._enclose(nodes, left, right)
+
+    def _enclose(self, nodes, left, right):
+        # Esfera mínima que contiene las esferas de los dos hijos
+        c1, r1 = self.node_centers[left], self.node_radii[left]
+        c2, r2 = self.node_centers[right], self.node_radii[right]
+        offset = c2 - c1
+        distance = np.linalg.norm(offset, axis=1)
+        radius = (distance + r1 + r2) / 2
+        safe = np.where(distance > 0, distance, 1.0)
+        center = c1 + offset * ((radius - r1) / safe)[:, None]
+
+        # Si una esfera contiene a la otra, el padre es la mayor
+        left_contains = r1 >= distance + r2
+        right_contains = r2 >= distance + r1
+        center[left_contains] = c1[left_contains]
+        radius[left_contains] = r1[left_contains]
+        center[right_contains] = c2[right_contains]
+        radius[right_contains] = r2[right_contains]
+        self.node_centers[nodes] = center
+        self.node_radii[nodes] = radius
+
+    def _members(self, nodes):
+        # Filas de los cuerpos de los nodos `nodes`: sus tramos de `order` concatenados
+        starts = self.starts[nodes]
+        lengths = self.ends[nodes] - starts
+        # Posición dentro de su tramo de cada elemento: arange global menos el inicio de su tramo
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return self.order[np.repeat(starts, lengths) + offsets]
+
+    def query(self, camera):
+        """Devuelve una máscara con los cuerpos que tocan el frustum de `camera`."""
+        visible = np.zeros(self.count, dtype=bool)
+        if self.count == 0:
+            return visible
+
+        frontier = np.array([0])
+        while len(frontier):
+            touches, inside = camera.sphere_distances(self.node_centers[frontier], self.node_radii[frontier])
+
+            # Nodos completamente dentro: todo su tramo es visible
+            visible[self._members(frontier[inside])] = True
+
+            # Hojas que cortan el borde: probar todos sus cuerpos en una sola llamada
+            partial = frontier[touches & ~inside]
+            members = self._members(partial[self.is_leaf[partial]])
+            if len(members):
+                visible[members] = camera.sphere_distances(self._centers[members], self._radii[members])[0]
+
+            frontier = self.children[partial[~self.is_leaf[partial]]].ravel()
+        return visible
+
+    def ray_candidates(self, origin, direction):
+        """
+        Filas de los cuerpos cuyas hojas corta el rayo (origen, dirección
+        unitaria). La prueba exacta contra cada esfera queda para el llamador.
+        """
+        if self.count == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        candidates = []
+        frontier = np.array([0])
+        while len(frontier):
+            hit = ray_sphere_distances(origin, direction, self.node_centers[frontier],
+                                       self.node_radii[frontier]) < np.inf
+            frontier = frontier[hit]
+            candidates.append(self._members(frontier[self.is_leaf[frontier]]))
+            frontier = self.children[frontier[~self.is_leaf[frontier]]].ravel()
+        return np.concatenate(candidates) if candidates else np.zeros(0, dtype=np.int64)
+
+
+def ray_sphere_distances(origin, direction, centers, radii):
+    """
+    Distancia a lo largo del rayo hasta la primera intersección con cada
+    esfera (infinito si no la corta o si queda detrás del origen).
+    """
+    offset = centers - origin
+    along = offset @ direction
+    closest = np.einsum("ij,ij->i", offset, offset) - along * along
+    half_chord = np.sqrt(np.maximum(radii * radii - closest, 0.0))
+    entry = along - half_chord
+    exit_ = along + half_chord
+    distance = np.where(entry >= 0, entry, exit_)  # Origen dentro de la esfera
+    return np.where((closest <= radii * radii) & (exit_ >= 0), distance, np.inf)
@@ -0,0 +1,131 @@
+import ctypes
+import os
+import shutil
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from OpenGL.GL import *
+
+ENCODERS = ("png", "ffmpeg")  # headless.py repite la lista: no puede importar OpenGL antes de tiempo
+PBO_COUNT = 3  # Fotogramas en vuelo entre glReadPixels y la lectura del buffer
+PNG_COMPRESS_LEVEL = 1  # PNG sigue sin pérdidas; comprimir más apenas reduce el tamaño
+
+
+class FrameExporter:
+    """
+    Exporta el contenido del framebuffer sin detener el render.
+
+    Cada fotograma se lee con glReadPixels hacia uno de varios pixel buffer
+    objects (PBO), así que la copia ocurre en segundo plano. El buffer se
+    mapea unos fotogramas después, cuando la transferencia ya terminó, y los
+    píxeles pasan a un pool de hilos que codifica PNG con Pillow (la
+    compresión libera el GIL) o a un único hilo que los escribe en orden en
+    la entrada de ffmpeg. Así la lectura y la codificación se solapan con el
+    dibujado de los fotogramas siguientes.
+
+    Args:
+        destination: Carpeta para los PNG o archivo de vídeo para ffmpeg
+        width: Ancho del framebuffer en píxeles
+        height: Alto del framebuffer en píxeles
+        encoder: "png" o "ffmpeg"
+        workers: Hilos de codificación PNG (None: uno por CPU)
+        buffers: Número de PBO del anillo
+        fps: Fotogramas por segundo del vídeo (solo ffmpeg)
+    """
+    def __init__(self, destination, width, height, encoder="png", workers=None, buffers=PBO_COUNT, fps=60):
+        if encoder not in ENCODERS:
+            raise ValueError(f"Codificador desconocido: {encoder}")
+        self.destination = destination
+        self.width = width
+        self.height = height
+        self.encoder = encoder
+        self.frame_bytes = width * height * 4
+        self.frames = 0  # Fotogramas capturados
+        self.process = None
+
+        if encoder == "png":
+            os.makedirs(destination, exist_ok=True)
+            workers = workers or os.cpu_count() or 1
+            self.pool = ThreadPoolExecutor(max_workers=workers)
+        else:
+            ffmpeg = shutil.which("ffmpeg")
+            if ffmpeg is None:
+                raise RuntimeError("No se encontró ffmpeg en el PATH")
+            self.process = subprocess.Popen(
+                [ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgba",
+                 "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+                 "-vf", "vflip", "-pix_fmt", "yuv420p", destination],
+                stdin=subprocess.PIPE)
+            workers = 1  # Un solo escritor conserva el orden de los fotogramas
+            self.pool = ThreadPoolExecutor(max_workers=1)
+        # Limitar los fotogramas pendientes para no acumular memoria si la
+        # codificación va más lenta que el render
+        self.max_pending = workers * 2
+        self.pending = deque()
+
+        self.buffers = [int(buffer) for buffer in glGenBuffers(buffers)] if buffers > 1 else [int(glGenBuffers(1))]
+        for buffer in self.buffers:
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, buffer)
+            glBufferData(GL_PIXEL_PACK_BUFFER, self.frame_bytes, None, GL_STREAM_READ)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self.in_flight = deque()  # (número de fotograma, PBO) con lectura en curso
+
+    def capture(self):
+        """Encola la lectura del fotograma actual. Llamar antes de cambiar de buffer."""
+        if len(self.in_flight) == len(self.buffers):
+            self._collect()  # Libera el PBO más antiguo, que es el que toca reutilizar
+        buffer = self.buffers[self.frames % len(self.buffers)]
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, buffer)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        glReadPixels(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self.in_flight.append((self.frames, buffer))
+        self.frames += 1
+
+    def _collect(self):
+        index, buffer = self.in_flight.popleft()
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, buffer)
+        address = glMapBuffer(GL_PIXEL_PACK_BUFFER, GL_READ_ONLY)
+        pixels = ctypes.string_at(address, self.frame_bytes)
+        glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+
+        while len(self.pending) >= self.max_pending:
+            self.pending.popleft().result()
+        if self.encoder == "png":
+            self.pending.append(self.pool.submit(self._encode_png, index, pixels))
+        else:
+            self.pending.append(self.pool.submit(self.process.stdin.write, pixels))
+
+    def _encode_png(self, index, pixels):
+        from PIL import Image
+        # Las filas de OpenGL empiezan abajo: el paso negativo las invierte sin copiar
+        image = Image.frombuffer("RGBA", (self.width, self.height), pixels, "raw", "RGBA", 0, -1)
+        image.save(os.path.join(self.destination, f"frame_{index:06d}.png"), compress_level=PNG_COMPRESS_LEVEL)
+
+    def close(self):
+        """Vacía el anillo, espera a los codificadores y libera los PBO."""
+        while self.in_flight:
+            self._collect()
+        while self.pending:
+            self.pending.popleft().result()
+        self.pool.shutdown()
+        if self.process is not None:
+            self.process.stdin.close()
+            if self.process.wait() != 0:
+                raise RuntimeError("ffmpeg terminó con error")
+        glDeleteBuffers(len(self.buffers), self.buffers)
+        self.buffers = []
+
+
+def export_animation(solar_system, exporter, frames, render_frame):
+    """
+    Renderiza `frames` fotogramas con paso fijo (`time_factor` días por
+    fotograma, sin depender del reloj real) y los entrega al exportador.
+    `render_frame` dibuja la escena en el framebuffer actual.
+    """
+    for _ in range(frames):
+        solar_system.update()
+        render_frame()
+        exporter.capture()
+    exporter.close()
@@ -0,0 +1,89 @@
+import numpy as np
+from OpenGL.GL import *
+
+
+class Material:
+    """
+    Material de OpenGL resuelto una sola vez, con los arreglos listos para
+    pasar a glMaterialfv.
+
+    Args:
+        color: Color RGB (0-255) del cuerpo
+        shininess: Brillo especular
+        ambient: Color ambiental RGB (0-1); por defecto el 20% del color
+    """
+    def __init__(self, color, shininess=50.0, ambient=None):
+        rgb = np.asarray(color, dtype=np.float32) / 255.0
+        self.source_color = tuple(color)
+        self.color = rgb
+        self.ambient = np.append(rgb * 0.2 if ambient is None else np.asarray(ambient, dtype=np.float32), 1.0).astype(np.float32)
+        self.diffuse = np.append(rgb, 1.0).astype(np.float32)
+        self.specular = np.ones(4, dtype=np.float32)
+        self.shininess = shininess
+
+
+_materials = {}
+
+
+def material_for(color, shininess=50.0):
+    """Material compartido para un color: los cuerpos del mismo color usan el mismo objeto."""
+    key = (tuple(color), shininess)
+    material = _materials.get(key)
+    if material is None:
+        material = Material(color, shininess)
+        _materials[key] = material
+    return material
+
+
+class MaterialState:
+    """
+    Recuerda el material activo para no volver a enviarlo a OpenGL cuando
+    se dibujan seguidos varios cuerpos que lo comparten.
+    """
+    def __init__(self):
+        self.current = None
+        self.binds = 0  # Cambios de material en el fotograma (para perfilar)
+
+    def bind(self, material):
+        if material is self.current:
+            return
+        glColor3fv(material.color)
+        glMaterialfv(GL_FRONT, GL_AMBIENT, material.ambient)
+        glMaterialfv(GL_FRONT, GL_DIFFUSE, material.diffuse)
+        glMaterialfv(GL_FRONT, GL_SPECULAR, material.specular)
+        glMaterialf(GL_FRONT, GL_SHININESS, material.shininess)
+        self.current = material
+        self.binds += 1
+
+    def invalidate(self):
+        # Otra parte del código cambió el color/material (p. ej. las órbitas)
+        self.current = None
+
+
+class SunLight:
+    """
+    Luz puntual del sol. Ambiente, difusa y especular son estáticas y solo
+    se envían cuando cambian o tras recrear el contexto; la posición se
+    envía en cada fotograma porque OpenGL la transforma con la vista actual.
+    """
+    def __init__(self):
+        self.position = np.array([0.0, 0.0, 0.0, 1.0], dtype=np.float32)
+        self.ambient = np.array([0.2, 0.2, 0.2, 1.0], dtype=np.float32)
+        self.diffuse = np.array([1.0, 1.0, 0.8, 1.0], dtype=np.float32)
+        self.specular = np.array([1.0, 1.0, 1.0, 1.0], dtype=np.float32)
+        self.dirty = True
+
+    def apply(self):
+        glLightfv(GL_LIGHT0, GL_POSITION, self.position)
+        if self.dirty:
+            glLightfv(GL_LIGHT0, GL_AMBIENT, self.ambient)
+            glLightfv(GL_LIGHT0, GL_DIFFUSE, self.diffuse)
+            glLightfv(GL_LIGHT0, GL_SPECULAR, self.specular)
+            self.dirty = False
+
+    def invalidate(self):
+        self.dirty = True
+
+
+# Estado compartido por todos los cuerpos
+material_state = MaterialState()
@@ -0,0 +1,153 @@
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GL.shaders import compileProgram, compileShader
+from animation.sphere_mesh import sphere_lod
+
+# Ubicaciones fijas de los atributos por instancia (la 0 queda para gl_Vertex)
+INSTANCE_ATTRIB = 1
+COLOR_ATTRIB = 2
+INSTANCE_STRIDE = 7 * 4  # x, y, z, radio, r, g, b en float32
+
+VERTEX_SHADER = """
+#version 120
+attribute vec4 instance;        // xyz = centro de la luna, w = radio
+attribute vec3 instance_color;
+varying vec3 normal;
+varying vec3 eye_position;
+varying vec3 color;
+
+void main() {
+    vec4 eye = gl_ModelViewMatrix * vec4(instance.xyz + gl_Vertex.xyz * instance.w, 1.0);
+    eye_position = eye.xyz;
+    normal = gl_NormalMatrix * gl_Normal;
+    color = instance_color;
+    gl_Position = gl_ProjectionMatrix * eye;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 120
+varying vec3 normal;
+varying vec3 eye_position;
+varying vec3 color;
+
+void main() {
+    // Misma iluminación que el camino fijo: luz 0 en el sol, brillo 50
+    vec3 n = normalize(normal);
+    vec3 l = normalize(gl_LightSource[0].position.xyz - eye_position);
+    vec3 h = normalize(l + normalize(-eye_position));
+    float diffuse = max(dot(n, l), 0.0);
+    float specular = diffuse > 0.0 ? pow(max(dot(n, h), 0.0), 50.0) : 0.0;
+    vec3 lit = color * (gl_LightModel.ambient.rgb + gl_LightSource[0].ambient.rgb)
+             + color * gl_LightSource[0].diffuse.rgb * diffuse
+             + gl_LightSource[0].specular.rgb * specular;
+    gl_FragColor = vec4(lit, 1.0);
+}
+"""
+
+
+class MoonBatchRenderer:
+    """
+    Dibuja todas las lunas de todos los planetas por instancias.
+
+    En cada fotograma se sube un único arreglo por instancia (posición,
+    radio y color leídos directamente del OrbitalEngine) y se emite una
+    llamada glDrawElementsInstanced por nivel de detalle de la esfera.
+    Si el contexto no soporta shaders o instancing, `available()` devuelve
+    False y el llamador debe usar el dibujado por objeto.
+    """
+    def __init__(self):
+        self.program = None
+        self.instance_vbo = None
+        self._supported = None  # Se comprueba con el primer contexto activo
+
+    def available(self):
+        if self._supported is None:
+            self._supported = self._initialize()
+        return self._supported
+
+    def _initialize(self):
+        if not (bool(glDrawElementsInstanced) and bool(glVertexAttribDivisor)):
+            return False
+        try:
+            self.program = compileProgram(
+                compileShader(VERTEX_SHADER, GL_VERTEX_SHADER),
+                compileShader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER),
+                validate=False,
+            )
+        except Exception as error:
+            print(f"Dibujado por instancias no disponible: {error}")
+            return False
+        glBindAttribLocation(self.program, INSTANCE_ATTRIB, "instance")
+        glBindAttribLocation(self.program, COLOR_ATTRIB, "instance_color")
+        glLinkProgram(self.program)
+        self.instance_vbo = glGenBuffers(1)
+        return True
+
+    def draw(self, engine, visible=None):
+        """
+        Dibuja todas las lunas y los cuerpos de catálogo del motor (solo los
+        marcados en `visible`, si se indica). Devuelve el número de llamadas de dibujo.
+        """
+        rows = engine.batched_rows()
+        if visible is not None:
+            rows = rows[visible[rows]]
+        if len(rows) == 0:
+            return 0
+
+        positions = engine.render_position[rows]
+        radii = engine.radius[rows]
+        levels = sphere_lod.select_levels(radii, positions)
+
+        # Ordenar por nivel para dibujar cada grupo con una sola llamada
+        order = np.argsort(levels, kind="stable")
+        levels = levels[order]
+        instances = np.empty((len(rows), 7), dtype=np.float32)
+        instances[:, 0:3] = positions[order]
+        instances[:, 3] = radii[order]
+        instances[:, 4:7] = engine.color[rows][order] / 255.0
+
+        glUseProgram(self.program)
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        glBufferData(GL_ARRAY_BUFFER, instances.nbytes, instances, GL_STREAM_DRAW)
+        glEnableVertexAttribArray(INSTANCE_ATTRIB)
+        glEnableVertexAttribArray(COLOR_ATTRIB)
+        glVertexAttribDivisor(INSTANCE_ATTRIB, 1)
+        glVertexAttribDivisor(COLOR_ATTRIB, 1)
+
+        draw_calls = 0
+        starts = np.searchsorted(levels, np.arange(len(sphere_lod.meshes) + 1))
+        for level, mesh in enumerate(sphere_lod.meshes):
+            first, last = starts[level], starts[level + 1]
+            if first == last:
+                continue
+            # Apuntar los atributos por instancia al tramo de este nivel
+            glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+            offset = int(first) * INSTANCE_STRIDE
+            glVertexAttribPointer(INSTANCE_ATTRIB, 4, GL_FLOAT, GL_FALSE, INSTANCE_STRIDE,
+                                  ctypes.c_void_p(offset))
+            glVertexAttribPointer(COLOR_ATTRIB, 3, GL_FLOAT, GL_FALSE, INSTANCE_STRIDE,
+                                  ctypes.c_void_p(offset + 16))
+            mesh.bind()
+            glDrawElementsInstanced(GL_TRIANGLES, len(mesh.indices), GL_UNSIGNED_INT, None,
+                                    int(last - first))
+            mesh.unbind()
+            draw_calls += 1
+
+        glVertexAttribDivisor(INSTANCE_ATTRIB, 0)
+        glVertexAttribDivisor(COLOR_ATTRIB, 0)
+        glDisableVertexAttribArray(INSTANCE_ATTRIB)
+        glDisableVertexAttribArray(COLOR_ATTRIB)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glUseProgram(0)
+        return draw_calls
+
+    def release(self):
+        if self.instance_vbo is not None:
+            glDeleteBuffers(1, [self.instance_vbo])
+            self.instance_vbo = None
+        if self.program is not None:
+            glDeleteProgram(self.program)
+            self.program = None
+        self._supported = None
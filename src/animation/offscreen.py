@@ -0,0 +1,90 @@
+import ctypes
+import os
+
+# PyOpenGL elige la plataforma (GLX, EGL, OSMesa) al importarse por primera
+# vez, así que select_platform debe llamarse antes de importar OpenGL.
+BACKENDS = ("egl", "osmesa")
+
+
+def select_platform(backend):
+    """
+    Configura PyOpenGL para crear contextos sin ventana.
+    Debe llamarse antes de cualquier `import OpenGL`.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend fuera de pantalla desconocido: {backend}")
+    os.environ["PYOPENGL_PLATFORM"] = backend
+    if backend == "egl":
+        # Mesa permite EGL sin servidor gráfico con la plataforma surfaceless
+        os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+
+
+class OffscreenContext:
+    """
+    Contexto OpenGL de software sin ventana (EGL con pbuffer u OSMesa).
+
+    Args:
+        backend: "egl" u "osmesa" (el mismo pasado a select_platform)
+        width: Ancho del framebuffer en píxeles
+        height: Alto del framebuffer en píxeles
+    """
+    def __init__(self, backend, width, height):
+        self.backend = backend
+        self.width = width
+        self.height = height
+        if backend == "egl":
+            self._create_egl()
+        elif backend == "osmesa":
+            self._create_osmesa()
+        else:
+            raise ValueError(f"Backend fuera de pantalla desconocido: {backend}")
+
+    def _create_egl(self):
+        from OpenGL import EGL
+
+        self.display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        if not EGL.eglInitialize(self.display, None, None):
+            raise RuntimeError("No se pudo inicializar EGL")
+
+        config_attribs = (EGL.EGLint * 13)(
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8,
+            EGL.EGL_DEPTH_SIZE, 24,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE,
+        )
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        EGL.eglChooseConfig(self.display, config_attribs, ctypes.pointer(config), 1, ctypes.pointer(count))
+        if count.value == 0:
+            raise RuntimeError("EGL no ofrece una configuración OpenGL con pbuffer")
+
+        surface_attribs = (EGL.EGLint * 5)(EGL.EGL_WIDTH, self.width, EGL.EGL_HEIGHT, self.height, EGL.EGL_NONE)
+        self.surface = EGL.eglCreatePbufferSurface(self.display, config, surface_attribs)
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, None)
+        if not EGL.eglMakeCurrent(self.display, self.surface, self.surface, self.context):
+            raise RuntimeError("No se pudo activar el contexto EGL")
+
+    def _create_osmesa(self):
+        from OpenGL import GL, arrays, osmesa
+
+        self.context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        if not self.context:
+            raise RuntimeError("No se pudo crear el contexto OSMesa")
+        self.buffer = arrays.GLubyteArray.zeros((self.height, self.width, 4))
+        if not osmesa.OSMesaMakeCurrent(self.context, self.buffer, GL.GL_UNSIGNED_BYTE, self.width, self.height):
+            raise RuntimeError("No se pudo activar el contexto OSMesa")
+
+    def destroy(self):
+        if self.backend == "egl":
+            from OpenGL import EGL
+
+            EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroySurface(self.display, self.surface)
+            EGL.eglDestroyContext(self.display, self.context)
+            EGL.eglTerminate(self.display)
+        else:
+            from OpenGL import osmesa
+
+            osmesa.OSMesaDestroyContext(self.context)
@@ -0,0 +1,53 @@
+import numpy as np
+from OpenGL.GL import *
+from models.kepler import orbit_offsets
+from models.planet import DEFAULT_ORBIT_SEGMENTS
+
+
+class OrbitPath:
+    """
+    Trayectoria orbital cacheada en un vertex buffer (VBO).
+
+    Los vértices se calculan una sola vez y se dibujan con una única llamada
+    glDrawArrays por fotograma. Solo se reconstruyen cuando cambian los
+    elementos orbitales o el número de segmentos.
+    """
+    def __init__(self):
+        self.vbo = None
+        self.vertex_count = 0
+        self._key = None
+
+    def _build(self, distance, inclination, segments, eccentricity, periapsis, ascending_node):
+        # Muestrear la anomalía excéntrica reparte los vértices a lo largo
+        # de la elipse; la orientación se aplica a los vértices
+        anomalies = np.linspace(0.0, 2 * np.pi, segments, endpoint=False)
+        vertices = orbit_offsets(anomalies, distance, eccentricity, inclination,
+                                 periapsis, ascending_node).astype(np.float32)
+
+        if self.vbo is None:
+            self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.vertex_count = segments
+
+    def draw(self, distance, inclination, segments=DEFAULT_ORBIT_SEGMENTS,
+             eccentricity=0.0, periapsis=0.0, ascending_node=0.0):
+        """Dibuja la elipse de semieje `distance` (ángulos en radianes)."""
+        key = (distance, inclination, segments, eccentricity, periapsis, ascending_node)
+        if key != self._key:
+            self._build(*key)
+            self._key = key
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glDrawArrays(GL_LINE_LOOP, 0, self.vertex_count)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def release(self):
+        if self.vbo is not None:
+            glDeleteBuffers(1, [self.vbo])
+            self.vbo = None
+            self._key = None
@@ -0,0 +1,59 @@
+import ctypes
+from OpenGL.GL import *
+
+PARTICLE_SIZE = 1.5  # Tamaño en píxeles de cada partícula
+
+
+class ParticleBeltBuffer:
+    """
+    Vertex buffer de un cinturón de partículas (ParticleBelt).
+
+    Un único VBO por cinturón con dos bloques: primero las posiciones
+    (float32, relativas al cuerpo padre) y después los colores (RGB de un
+    byte). Los colores se suben una sola vez; en cada fotograma solo se
+    reescriben las posiciones de las partículas activas, y únicamente si el
+    cinturón se ha movido desde la última subida. Todas se dibujan con una
+    llamada glDrawArrays de GL_POINTS, sin iluminación, así que funciona
+    también sin shaders.
+    """
+    def __init__(self):
+        self.vbo = None
+        self.count = 0
+        self._revision = None
+
+    def _build(self, belt):
+        if self.vbo is None:
+            self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, belt.positions.nbytes + belt.colors.nbytes, None, GL_DYNAMIC_DRAW)
+        glBufferSubData(GL_ARRAY_BUFFER, belt.positions.nbytes, belt.colors.nbytes, belt.colors)
+        self.count = belt.count
+        self._revision = None
+
+    def draw(self, belt, center):
+        """Dibuja las partículas activas del cinturón alrededor de `center`."""
+        if self.vbo is None or self.count != belt.count:
+            self._build(belt)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        if belt.revision != self._revision:
+            positions = belt.positions[:belt.active]
+            glBufferSubData(GL_ARRAY_BUFFER, 0, positions.nbytes, positions)
+            self._revision = belt.revision
+
+        glPushMatrix()
+        glTranslatef(*center)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glColorPointer(3, GL_UNSIGNED_BYTE, 0, ctypes.c_void_p(belt.positions.nbytes))
+        glDrawArrays(GL_POINTS, 0, belt.active)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glPopMatrix()
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def release(self):
+        if self.vbo is not None:
+            glDeleteBuffers(1, [self.vbo])
+            self.vbo = None
+            self.count = 0
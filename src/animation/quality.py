@@ -0,0 +1,145 @@
+import time
+import numpy as np
+
+# Niveles de calidad, de menor a mayor coste:
+# - sphere_pixels: píxeles de contorno por segmento de las esferas (más: menos triángulos)
+# - sphere_segments: teselado máximo de las esferas
+# - orbit_segments: vértices de cada órbita
+# - moon_distance: distancia a la cámara a partir de la que no se dibujan
+#   lunas ni cuerpos de catálogo (None: sin límite)
+# - hud_interval: fotogramas entre dos actualizaciones de la interfaz
+# - belt_density: fracción de las partículas de los cinturones (sobre belts.density)
+QUALITY_TIERS = [
+    {"name": "mínima", "sphere_pixels": 16.0, "sphere_segments": 10, "orbit_segments": 32,
+     "moon_distance": 500.0, "hud_interval": 6, "belt_density": 0.25},
+    {"name": "baja", "sphere_pixels": 12.0, "sphere_segments": 16, "orbit_segments": 48,
+     "moon_distance": 700.0, "hud_interval": 4, "belt_density": 0.5},
+    {"name": "media", "sphere_pixels": 8.0, "sphere_segments": 24, "orbit_segments": 64,
+     "moon_distance": 900.0, "hud_interval": 2, "belt_density": 0.75},
+    {"name": "alta", "sphere_pixels": 6.0, "sphere_segments": 32, "orbit_segments": 100,
+     "moon_distance": None, "hud_interval": 1, "belt_density": 1.0},
+    {"name": "ultra", "sphere_pixels": 4.0, "sphere_segments": 48, "orbit_segments": 200,
+     "moon_distance": None, "hud_interval": 1, "belt_density": 1.0},
+]
+DEFAULT_TIER = "alta"
+WINDOW_FRAMES = 30  # Fotogramas que se miden antes de cada decisión
+DOWNGRADE_LOAD = 0.9  # Bajar si el percentil 90 supera esta fracción del presupuesto
+UPGRADE_LOAD = 0.6  # Subir solo si queda por debajo de esta
+UPGRADE_WINDOWS = 4  # Ventanas seguidas con margen antes de subir
+MAX_UPGRADE_WINDOWS = 64  # Espera máxima tras subidas fallidas (unos 30 s a 60 FPS)
+
+
+def tier_index(name):
+    """Posición en QUALITY_TIERS del nivel llamado `name`."""
+    for index, tier in enumerate(QUALITY_TIERS):
+        if tier["name"] == name:
+            return index
+    raise ValueError(f"Nivel de calidad desconocido: {name}")
+
+
+class QualityGovernor:
+    """
+    Ajusta el nivel de calidad para que cada fotograma quepa en el
+    presupuesto de `1 / frame_rate` segundos.
+
+    Mide el tiempo de trabajo de cada fotograma, de `begin_frame` a
+    `end_work`, sin `flip` (que con sincronía vertical espera al monitor
+    casi todo el presupuesto) ni la espera de `clock.tick`, y cada
+    WINDOW_FRAMES fotogramas compara su percentil 90
+    con el presupuesto. La histéresis evita que oscile entre dos niveles:
+    baja en cuanto una ventana supera DOWNGRADE_LOAD, pero solo sube tras
+    UPGRADE_WINDOWS ventanas seguidas por debajo de UPGRADE_LOAD, un margen
+    que el nivel superior (más caro) aún puede consumir sin pasarse. Si
+    tras subir hay que volver a bajar enseguida, la espera para intentarlo
+    de nuevo se duplica. Tras cada cambio se descarta la ventana en curso,
+    medida con el nivel anterior.
+
+    Args:
+        frame_rate: Fotogramas por segundo objetivo (animation.frame_rate)
+        tier: Nombre del nivel inicial
+        adaptive: Si es False el nivel no cambia solo
+        clock: Reloj en segundos (time.perf_counter)
+    """
+    def __init__(self, frame_rate, tier=DEFAULT_TIER, adaptive=True, clock=time.perf_counter):
+        self.budget = 1.0 / frame_rate
+        self.clock = clock
+        self.frame_start = 0.0
+        self.work = 0.0  # Tiempo de trabajo del fotograma en curso
+        self.index = tier_index(tier)
+        self.adaptive = adaptive
+        self.samples = np.zeros(WINDOW_FRAMES)
+        self.frames = 0  # Fotogramas medidos en la ventana actual
+        self.headroom_windows = 0
+        self.upgrade_windows = UPGRADE_WINDOWS  # Ventanas con margen necesarias para subir
+        self.windows_since_upgrade = None  # None: el último cambio no fue una subida
+        self.load = 0.0  # Percentil 90 de la última ventana / presupuesto
+        self.changes = 0
+
+    @property
+    def tier(self):
+        return QUALITY_TIERS[self.index]
+
+    def begin_frame(self):
+        """Marca el inicio del fotograma."""
+        self.frame_start = self.clock()
+
+    def end_work(self):
+        """Marca el fin del trabajo del fotograma, justo antes de `flip`."""
+        self.work = self.clock() - self.frame_start
+
+    def end_frame(self):
+        """
+        Anota el trabajo medido entre `begin_frame` y `end_work`. Devuelve
+        True si cambió el nivel (hay que aplicar `tier`).
+        """
+        return self.record(self.work)
+
+    def record(self, seconds):
+        """
+        Anota el tiempo de trabajo de un fotograma. Devuelve True si cambió
+        el nivel (hay que aplicar `tier`).
+        """
+        self.samples[self.frames] = seconds
+        self.frames += 1
+        if self.frames < WINDOW_FRAMES:
+            return False
+        self.frames = 0
+        self.load = float(np.percentile(self.samples, 90)) / self.budget
+        if not self.adaptive:
+            return False
+
+        since_upgrade = self.windows_since_upgrade
+        if since_upgrade is not None:
+            self.windows_since_upgrade += 1
+        if self.load > DOWNGRADE_LOAD and self.index > 0:
+            if since_upgrade is not None and since_upgrade < self.upgrade_windows:
+                # La subida anterior no cabía en el presupuesto: esperar más la próxima vez
+                self.upgrade_windows = min(2 * self.upgrade_windows, MAX_UPGRADE_WINDOWS)
+            elif since_upgrade is not None:
+                self.upgrade_windows = UPGRADE_WINDOWS  # La escena cambió: volver a la espera normal
+            self.windows_since_upgrade = None
+            return self.set_index(self.index - 1)
+        if self.load < UPGRADE_LOAD and self.index < len(QUALITY_TIERS) - 1:
+            self.headroom_windows += 1
+            if self.headroom_windows >= self.upgrade_windows:
+                self.windows_since_upgrade = 0
+                return self.set_index(self.index + 1)
+        else:
+            self.headroom_windows = 0
+        return False
+
+    def set_index(self, index):
+        """Fija el nivel (posición en QUALITY_TIERS). Devuelve True si cambió."""
+        index = min(max(index, 0), len(QUALITY_TIERS) - 1)
+        self.frames = 0
+        self.headroom_windows = 0
+        if index == self.index:
+            return False
+        self.index = index
+        self.changes += 1
+        return True
+
+    def label(self):
+        """Texto para la interfaz, p. ej. "Calidad: media (auto)"."""
+        mode = "auto" if self.adaptive else "fija"
+        return f"Calidad: {self.tier['name']} ({mode})"
@@ -1,6 +1,138 @@
+import numpy as np
+from OpenGL.GL import *
+from animation.sphere_mesh import sphere_lod
+from animation.moon_batch import MoonBatchRenderer
+from animation.materials import Material, SunLight, material_for, material_state
+from animation.orbit_path import OrbitPath
+from animation.particle_renderer import PARTICLE_SIZE, ParticleBeltBuffer
+from diagnostics.profiler import profiler
+
+
 class Renderer:
-    def __init__(self, screen):
-        self.screen = screen
+    """
+    Capa de dibujo del sistema solar.
+
+    Los modelos (SolarSystem, Planet, Moon) no dependen de OpenGL: todos los
+    recursos de la GPU (mallas, VBO de las órbitas y de los cinturones,
+    shaders de las lunas, materiales y luz) viven aquí y se crean la
+    primera vez que se dibujan, así que debe construirse y usarse con un
+    contexto OpenGL activo.
+
+    Args:
+        solar_system: SolarSystem que se dibuja
+    """
+    def __init__(self, solar_system):
+        self.solar_system = solar_system
+        # Estado de iluminación y material del sol, resueltos una sola vez
+        self.sun_light = SunLight()
+        self.sun_material = Material((255, 255, 0), shininess=100.0, ambient=(1.0, 1.0, 0.0))
+        # Dibujado por instancias de las lunas (si el contexto lo permite)
+        self.moon_batch = MoonBatchRenderer()
+        self.use_instancing = True
+        # Descartar los cuerpos fuera del frustum
+        self.use_culling = True
+        self.culling_stats = {"drawn": 0, "culled": 0}
+        # Distancia a la cámara a partir de la que no se dibujan lunas ni
+        # cuerpos de catálogo (None: sin límite; ver set_quality)
+        self.moon_distance = None
+        # Geometría de cada órbita cacheada en GPU, por planeta
+        self.orbit_paths = {}
+        # Un vertex buffer por cinturón de partículas
+        self.belt_buffers = {}
+
+    def capture_camera(self):
+        """Lee la vista actual de OpenGL. Debe llamarse tras aplicar la transformación de vista."""
+        # PyOpenGL devuelve las matrices en orden de columnas (traspuestas)
+        self.solar_system.camera.set_view(
+            np.asarray(glGetDoublev(GL_MODELVIEW_MATRIX)).reshape(4, 4).T,
+            np.asarray(glGetDoublev(GL_PROJECTION_MATRIX)).reshape(4, 4).T,
+            glGetIntegerv(GL_VIEWPORT))
+
+    def visible_bodies(self):
+        """Máscara por fila del motor con los cuerpos dentro del frustum."""
+        n = self.solar_system.engine.count
+        if not self.use_culling:
+            visible = np.ones(n, dtype=bool)
+        else:
+            visible = self.solar_system.current_spatial_index().query(self.solar_system.camera)
+        if self.moon_distance is not None:
+            engine = self.solar_system.engine
+            rows = engine.batched_rows()
+            offsets = engine.render_position[rows] - self.solar_system.camera.eye
+            far = np.einsum("ij,ij->i", offsets, offsets) > self.moon_distance ** 2
+            visible[rows[far]] = False
+        drawn = int(np.count_nonzero(visible))
+        self.culling_stats = {"drawn": drawn, "culled": n - drawn}
+        return visible
+
+    def render(self):
+        solar_system = self.solar_system
+        # Aplicar rotación de la vista
+        glRotatef(solar_system.rotation_x, 1, 0, 0)
+        glRotatef(solar_system.rotation_y, 0, 1, 0)
+
+        # Leer la cámara una vez: nivel de detalle de las esferas y frustum
+        with profiler.section("render.cull"):
+            self.capture_camera()
+            sphere_lod.begin_frame(solar_system.camera)
+            visible = self.visible_bodies()
+
+        # Luz del sol: solo la posición se envía en cada fotograma
+        self.sun_light.apply()
+
+        # Dibujar el sol
+        material_state.invalidate()
+        material_state.bind(self.sun_material)
+        glPushMatrix()
+        sphere_lod.draw(solar_system.sun_radius, (0.0, 0.0, 0.0))
+        glPopMatrix()
+
+        # Dibujar todas las órbitas primero; su color altera el material activo
+        with profiler.section("render.orbits"):
+            for planet in solar_system.planets:
+                self.draw_orbit(planet)
+        material_state.invalidate()
+
+        # Dibujar los cuerpos agrupados por material para activar cada uno
+        # una sola vez; las lunas van en lote salvo en contextos antiguos.
+        # Los cuerpos fuera del frustum no se dibujan.
+        batched = self.use_instancing and self.moon_batch.available()
+        bodies = [planet for planet in solar_system.planets if visible[planet.engine_index]]
+        if not batched:
+            for planet in solar_system.planets:
+                bodies.extend(moon for moon in planet.moons if visible[moon.engine_index])
+        drawn = [(material_for(body.color), body) for body in bodies]
+        drawn.sort(key=lambda item: id(item[0]))
+        with profiler.section("render.bodies"):
+            for material, body in drawn:
+                self.draw_body(body, material)
+        if batched:
+            with profiler.section("render.moons"):
+                self.moon_batch.draw(solar_system.engine, visible)
+        if solar_system.belts_enabled:
+            with profiler.section("render.belts"):
+                self.draw_belts()
+
+    def draw_belts(self):
+        """Dibuja los cinturones de partículas que tocan el frustum, sin iluminación."""
+        belts = self.solar_system.belts
+        if not belts:
+            return
+        centers = np.array([belt.center() for belt in belts])
+        radii = np.array([belt.bounding_radius for belt in belts])
+        visible, _ = self.solar_system.camera.sphere_distances(centers, radii)
+        glDisable(GL_LIGHTING)
+        glPointSize(PARTICLE_SIZE)
+        for belt, center, shown in zip(belts, centers, visible):
+            if not shown or belt.active == 0:
+                continue
+            buffer = self.belt_buffers.get(belt)
+            if buffer is None:
+                buffer = self.belt_buffers[belt] = ParticleBeltBuffer()
+            buffer.draw(belt, center)
+        glPointSize(1.0)
+        glEnable(GL_LIGHTING)
+        material_state.invalidate()  # El arreglo de colores deja indefinido el color actual
 
     def render_planets(self, planets):
         for planet in planets:
@@ -11,9 +143,58 @@ class Renderer:
             self.draw_moon(moon)
 
     def draw_planet(self, planet):
-        # Implementación para dibujar un planeta en la pantalla
-        pass
+        # Planeta con su órbita, sin lotes ni descarte (útil para depurar)
+        self.draw_orbit(planet)
+        material_state.invalidate()  # glColor3f de la órbita cambia el material activo
+        self.draw_body(planet)
 
     def draw_moon(self, moon):
-        # Implementación para dibujar una luna en la pantalla
-        pass
\ No newline at end of file
+        self.draw_body(moon)
+
+    def draw_body(self, body, material=None):
+        """Dibuja la esfera de un cuerpo en su posición interpolada."""
+        position = body.get_render_position()
+        glPushMatrix()
+        glTranslatef(*position)
+
+        # Configurar el material y color (se omite si ya está activo)
+        material_state.bind(material or material_for(body.color))
+
+        # Dibujar la esfera con el nivel de detalle según su tamaño en pantalla
+        sphere_lod.draw(body.radius, position)
+        glPopMatrix()
+
+    def draw_orbit(self, planet):
+        # Una sola llamada sobre el VBO cacheado; se reconstruye si cambian los elementos
+        path = self.orbit_paths.get(planet)
+        if path is None:
+            path = self.orbit_paths[planet] = OrbitPath()
+        glColor3f(0.2, 0.2, 0.2)
+        path.draw(planet.distance, planet.inclination, planet.orbit_segments,
+                  planet.eccentricity, planet.periapsis, planet.ascending_node)
+
+    def set_quality(self, tier):
+        """Aplica el detalle de dibujo de un nivel de animation/quality.py (esferas y lunas lejanas)."""
+        sphere_lod.set_detail(tier["sphere_pixels"], tier["sphere_segments"])
+        self.moon_distance = tier["moon_distance"]
+
+    def invalidate(self):
+        # El contexto puede haberse recreado (F11): soltar todos los recursos
+        # de la GPU, que se vuelven a crear la próxima vez que se dibujan,
+        # y reenviar el estado de la luz y del material. Debe llamarse antes
+        # de crear otros buffers en el contexto nuevo: si es otro, sus
+        # nombres viejos no existen y borrarlos no tiene efecto.
+        self.release()
+        self.sun_light.invalidate()
+        material_state.invalidate()
+
+    def release(self):
+        # Liberar los recursos de OpenGL
+        sphere_lod.release()
+        self.moon_batch.release()
+        for path in self.orbit_paths.values():
+            path.release()
+        self.orbit_paths.clear()
+        for buffer in self.belt_buffers.values():
+            buffer.release()
+        self.belt_buffers.clear()
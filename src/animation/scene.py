@@ -0,0 +1,46 @@
+# Configuración de la vista y dibujo de la escena, sin pygame: lo comparten
+# la ventana (main.py), el modo sin ventana (headless.py) y las pruebas de
+# rendimiento
+
+from OpenGL.GL import *
+from OpenGL.GLU import *
+
+def init_opengl(width, height):
+    # Configurar vista 3D
+    glViewport(0, 0, width, height)
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    gluPerspective(45, (width / height), 1, 2000.0)  # Aumentado el valor de lejanía para poder hacer más zoom
+    glMatrixMode(GL_MODELVIEW)
+    glLoadIdentity()
+    
+    # Posición inicial de la cámara
+    gluLookAt(0, -500, 200,  # posición de la cámara
+              0, 0, 0,       # punto al que mira
+              0, 0, 1)       # vector "arriba"
+    
+    # Habilitar iluminación
+    glEnable(GL_LIGHTING)
+    glEnable(GL_LIGHT0)
+    glEnable(GL_COLOR_MATERIAL)
+    glEnable(GL_DEPTH_TEST)
+    glEnable(GL_NORMALIZE)
+    glShadeModel(GL_SMOOTH)
+
+def render_scene(renderer, zoom_level):
+    # Limpiar la pantalla y buffer de profundidad
+    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+    
+    glMatrixMode(GL_MODELVIEW)
+    glLoadIdentity()
+    
+    # Aplicar zoom a la cámara
+    camera_distance = 500 / zoom_level
+    camera_height = 200 / zoom_level
+    
+    gluLookAt(0, -camera_distance, camera_height,
+              0, 0, 0,
+              0, 0, 1)
+    
+    # Renderizar sistema solar
+    renderer.render()
@@ -0,0 +1,134 @@
+import numpy as np
+from OpenGL.GL import *
+
+# Niveles de teselado disponibles (meridianos = paralelos)
+SPHERE_LEVELS = (6, 10, 16, 24, 32, 48)
+DEFAULT_MAX_SEGMENTS = 32  # El nivel 48 solo se usa si se sube el límite (ver set_detail)
+
+
+class SphereMesh:
+    """
+    Esfera unitaria precalculada con un teselado fijo.
+    Los vértices se suben a un VBO la primera vez que se dibuja; como la
+    esfera es unitaria, la normal de cada vértice coincide con su posición.
+    """
+    def __init__(self, segments):
+        self.segments = segments
+        self.vertices, self.indices = self._tessellate(segments)
+        self.vbo = None
+        self.ibo = None
+
+    @staticmethod
+    def _tessellate(segments):
+        theta = np.linspace(0.0, np.pi, segments + 1)        # Del polo +Z al -Z
+        phi = np.linspace(0.0, 2 * np.pi, segments + 1)      # Alrededor del eje Z
+        theta, phi = np.meshgrid(theta, phi, indexing="ij")
+        vertices = np.empty((segments + 1, segments + 1, 3), dtype=np.float32)
+        vertices[..., 0] = np.sin(theta) * np.cos(phi)
+        vertices[..., 1] = np.sin(theta) * np.sin(phi)
+        vertices[..., 2] = np.cos(theta)
+
+        # Dos triángulos por cada celda de la malla
+        row = np.arange(segments)[:, None] * (segments + 1)
+        col = np.arange(segments)[None, :]
+        a = (row + col).ravel()
+        b = a + segments + 1
+        indices = np.column_stack((a, b, a + 1, a + 1, b, b + 1)).astype(np.uint32)
+        return vertices.reshape(-1, 3), indices.ravel()
+
+    def _upload(self):
+        self.vbo, self.ibo = glGenBuffers(2)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.indices.nbytes, self.indices, GL_STATIC_DRAW)
+
+    def bind(self):
+        if self.vbo is None:
+            self._upload()
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glNormalPointer(GL_FLOAT, 0, None)
+
+    def unbind(self):
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw_elements(self):
+        glDrawElements(GL_TRIANGLES, len(self.indices), GL_UNSIGNED_INT, None)
+
+    def release(self):
+        if self.vbo is not None:
+            glDeleteBuffers(2, [self.vbo, self.ibo])
+            self.vbo = None
+            self.ibo = None
+
+
+class SphereLOD:
+    """
+    Juego de mallas de esfera compartido por todos los cuerpos.
+
+    En cada fotograma se toma la cámara una sola vez (begin_frame) y cada
+    cuerpo dibuja el nivel cuyo teselado corresponde a su tamaño proyectado
+    en pantalla.
+
+    Args:
+        levels: Teselados disponibles, de menor a mayor
+        pixels_per_segment: Longitud aproximada en píxeles de cada segmento del contorno
+        max_segments: Teselado máximo que se usa
+    """
+    def __init__(self, levels=SPHERE_LEVELS, pixels_per_segment=6.0, max_segments=DEFAULT_MAX_SEGMENTS):
+        self.meshes = [SphereMesh(segments) for segments in levels]
+        self.set_detail(pixels_per_segment, max_segments)
+        self.eye = np.zeros(3)
+        self.pixel_scale = 0.0  # Píxeles por unidad a distancia 1 de la cámara
+
+    def begin_frame(self, camera):
+        """Toma la posición del ojo y la escala de proyección del fotograma."""
+        self.eye = camera.eye
+        self.pixel_scale = camera.pixel_scale
+
+    def set_detail(self, pixels_per_segment, max_segments):
+        """Cambia el detalle: segmentos más largos o un teselado máximo menor dan menos triángulos."""
+        self.pixels_per_segment = pixels_per_segment
+        # Último nivel permitido (al menos el más sencillo)
+        self.max_level = max(sum(mesh.segments <= max_segments for mesh in self.meshes) - 1, 0)
+
+    def select(self, radius, position):
+        """Devuelve la malla adecuada para una esfera en `position`."""
+        distance = max(np.linalg.norm(np.asarray(position) - self.eye) - radius, 1e-3)
+        projected_radius = radius * self.pixel_scale / distance
+        wanted = 2 * np.pi * projected_radius / self.pixels_per_segment
+        for mesh in self.meshes[:self.max_level]:
+            if mesh.segments >= wanted:
+                return mesh
+        return self.meshes[self.max_level]
+
+    def select_levels(self, radii, positions):
+        """Versión vectorizada de select: índice de nivel para cada esfera."""
+        distance = np.maximum(np.linalg.norm(positions - self.eye, axis=1) - radii, 1e-3)
+        wanted = 2 * np.pi * radii * self.pixel_scale / distance / self.pixels_per_segment
+        segments = np.array([mesh.segments for mesh in self.meshes])
+        levels = np.searchsorted(segments, wanted)
+        return np.minimum(levels, self.max_level)
+
+    def draw(self, radius, position):
+        """Dibuja una esfera de radio `radius` en la matriz actual."""
+        mesh = self.select(radius, position)
+        glScalef(radius, radius, radius)
+        mesh.bind()
+        mesh.draw_elements()
+        mesh.unbind()
+
+    def release(self):
+        for mesh in self.meshes:
+            mesh.release()
+
+
+# Instancia compartida por todos los cuerpos celestes
+sphere_lod = SphereLOD()
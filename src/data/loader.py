@@ -0,0 +1,122 @@
+import csv
+import itertools
+import json
+import os
+import numpy as np
+from data.planets_data import load_planets_data
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CONFIG_PATH = os.path.join(PROJECT_DIR, "config.json")
+DEFAULT_CONFIG = {
+    "animation": {"frame_rate": 60},
+    "planets": {"default_moons": 0, "max_moons": 100},
+    "belts": {"enabled": True, "density": 1.0},
+    "simulation": {"worker": True},
+    "checkpoints": {"directory": "checkpoints"},
+    "quality": {"adaptive": True, "tier": "alta"},
+}
+CHUNK_ROWS = 65536  # Filas de texto que se convierten de una vez al leer un catálogo
+
+# Una fila por cuerpo en arreglos compactos (no un objeto por cuerpo).
+# Mismas unidades que data/planets_data.py: distancia (semieje mayor) y
+# radio en unidades de la escena, periodo en días, ángulos en grados y masa
+# en masas solares. `parent` es el nombre (o la clave) del planeta que
+# orbita; vacío para los cuerpos que orbitan el sol.
+CATALOG_DTYPE = np.dtype([
+    ("name", "U32"), ("parent", "U16"),
+    ("distance", "f8"), ("orbital_period", "f8"), ("eccentricity", "f8"),
+    ("inclination", "f8"), ("periapsis", "f8"), ("ascending_node", "f8"), ("mean_anomaly", "f8"),
+    ("radius", "f4"), ("mass", "f8"),
+    ("red", "u1"), ("green", "u1"), ("blue", "u1"),
+])
+CATALOG_DEFAULTS = {"radius": 1.0, "red": 160, "green": 160, "blue": 160}
+REQUIRED_COLUMNS = ("distance", "orbital_period")
+
+
+def load_config(path=CONFIG_PATH):
+    """
+    Lee config.json completando las claves que falten con DEFAULT_CONFIG.
+    Si el archivo no existe se usan los valores por defecto.
+    """
+    config = {section: dict(values) for section, values in DEFAULT_CONFIG.items()}
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as source:
+            for section, values in json.load(source).items():
+                if isinstance(values, dict):
+                    config.setdefault(section, {}).update(values)
+                else:
+                    config[section] = values
+    return config
+
+
+def project_path(path):
+    """Ruta relativa a la raíz del proyecto (las absolutas no cambian)."""
+    return os.path.join(PROJECT_DIR, path)
+
+
+def load_planets(path=None):
+    """
+    Planetas del sistema: los de data/planets_data.py o, si se indica, los
+    de un archivo JSON con el mismo formato (un objeto por planeta).
+    """
+    if path is None:
+        return load_planets_data()
+    with open(path, encoding="utf-8") as source:
+        return json.load(source)
+
+
+def read_catalog(path, chunk_rows=CHUNK_ROWS):
+    """
+    Lee un catálogo de cuerpos menores como arreglo estructurado CATALOG_DTYPE.
+
+    - `.npy`: formato binario compacto; se mapea en memoria (solo lectura)
+      sin copiar nada, así que abrirlo cuesta lo mismo sea cual sea su tamaño.
+    - `.csv`: texto con cabecera (columnas con los nombres de CATALOG_DTYPE,
+      en cualquier orden; `distance` y `orbital_period` son obligatorias).
+      Se procesa por bloques de `chunk_rows` líneas que NumPy convierte
+      directamente a columnas, sin crear un objeto por fila.
+    """
+    if path.lower().endswith(".npy"):
+        catalog = np.load(path, mmap_mode="r")
+        if catalog.dtype != CATALOG_DTYPE:
+            raise ValueError(f"{path} no tiene el formato de catálogo esperado")
+        return catalog
+
+    with open(path, encoding="utf-8", newline="") as source:
+        header = [column.strip() for column in next(csv.reader([source.readline()]))]
+        missing = [column for column in REQUIRED_COLUMNS if column not in header]
+        if missing:
+            raise ValueError(f"{path}: faltan las columnas {', '.join(missing)}")
+        # Solo se convierten las columnas conocidas; el resto se ignora
+        used = [(index, column) for index, column in enumerate(header) if column in CATALOG_DTYPE.names]
+        file_dtype = np.dtype([(column, CATALOG_DTYPE[column]) for _, column in used])
+        usecols = [index for index, _ in used]
+
+        blocks = []
+        while True:
+            lines = list(itertools.islice(source, chunk_rows))
+            if not lines:
+                break
+            parsed = np.loadtxt(lines, dtype=file_dtype, delimiter=",", usecols=usecols,
+                                quotechar='"', ndmin=1)
+            block = np.zeros(len(parsed), dtype=CATALOG_DTYPE)
+            for column, value in CATALOG_DEFAULTS.items():
+                block[column] = value
+            for _, column in used:
+                block[column] = parsed[column]
+            blocks.append(block)
+    if not blocks:
+        return np.zeros(0, dtype=CATALOG_DTYPE)
+    return np.concatenate(blocks)
+
+
+def save_catalog(path, catalog):
+    """Guarda un catálogo en el formato binario (`.npy`) que read_catalog mapea en memoria."""
+    np.save(path, np.asarray(catalog, dtype=CATALOG_DTYPE))
+
+
+def convert_catalog(source, destination):
+    """Convierte un catálogo CSV al formato binario. Devuelve el número de cuerpos."""
+    catalog = read_catalog(source)
+    save_catalog(destination, catalog)
+    return len(catalog)
@@ -1,39 +1,119 @@
 # planets_data.py
+#
+# Datos de cada planeta. Distancia (semieje mayor) y radio están en unidades
+# de la escena; el periodo en días; la masa en masas solares. Los elementos
+# orbitales son los reales de la época J2000, con los ángulos en grados:
+# inclinación, argumento del periapsis, longitud del nodo ascendente y
+# anomalía media en el instante 0. "size" y "moons" son el tamaño relativo
+# a la Tierra y el número real de lunas.
 
 planets_data = {
     "Mercury": {
+        "name": "Mercurio",
+        "distance": 70, "radius": 5, "color": (200, 200, 200),
+        "orbital_period": 88, "mass": 1.66e-7,
+        "eccentricity": 0.2056, "inclination": 7.0,
+        "periapsis": 29.124, "ascending_node": 48.331, "mean_anomaly": 174.796,
         "size": 0.383,
         "moons": 0
     },
     "Venus": {
+        "name": "Venus",
+        "distance": 100, "radius": 8, "color": (255, 190, 0),
+        "orbital_period": 225, "mass": 2.45e-6,
+        "eccentricity": 0.0068, "inclination": 3.4,
+        "periapsis": 54.884, "ascending_node": 76.680, "mean_anomaly": 50.115,
         "size": 0.949,
         "moons": 0
     },
     "Earth": {
+        "name": "Tierra",
+        "distance": 130, "radius": 10, "color": (0, 100, 255),
+        "orbital_period": 365, "mass": 3.0e-6,
+        "eccentricity": 0.0167, "inclination": 0.0,
+        "periapsis": 114.208, "ascending_node": 0.0, "mean_anomaly": 358.617,
         "size": 1.0,
         "moons": 1
     },
     "Mars": {
+        "name": "Marte",
+        "distance": 170, "radius": 7, "color": (255, 50, 0),
+        "orbital_period": 687, "mass": 3.2e-7,
+        "eccentricity": 0.0934, "inclination": 1.9,
+        "periapsis": 286.502, "ascending_node": 49.558, "mean_anomaly": 19.412,
         "size": 0.532,
         "moons": 2
     },
     "Jupiter": {
+        "name": "Júpiter",
+        "distance": 230, "radius": 20, "color": (255, 200, 100),
+        "orbital_period": 4333, "mass": 9.55e-4,
+        "eccentricity": 0.0489, "inclination": 1.3,
+        "periapsis": 273.867, "ascending_node": 100.464, "mean_anomaly": 20.020,
         "size": 11.21,
         "moons": 79
     },
     "Saturn": {
+        "name": "Saturno",
+        "distance": 290, "radius": 17, "color": (255, 220, 150),
+        "orbital_period": 10759, "mass": 2.86e-4,
+        "eccentricity": 0.0565, "inclination": 2.5,
+        "periapsis": 339.392, "ascending_node": 113.665, "mean_anomaly": 317.020,
         "size": 9.45,
-        "moons": 83
+        "moons": 83,
+        # Anillos como partículas (ver models/particle_belt.py): radios en
+        # unidades de la escena y el plano ecuatorial del planeta (inclinado
+        # 26.7°). Los periodos reales (0.24-0.6 días) darían varias vueltas
+        # por fotograma a 1 día por paso y las partículas parecerían saltar
+        # al azar; estos son escénicos, como los de las lunas (30 días), con
+        # la relación de Kepler entre el borde interior y el exterior
+        "rings": {
+            "count": 25000, "inner": 22, "outer": 40, "inner_period": 30, "outer_period": 75,
+            "color": (210, 190, 150), "inclination": 0.05, "color_variation": 0.25,
+            "plane_inclination": 26.7, "plane_node": 169.5, "seed": 6
+        }
     },
     "Uranus": {
+        "name": "Urano",
+        "distance": 340, "radius": 14, "color": (180, 220, 255),
+        "orbital_period": 30687, "mass": 4.37e-5,
+        "eccentricity": 0.0463, "inclination": 0.8,
+        "periapsis": 96.998, "ascending_node": 74.006, "mean_anomaly": 142.238,
         "size": 4.01,
         "moons": 27
     },
     "Neptune": {
+        "name": "Neptuno",
+        "distance": 380, "radius": 14, "color": (50, 50, 255),
+        "orbital_period": 60190, "mass": 5.15e-5,
+        "eccentricity": 0.0090, "inclination": 1.8,
+        "periapsis": 273.187, "ascending_node": 131.784, "mean_anomaly": 256.228,
         "size": 3.88,
         "moons": 14
     }
 }
 
+# Cinturones de partículas alrededor del sol, entre las órbitas de la
+# escena: el de asteroides entre Marte y Júpiter y el de Kuiper más allá de
+# Neptuno. Periodos reales en los bordes, excentricidad máxima e inclinación
+# típica en grados.
+belts_data = {
+    "Asteroid belt": {
+        "name": "Cinturón de asteroides",
+        "count": 40000, "inner": 185, "outer": 215, "inner_period": 1100, "outer_period": 2200,
+        "color": (150, 140, 125), "eccentricity": 0.15, "inclination": 8.0,
+        "color_variation": 0.35, "seed": 1
+    },
+    "Kuiper belt": {
+        "name": "Cinturón de Kuiper",
+        "count": 35000, "inner": 430, "outer": 520, "inner_period": 60000, "outer_period": 130000,
+        "color": (120, 140, 170), "eccentricity": 0.1, "inclination": 10.0,
+        "color_variation": 0.35, "seed": 2
+    }
+}
+
 def load_planets_data():
-    return planets_data
\ No newline at end of file
+    return planets_data
+
+def load_belts_data():
+    return belts_data
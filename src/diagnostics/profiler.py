@@ -0,0 +1,156 @@
+import csv
+import json
+import time
+import numpy as np
+
+PROFILE_CAPACITY = 600  # Fotogramas guardados (10 s a 60 FPS)
+MAX_PHASES = 32
+PERCENTILES = (50, 95, 99)
+
+
+class _NullSection:
+    """Contexto vacío que se devuelve cuando el perfilador está apagado."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class _Section:
+    __slots__ = ("samples", "column", "start")
+
+    def __init__(self, samples, column):
+        self.samples = samples
+        self.column = column
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples[self.column] += time.perf_counter() - self.start
+        return False
+
+
+class FrameProfiler:
+    """
+    Tiempos por fase de cada fotograma en un búfer circular de tamaño fijo.
+
+    Cada fila del búfer es un fotograma y cada columna una fase con nombre
+    (p. ej. "render" o "update.simulate"); si una fase se repite dentro del
+    mismo fotograma sus tiempos se suman. Los nombres con punto son
+    subfases y su tiempo ya está incluido en la fase padre.
+
+    Apagado, `section` devuelve siempre el mismo contexto vacío, así que
+    instrumentar el código solo cuesta una llamada por fase.
+
+    Args:
+        capacity: Número de fotogramas que se conservan
+        enabled: Empezar grabando
+    """
+    def __init__(self, capacity=PROFILE_CAPACITY, enabled=False):
+        self.capacity = capacity
+        self.enabled = enabled
+        self.phases = []  # Nombres de las columnas, en orden de aparición
+        self._columns = {}
+        self.samples = np.zeros((capacity, MAX_PHASES))  # Segundos
+        self.frames = 0  # Fotogramas grabados desde el último reset
+        self._row = self.samples[0]
+        self._pending = None  # Estado que toma `enabled` en el próximo begin_frame
+
+    def set_enabled(self, enabled):
+        """
+        Enciende o apaga la grabación desde el próximo fotograma: a mitad de
+        uno, las fases restantes caerían en una fila que begin_frame no abrió.
+        """
+        self._pending = enabled
+
+    def begin_frame(self):
+        """Abre la fila del fotograma siguiente (sobrescribe la más antigua)."""
+        if self._pending is not None:
+            self.enabled = self._pending
+            self._pending = None
+        if not self.enabled:
+            return
+        slot = self.frames % self.capacity
+        self._row = self.samples[slot]
+        self._row[:] = 0.0
+        self.frames += 1
+
+    def section(self, name):
+        """Contexto que mide `name` dentro del fotograma actual."""
+        if not self.enabled:
+            return _NULL_SECTION
+        column = self._columns.get(name)
+        if column is None:
+            column = self._add_phase(name)
+        return _Section(self._row, column)
+
+    def _add_phase(self, name):
+        if len(self.phases) == MAX_PHASES:
+            raise ValueError(f"Demasiadas fases en el perfilador (máximo {MAX_PHASES})")
+        column = len(self.phases)
+        self.phases.append(name)
+        self._columns[name] = column
+        return column
+
+    def reset(self):
+        self.frames = 0
+        self.samples[:] = 0.0
+        self._row = self.samples[0]
+
+    @property
+    def recorded(self):
+        return min(self.frames, self.capacity)
+
+    def history(self):
+        """Tiempos en milisegundos (fotogramas × fases), del más antiguo al más reciente."""
+        count = self.recorded
+        if count < self.capacity:
+            rows = self.samples[:count]
+        else:
+            # La fila más antigua es la que se sobrescribirá a continuación
+            rows = np.roll(self.samples, -(self.frames % self.capacity), axis=0)
+        return rows[:, :len(self.phases)] * 1000.0
+
+    def percentiles(self):
+        """{fase: {"p50": ms, "p95": ms, "p99": ms}} sobre los fotogramas guardados."""
+        history = self.history()
+        if not len(history):
+            return {}
+        values = np.percentile(history, PERCENTILES, axis=0)
+        return {name: {f"p{p}": float(values[i, column]) for i, p in enumerate(PERCENTILES)}
+                for column, name in enumerate(self.phases)}
+
+    def dump(self, path):
+        """
+        Guarda los fotogramas grabados para analizarlos fuera de línea.
+        Con extensión `.csv` escribe una fila por fotograma y una columna
+        por fase (ms); si no, un JSON con los percentiles y las muestras.
+        """
+        history = self.history()
+        count = self.recorded
+        first = self.frames - count
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="", encoding="utf-8") as output:
+                writer = csv.writer(output)
+                writer.writerow(["frame"] + self.phases)
+                for offset, row in enumerate(history):
+                    writer.writerow([first + offset] + [f"{value:.4f}" for value in row])
+        else:
+            with open(path, "w", encoding="utf-8") as output:
+                json.dump({"frames": self.frames, "first_frame": first, "unit": "ms",
+                           "percentiles": self.percentiles(),
+                           "samples": {name: history[:, column].round(4).tolist()
+                                       for column, name in enumerate(self.phases)}},
+                          output, indent=1)
+
+
+# Instancia compartida por el bucle principal y el sistema solar
+profiler = FrameProfiler()
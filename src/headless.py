@@ -0,0 +1,160 @@
+# headless.py
+#
+# Ejecuta la simulación sin abrir ventana, para granjas de render y CI.
+#
+#   python src/headless.py --frames 10000 --moons 50
+#   python src/headless.py --frames 500 --offscreen egl --width 1280 --height 720
+#   python src/headless.py --frames 600 --offscreen egl --export fotogramas/
+
+import argparse
+import json
+import sys
+import time
+
+from animation.offscreen import BACKENDS, select_platform
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sistema Solar 3D sin ventana")
+    parser.add_argument("--frames", type=int, default=1000,
+                        help="Número de fotogramas a simular (por defecto 1000)")
+    parser.add_argument("--moons", type=int, default=0,
+                        help="Lunas por planeta antes de empezar")
+    parser.add_argument("--planets", metavar="RUTA",
+                        help="Planetas desde un archivo JSON en lugar de data/planets_data.py")
+    parser.add_argument("--catalog", metavar="RUTA", action="append", default=[],
+                        help="Añadir un catálogo de cuerpos menores (.csv o .npy); se puede repetir")
+    parser.add_argument("--no-belts", action="store_true",
+                        help="Sin cinturones de partículas (asteroides, Kuiper, anillos)")
+    parser.add_argument("--time-factor", type=float, default=1.0,
+                        help="Días simulados por fotograma")
+    parser.add_argument("--gravity", action="store_true",
+                        help="Usar el modo gravitatorio (N cuerpos, Barnes-Hut)")
+    parser.add_argument("--ephemeris", metavar="RUTA",
+                        help="Reproducir desde efemérides precalculadas en RUTA (.npy); "
+                             "se recalculan si no corresponden a la configuración")
+    parser.add_argument("--ephemeris-step", type=float, default=1.0,
+                        help="Resolución de las efemérides en días")
+    parser.add_argument("--offscreen", choices=BACKENDS,
+                        help="Renderizar también en un contexto OpenGL de software")
+    parser.add_argument("--export", metavar="DESTINO",
+                        help="Guardar los fotogramas renderizados (requiere --offscreen): "
+                             "carpeta de PNG o archivo de vídeo con --encoder ffmpeg")
+    parser.add_argument("--encoder", choices=("png", "ffmpeg"), default="png",
+                        help="PNG con Pillow o fotogramas en crudo enviados a ffmpeg")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Hilos de codificación PNG (por defecto uno por CPU)")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="Fotogramas por segundo del vídeo exportado")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--profile", metavar="RUTA",
+                        help="Guardar los tiempos por fase de cada fotograma (.json o .csv)")
+    parser.add_argument("--json", action="store_true",
+                        help="Imprimir el resultado como JSON (para seguimiento de rendimiento)")
+    args = parser.parse_args(argv)
+    if args.export and not args.offscreen:
+        parser.error("--export necesita un contexto de render: añade --offscreen egl u osmesa")
+    return args
+
+
+def run(args):
+    if args.offscreen:
+        # Debe ocurrir antes de que cualquier módulo importe OpenGL
+        select_platform(args.offscreen)
+
+    from models.solar_system import SolarSystem
+    from diagnostics.profiler import profiler
+
+    context = None
+    if args.offscreen:
+        from OpenGL.GL import glFinish
+        from animation.offscreen import OffscreenContext
+        from animation.renderer import Renderer
+        from animation.scene import init_opengl, render_scene
+
+        context = OffscreenContext(args.offscreen, args.width, args.height)
+        init_opengl(args.width, args.height)
+
+    solar_system = SolarSystem(args.planets)
+    solar_system.set_belts_enabled(not args.no_belts)
+    catalog_start = time.perf_counter()
+    for path in args.catalog:
+        solar_system.load_catalog(path)
+    catalog_seconds = time.perf_counter() - catalog_start
+    solar_system.time_factor = args.time_factor
+    for planet in solar_system.planets:
+        planet.set_number_of_moons(args.moons)
+    renderer = Renderer(solar_system) if context else None
+    if args.gravity:
+        solar_system.set_simulation_mode("gravity")
+    ephemeris = None
+    if args.ephemeris:
+        ephemeris_start = time.perf_counter()
+        cache = solar_system.precompute_ephemeris(args.ephemeris, 0.0, args.frames * args.time_factor,
+                                                  args.ephemeris_step)
+        ephemeris = {"built": cache.built, "samples": cache.samples,
+                     "seconds": time.perf_counter() - ephemeris_start}
+
+    exporter = None
+    if args.export:
+        from animation.exporter import FrameExporter
+        exporter = FrameExporter(args.export, args.width, args.height, encoder=args.encoder,
+                                 workers=args.workers, fps=args.fps)
+
+    profiler.enabled = bool(args.profile)
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        profiler.begin_frame()
+        with profiler.section("update"):
+            solar_system.update()
+        if context:
+            with profiler.section("render"):
+                render_scene(renderer, 1.0)
+        if exporter:
+            with profiler.section("export"):
+                exporter.capture()
+    if exporter:
+        exporter.close()  # Incluye esperar a que se escriban todos los fotogramas
+    if context:
+        glFinish()  # Esperar a que el renderizador termine antes de medir
+    elapsed = time.perf_counter() - start
+    if args.profile:
+        profiler.dump(args.profile)
+
+    result = {
+        "frames": args.frames,
+        "bodies": solar_system.engine.count,
+        "particles": sum(belt.active for belt in solar_system.belts) if solar_system.belts_enabled else 0,
+        "mode": solar_system.simulation_mode,
+        "ephemeris": ephemeris,
+        "catalog_seconds": catalog_seconds if args.catalog else None,
+        "offscreen": args.offscreen,
+        "export": args.export,
+        "seconds": elapsed,
+        "frames_per_second": args.frames / elapsed if elapsed > 0 else float("inf"),
+        "simulated_years": args.frames * args.time_factor / 365.0,
+    }
+
+    if renderer:
+        renderer.release()
+    solar_system.cleanup()  # También termina los procesos del cálculo de fuerzas
+    if context:
+        context.destroy()
+    return result
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = run(args)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        mode = f"render {args.offscreen}" if args.offscreen else "solo simulación"
+        print(f"{result['frames']} fotogramas ({mode}, {result['bodies']} cuerpos) "
+              f"en {result['seconds']:.3f} s: {result['frames_per_second']:.1f} fps, "
+              f"{result['simulated_years']:.2f} años simulados")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
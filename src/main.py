@@ -6,9 +6,19 @@ from OpenGL.GL import *
 from OpenGL.GLU import *
 import sys
 import math
+import argparse
 
 from models.solar_system import SolarSystem
+from data.loader import load_config, project_path
+from animation.renderer import Renderer
+from animation.scene import init_opengl, render_scene
 from ui.control_panel import ControlPanel
+from ui.hud import CachedText, get_font
+from ui.overlay import GLOverlay
+from animation.exporter import ENCODERS, FrameExporter, export_animation
+from animation.quality import QUALITY_TIERS, QualityGovernor
+from diagnostics.profiler import profiler
+from ui.profiler_graph import ProfilerGraph
 
 # Clase para los botones interactivos
 class Button:
@@ -19,51 +29,143 @@ class Button:
         self.hover_color = hover_color
         self.is_hovered = False
         self.text_color = text_color
+        self.label = None  # Texto renderizado una sola vez por fuente
+        self.image = None  # Imagen del botón para la capa de interfaz
+        self.dirty = True
         
-    def draw(self, surface, font):
+    def draw(self, surface, font, rect=None):
         # Dibujar el botón con efecto hover
+        rect = rect or self.rect
         current_color = self.hover_color if self.is_hovered else self.color
-        pygame.draw.rect(surface, current_color, self.rect)
-        pygame.draw.rect(surface, (255, 255, 255), self.rect, 2)  # Borde blanco
+        pygame.draw.rect(surface, current_color, rect)
+        pygame.draw.rect(surface, (255, 255, 255), rect, 2)  # Borde blanco
         
         # Dibujar el texto con el color especificado
-        text_surface = font.render(self.text, True, self.text_color)
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        surface.blit(text_surface, text_rect)
+        if self.label is None or self.label.font is not font:
+            self.label = CachedText(font, self.text_color, self.text)
+        text_rect = self.label.surface.get_rect(center=rect.center)
+        surface.blit(self.label.surface, text_rect)
+        
+    def render_overlay(self, overlay, font, key):
+        # Solo se vuelve a dibujar cuando cambia su estado de hover
+        if self.dirty or overlay.is_new(key):
+            if self.image is None:
+                self.image = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            self.draw(self.image, font, self.image.get_rect())
+            overlay.put(key, self.image, self.rect.topleft)
+            self.dirty = False
         
     def check_hover(self, mouse_pos):
         # Verifica si el ratón está sobre el botón
-        self.is_hovered = self.rect.collidepoint(mouse_pos)
+        hovered = self.rect.collidepoint(mouse_pos)
+        if hovered != self.is_hovered:
+            self.dirty = True
+        self.is_hovered = hovered
         return self.is_hovered
         
     def is_clicked(self, mouse_pos, clicked):
         # Verifica si el botón fue clickeado
         return self.rect.collidepoint(mouse_pos) and clicked
 
-def init_opengl(width, height):
-    # Configurar vista 3D
-    glViewport(0, 0, width, height)
-    glMatrixMode(GL_PROJECTION)
-    glLoadIdentity()
-    gluPerspective(45, (width / height), 1, 2000.0)  # Aumentado el valor de lejanía para poder hacer más zoom
-    glMatrixMode(GL_MODELVIEW)
-    glLoadIdentity()
-    
-    # Posición inicial de la cámara
-    gluLookAt(0, -500, 200,  # posición de la cámara
-              0, 0, 0,       # punto al que mira
-              0, 0, 1)       # vector "arriba"
-    
-    # Habilitar iluminación
-    glEnable(GL_LIGHTING)
-    glEnable(GL_LIGHT0)
-    glEnable(GL_COLOR_MATERIAL)
-    glEnable(GL_DEPTH_TEST)
-    glEnable(GL_NORMALIZE)
-    glShadeModel(GL_SMOOTH)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sistema Solar 3D")
+    parser.add_argument("--planets", metavar="RUTA",
+                        help="Planetas desde un archivo JSON en lugar de data/planets_data.py")
+    parser.add_argument("--catalog", metavar="RUTA", action="append", default=[],
+                        help="Añadir un catálogo de cuerpos menores (.csv o .npy); se puede repetir")
+    parser.add_argument("--profile", metavar="RUTA",
+                        help="Grabar los tiempos por fase desde el inicio y guardarlos al salir "
+                             "(.json o .csv según la extensión)")
+    parser.add_argument("--export", metavar="DESTINO",
+                        help="Exportar una animación en lugar de abrir la ventana interactiva: "
+                             "carpeta de PNG o archivo de vídeo con --encoder ffmpeg")
+    parser.add_argument("--encoder", choices=ENCODERS, default="png",
+                        help="PNG con Pillow o fotogramas en crudo enviados a ffmpeg")
+    parser.add_argument("--frames", type=int, default=600,
+                        help="Número de fotogramas a exportar")
+    parser.add_argument("--time-factor", type=float, default=1.0,
+                        help="Días simulados por fotograma exportado")
+    parser.add_argument("--moons", type=int, default=None,
+                        help="Lunas por planeta al empezar (por defecto, planets.default_moons de config.json)")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Hilos de codificación PNG (por defecto uno por CPU)")
+    parser.add_argument("--fps", type=int, default=None,
+                        help="Fotogramas por segundo del vídeo exportado (por defecto, "
+                             "animation.frame_rate de config.json)")
+    parser.add_argument("--checkpoint", metavar="RUTA",
+                        help="Empezar desde un estado guardado (F5 en la ventana)")
+    parser.add_argument("--quality", choices=[tier["name"] for tier in QUALITY_TIERS],
+                        help="Fijar el nivel de calidad en lugar de ajustarlo al presupuesto por fotograma")
+    parser.add_argument("--no-worker", action="store_true",
+                        help="Simular en el proceso de la ventana aunque simulation.worker "
+                             "de config.json esté activado")
+    return parser.parse_args(argv)
+
+def load_system(args, config):
+    """
+    Crea el sistema solar a partir de los archivos indicados en la línea de
+    comandos y de los valores por defecto de config.json.
+
+    Args:
+        args: Argumentos de parse_args (--planets, --catalog, --moons, --checkpoint)
+        config: Configuración leída con load_config
+    """
+    solar_system = SolarSystem(args.planets)
+    for path in args.catalog:
+        solar_system.load_catalog(path)
+    solar_system.set_belt_density(config["belts"]["density"])
+    solar_system.set_belts_enabled(config["belts"]["enabled"])
+    moons = args.moons if args.moons is not None else config["planets"]["default_moons"]
+    if moons:
+        for planet in solar_system.planets:
+            planet.set_number_of_moons(moons)
+    if args.checkpoint:
+        solar_system.load_checkpoint(args.checkpoint)
+    return solar_system
 
-def main():
+def apply_quality(tier, renderer, solar_system, config):
+    """
+    Aplica un nivel de animation/quality.py: detalle de las esferas y
+    distancia de las lunas en el Renderer, segmentos de las órbitas y
+    densidad de los cinturones (relativa a belts.density) en el modelo.
+    """
+    renderer.set_quality(tier)
+    solar_system.set_orbit_segments(tier["orbit_segments"])
+    solar_system.set_belt_density(config["belts"]["density"] * tier["belt_density"])
+
+def export(args, config):
+    # Ventana oculta: solo se necesita el contexto OpenGL. Se lee del buffer
+    # trasero, así que no hace falta mostrar ni esperar a la pantalla
     pygame.init()
+    display = (args.width, args.height)
+    pygame.display.set_mode(display, DOUBLEBUF | OPENGL | pygame.HIDDEN)
+    init_opengl(display[0], display[1])
+    
+    solar_system = load_system(args, config)
+    solar_system.time_factor = args.time_factor
+    
+    renderer = Renderer(solar_system)
+    
+    exporter = FrameExporter(args.export, display[0], display[1], encoder=args.encoder,
+                             workers=args.workers, fps=args.fps or config["animation"]["frame_rate"])
+    export_animation(solar_system, exporter, args.frames, lambda: render_scene(renderer, 1.0))
+    print(f"{exporter.frames} fotogramas exportados en {args.export}")
+    
+    renderer.release()
+    solar_system.cleanup()
+    pygame.quit()
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = load_config()
+    if args.export:
+        export(args, config)
+        return
+    
+    pygame.init()
+    profiler.enabled = bool(args.profile)
     
     # Obtener información sobre la pantalla
     info = pygame.display.Info()
@@ -88,154 +190,194 @@ def main():
     init_opengl(display[0], display[1])
     
     # Inicializar el sistema solar
-    solar_system = SolarSystem()
+    solar_system = load_system(args, config)
+    if config["simulation"]["worker"] and not args.no_worker:
+        # La simulación avanza en otro proceso; aquí solo se interpola y se dibuja
+        solar_system.start_worker()
+    renderer = Renderer(solar_system)  # Recursos de OpenGL, separados del modelo
     control_panel = ControlPanel(solar_system)
+    control_panel.max_moons = config["planets"]["max_moons"]
+    control_panel.checkpoint_directory = project_path(config["checkpoints"]["directory"])
+    frame_rate = config["animation"]["frame_rate"]
+    
+    # Nivel de calidad ajustado al presupuesto de 1 / frame_rate por fotograma
+    governor = QualityGovernor(frame_rate, args.quality or config["quality"]["tier"],
+                               adaptive=config["quality"]["adaptive"] and not args.quality)
+    apply_quality(governor.tier, renderer, solar_system, config)
+    # Fotogramas desde la última actualización de la interfaz; con el
+    # intervalo completo se recompone y se sube en el siguiente fotograma
+    hud_frame = governor.tier["hud_interval"]
     
     # Variable para controlar el zoom
     zoom_level = 1.0
     
-    # Inicializar contador de años
+    # Inicializar contador de años (relativo al tiempo simulado del sistema)
     elapsed_years = 0.0
+    years_origin_days = 0.0
     
     # Crear botones interactivos
-    button_font = pygame.font.SysFont('Arial', 18)
+    button_font = get_font('Arial', 18)
     speed_up_button = Button(display[0] - 130, 10, 120, 30, "Velocidad +", (50, 120, 200))
     speed_down_button = Button(display[0] - 130, 50, 120, 30, "Velocidad -", (50, 120, 200))
     reset_button = Button(display[0] - 130, 90, 120, 30, "Reset", (200, 80, 80))
+    # Un clic sobre los botones no debe seleccionar el cuerpo que hay detrás
+    control_panel.ignore_rects = [speed_up_button.rect, speed_down_button.rect, reset_button.rect]
+    
+    # Capa de interfaz compuesta como textura OpenGL
+    overlay = GLOverlay(display)
+    
+    # Textos de información cacheados (fuentes cargadas una sola vez)
+    years_label = CachedText(get_font('Arial', 18), (255, 255, 255))
+    speed_label = CachedText(get_font('Arial', 18), (255, 255, 255))
+    zoom_label = CachedText(get_font('Arial', 16), (255, 255, 255))
+    quality_label = CachedText(get_font('Arial', 16), (255, 255, 255))
+    
+    # Gráfica de tiempos por fase (F3), con el mismo presupuesto que el regulador de calidad
+    profiler_graph = ProfilerGraph(profiler, budget_ms=1000.0 * governor.budget)
     
     clock = pygame.time.Clock()
     running = True
+    frame_seconds = 0.0
     
     while running:
+        profiler.begin_frame()
+        governor.begin_frame()
         mouse_pos = pygame.mouse.get_pos()
         mouse_clicked = False
         
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                # Permitir salir de pantalla completa con ESC
-                if event.key == pygame.K_ESCAPE and fullscreen:
+        with profiler.section("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
                     running = False
-                # Alternar entre pantalla completa y ventana con F11
-                elif event.key == pygame.K_F11:
-                    fullscreen = not fullscreen
-                    if fullscreen:
-                        display = (screen_width, screen_height)
-                        pygame.display.set_mode(display, DOUBLEBUF | OPENGL | FULLSCREEN)
-                    else:
-                        display = (int(screen_width * 0.9), int(screen_height * 0.9))
-                        pygame.display.set_mode(display, DOUBLEBUF | OPENGL)
-                    init_opengl(display[0], display[1])
+                elif event.type == pygame.KEYDOWN:
+                    # Permitir salir de pantalla completa con ESC
+                    if event.key == pygame.K_ESCAPE and fullscreen:
+                        running = False
+                    # Alternar entre pantalla completa y ventana con F11
+                    elif event.key == pygame.K_F11:
+                        fullscreen = not fullscreen
+                        if fullscreen:
+                            display = (screen_width, screen_height)
+                            pygame.display.set_mode(display, DOUBLEBUF | OPENGL | FULLSCREEN)
+                        else:
+                            display = (int(screen_width * 0.9), int(screen_height * 0.9))
+                            pygame.display.set_mode(display, DOUBLEBUF | OPENGL)
+                        init_opengl(display[0], display[1])
+                        overlay.resize(display)
+                        renderer.invalidate()  # El contexto puede haberse recreado
+                        hud_frame = governor.tier["hud_interval"]  # Subir la capa nueva ya
+                    # Mostrar u ocultar la gráfica de tiempos por fase
+                    elif event.key == pygame.K_F3:
+                        profiler_graph.toggle()
             
-            # Manejo del scroll del mouse para zoom
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Botón izquierdo
-                    mouse_clicked = True
-                elif event.button == 4:  # Scroll hacia arriba
-                    zoom_level *= 1.1  # Acercar un 10%
-                elif event.button == 5:  # Scroll hacia abajo
-                    zoom_level *= 0.9  # Alejar un 10%
-                    
-            control_panel.handle_event(event)
-        
-        # Actualizar estado de los botones
-        speed_up_button.check_hover(mouse_pos)
-        speed_down_button.check_hover(mouse_pos)
-        reset_button.check_hover(mouse_pos)
-        
-        # Verificar clics en botones
-        if mouse_clicked:
-            if speed_up_button.is_clicked(mouse_pos, True):
-                solar_system.time_factor *= 2.0  # Duplicar velocidad
-            elif speed_down_button.is_clicked(mouse_pos, True):
-                solar_system.time_factor /= 2.0  # Reducir velocidad a la mitad
-            elif reset_button.is_clicked(mouse_pos, True):
-                solar_system.time_factor = 1.0  # Restaurar velocidad original
-                elapsed_years = 0.0  # Reiniciar contador de años
+                # Manejo del scroll del mouse para zoom
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    if event.button == 1:  # Botón izquierdo
+                        mouse_clicked = True
+                    elif event.button == 4:  # Scroll hacia arriba
+                        zoom_level *= 1.1  # Acercar un 10%
+                    elif event.button == 5:  # Scroll hacia abajo
+                        zoom_level *= 0.9  # Alejar un 10%
+            
+                control_panel.handle_event(event)
+            
+            # Actualizar estado de los botones
+            speed_up_button.check_hover(mouse_pos)
+            speed_down_button.check_hover(mouse_pos)
+            reset_button.check_hover(mouse_pos)
+            
+            # Verificar clics en botones
+            if mouse_clicked:
+                if speed_up_button.is_clicked(mouse_pos, True):
+                    solar_system.time_factor *= 2.0  # Duplicar velocidad
+                elif speed_down_button.is_clicked(mouse_pos, True):
+                    solar_system.time_factor /= 2.0  # Reducir velocidad a la mitad
+                elif reset_button.is_clicked(mouse_pos, True):
+                    solar_system.time_factor = 1.0  # Restaurar velocidad original
+                    years_origin_days = solar_system.elapsed_days  # Reiniciar contador de años
         
         # Procesar entradas continuas
-        control_panel.handle_user_input()
+        with profiler.section("input"):
+            control_panel.handle_user_input()
         
-        # Actualizar sistema solar
-        solar_system.update()
+        # Actualizar sistema solar con paso fijo según el tiempo real transcurrido
+        with profiler.section("update"):
+            solar_system.advance(frame_seconds)
         
         # Actualizar contador de años (basado en días terrestres)
-        elapsed_years += (solar_system.time_factor * 1.0) / 365.0
-        
-        # Limpiar la pantalla y buffer de profundidad
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        elapsed_years = (solar_system.elapsed_days - years_origin_days) / 365.0
         
         # Renderizar la parte 3D con OpenGL
-        glMatrixMode(GL_MODELVIEW)
-        glLoadIdentity()
-        
-        # Aplicar zoom a la cámara
-        camera_distance = 500 / zoom_level
-        camera_height = 200 / zoom_level
-        
-        gluLookAt(0, -camera_distance, camera_height,
-                  0, 0, 0,
-                  0, 0, 1)
-        
-        # Renderizar sistema solar
-        solar_system.render()
+        with profiler.section("render"):
+            render_scene(renderer, zoom_level)
         
         # Guardar y restaurar el estado de OpenGL antes de dibujar la interfaz 2D
-        glMatrixMode(GL_PROJECTION)
-        glPushMatrix()
-        glLoadIdentity()
-        gluOrtho2D(0, display[0], display[1], 0)
-        glMatrixMode(GL_MODELVIEW)
-        glPushMatrix()
-        glLoadIdentity()
-        
-        glDisable(GL_LIGHTING)
-        glDisable(GL_DEPTH_TEST)
-        
-        # Ahora renderizamos directamente en la pantalla sin usar overlay
-        screen = pygame.display.get_surface()
-        
-        # Dibujar botones directamente
-        speed_up_button.draw(screen, button_font)
-        speed_down_button.draw(screen, button_font)
-        reset_button.draw(screen, button_font)
-        
-        # Mostrar información en la interfaz
-        font = pygame.font.SysFont('Arial', 18)
-        info_font = pygame.font.SysFont('Arial', 16)
-        
-        # Mostrar años transcurridos con texto blanco brillante
-        years_text = f"Años transcurridos: {elapsed_years:.2f}"
-        years_surface = font.render(years_text, True, (255, 255, 255))
-        screen.blit(years_surface, (10, 10))
-        
-        # Mostrar velocidad actual con texto blanco brillante
-        speed_text = f"Velocidad: {solar_system.time_factor:.1f}x"
-        speed_surface = font.render(speed_text, True, (255, 255, 255))
-        screen.blit(speed_surface, (10, 40))
-        
-        # Cambiar el nivel de zoom a blanco puro en lugar de gris
-        zoom_text = f"Zoom: {zoom_level:.1f}x"
-        zoom_surface = info_font.render(zoom_text, True, (255, 255, 255))  # Cambiado a blanco puro
-        screen.blit(zoom_surface, (10, display[1] - 30))
-        
-        control_panel.render(screen)  # Renderizar texto directamente en la pantalla
-        
-        # Restaurar el estado de OpenGL para la próxima iteración
-        glMatrixMode(GL_PROJECTION)
-        glPopMatrix()
-        glMatrixMode(GL_MODELVIEW)
-        glPopMatrix()
-        
-        glEnable(GL_DEPTH_TEST)
-        glEnable(GL_LIGHTING)
+        with profiler.section("hud"):
+            glMatrixMode(GL_PROJECTION)
+            glPushMatrix()
+            glLoadIdentity()
+            gluOrtho2D(0, display[0], display[1], 0)
+            glMatrixMode(GL_MODELVIEW)
+            glPushMatrix()
+            glLoadIdentity()
+            
+            glDisable(GL_LIGHTING)
+            glDisable(GL_DEPTH_TEST)
+            
+            # La capa de interfaz se recompone cada `hud_interval` fotogramas
+            # según el nivel de calidad; en los demás se dibuja la anterior
+            hud_frame += 1
+            if hud_frame >= governor.tier["hud_interval"]:
+                hud_frame = 0
+                # Los widgets solo actualizan la capa de interfaz cuando cambian
+                speed_up_button.render_overlay(overlay, button_font, "speed_up")
+                speed_down_button.render_overlay(overlay, button_font, "speed_down")
+                reset_button.render_overlay(overlay, button_font, "reset")
+                
+                # Mostrar información en la interfaz; los textos solo se vuelven a
+                # renderizar cuando cambia su valor
+                if years_label.update(f"Años transcurridos: {elapsed_years:.2f}") or overlay.is_new("years"):
+                    overlay.put("years", years_label.surface, (10, 10))
+                if speed_label.update(f"Velocidad: {solar_system.time_factor:.1f}x") or overlay.is_new("speed"):
+                    overlay.put("speed", speed_label.surface, (10, 40))
+                if quality_label.update(governor.label()) or overlay.is_new("quality"):
+                    overlay.put("quality", quality_label.surface, (10, 70))
+                if zoom_label.update(f"Zoom: {zoom_level:.1f}x") or overlay.is_new("zoom"):
+                    overlay.put("zoom", zoom_label.surface, (10, display[1] - 30))
+                
+                control_panel.render_overlay(overlay)  # El panel queda por encima del resto
+                profiler_graph.render_overlay(overlay)
+                
+                # Subir solo las regiones modificadas
+                overlay.upload()
+            # Dibujar la capa como un quad
+            overlay.draw()
+            
+            # Restaurar el estado de OpenGL para la próxima iteración
+            glMatrixMode(GL_PROJECTION)
+            glPopMatrix()
+            glMatrixMode(GL_MODELVIEW)
+            glPopMatrix()
+            
+            glEnable(GL_DEPTH_TEST)
+            glEnable(GL_LIGHTING)
         
         # Actualizar pantalla
-        pygame.display.flip()
-        clock.tick(60)  # Limitar a 60 FPS
+        governor.end_work()  # Sin flip: con sincronía vertical espera al monitor
+        with profiler.section("flip"):
+            pygame.display.flip()
+        # Medir el trabajo del fotograma (sin la espera) y ajustar la calidad
+        if governor.end_frame():
+            apply_quality(governor.tier, renderer, solar_system, config)
+            hud_frame = governor.tier["hud_interval"]  # Mostrar el nuevo nivel sin esperar al intervalo
+        with profiler.section("wait"):
+            frame_seconds = clock.tick(frame_rate) / 1000.0  # Limitar los FPS y medir el fotograma
     
     # Limpieza de recursos
+    if args.profile:
+        profiler.dump(args.profile)
+    overlay.release()
+    renderer.release()
     solar_system.cleanup()
     pygame.quit()
     sys.exit()
@@ -0,0 +1,173 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+CHECKPOINT_MAGIC = b"SSCK"
+CHECKPOINT_VERSION = 1
+ALIGNMENT = 8  # Cada columna empieza en un múltiplo de 8 bytes
+
+# Columnas del motor que definen el estado en el modo cinemático: con ellas
+# y el instante, las posiciones se recalculan en forma cerrada al restaurar
+ELEMENT_COLUMNS = ("phase", "orbital_period", "distance", "eccentricity", "inclination",
+                   "periapsis", "ascending_node", "parent", "radius", "color", "mass", "catalog")
+# En el modo gravitatorio el estado es además la posición y la velocidad
+GRAVITY_COLUMNS = ("position", "velocity", "dynamic")
+
+
+class Checkpoint:
+    """
+    Copia del estado de un SolarSystem: instante, velocidad, vista, modo de
+    simulación y las filas del motor, sin objetos Planet/Moon.
+
+    Las filas se guardan en orden canónico: primero los planetas, después
+    las lunas de cada planeta en el orden de su lista y al final los cuerpos
+    de catálogo, con los índices de padre renumerados. Así, al restaurar,
+    las lunas se vuelven a asociar a su planeta solo con `header["moons"]`.
+
+    Args:
+        header: Datos escalares (se escriben como JSON)
+        columns: Arreglo de cada columna del motor, una fila por cuerpo
+    """
+    def __init__(self, header, columns):
+        self.header = header
+        self.columns = columns
+
+    @property
+    def count(self):
+        return self.header["count"]
+
+
+def capture(solar_system):
+    """
+    Copia el estado actual de `solar_system` en un Checkpoint. Solo copia
+    arreglos (sin tocar el disco), así que se puede llamar en mitad de un
+    fotograma y escribir el resultado en segundo plano.
+    """
+    engine = solar_system.engine
+    n = engine.count
+    rows = [planet.engine_index for planet in solar_system.planets]
+    moons = []
+    for planet in solar_system.planets:
+        rows.extend(moon.engine_index for moon in planet.moons)
+        moons.append(len(planet.moons))
+    order = np.concatenate((np.array(rows, dtype=np.int64), np.flatnonzero(engine.catalog[:n])))
+    if len(order) != n:
+        raise ValueError("Hay filas del motor que no pertenecen a ningún planeta ni catálogo")
+    renumber = np.empty(n, dtype=np.int64)
+    renumber[order] = np.arange(n)
+
+    gravity = solar_system.gravity
+    names = ELEMENT_COLUMNS + (GRAVITY_COLUMNS if gravity is not None else ())
+    columns = {name: getattr(engine, name)[order] for name in names}  # Índices de lista: copias
+    parent = columns["parent"]
+    orbiting = parent >= 0
+    parent[orbiting] = renumber[parent[orbiting]]
+
+    header = {
+        "version": CHECKPOINT_VERSION,
+        "time": engine.time,
+        "time_factor": solar_system.time_factor,
+        "rotation": [solar_system.rotation_x, solar_system.rotation_y],
+        "simulation_mode": solar_system.simulation_mode,
+        "planets": [planet.name for planet in solar_system.planets],
+        "moons": moons,
+        "count": n,
+        "gravity": None,
+    }
+    if gravity is not None:
+        header["gravity"] = {"sun_position": gravity.sun_position.tolist(),
+                             "sun_velocity": gravity.sun_velocity.tolist(),
+                             "shortest_period": gravity.shortest_period}
+    return Checkpoint(header, columns)
+
+
+def write_checkpoint(path, checkpoint):
+    """
+    Escribe un Checkpoint en formato binario: firma, longitud y cabecera
+    JSON (con el tipo y la forma de cada columna) y después los bytes de
+    cada columna alineados a 8. Se escribe en un archivo temporal que
+    sustituye al anterior al terminar, así que nunca queda uno a medias.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    header = dict(checkpoint.header)
+    header["columns"] = [[name, array.dtype.str, list(array.shape[1:])]
+                         for name, array in checkpoint.columns.items()]
+    encoded = json.dumps(header).encode("utf-8")
+    encoded += b" " * (-(len(CHECKPOINT_MAGIC) + 4 + len(encoded)) % ALIGNMENT)
+
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as output:
+        output.write(CHECKPOINT_MAGIC)
+        output.write(np.uint32(len(encoded)).tobytes())
+        output.write(encoded)
+        for array in checkpoint.columns.values():
+            data = np.ascontiguousarray(array).tobytes()
+            output.write(data)
+            output.write(b"\0" * (-len(data) % ALIGNMENT))
+    os.replace(temporary, path)
+
+
+def read_checkpoint(path):
+    """Lee un archivo escrito por write_checkpoint (las columnas son vistas de un único búfer)."""
+    with open(path, "rb") as source:
+        data = source.read()
+    if data[:len(CHECKPOINT_MAGIC)] != CHECKPOINT_MAGIC:
+        raise ValueError(f"{path} no es un estado guardado")
+    offset = len(CHECKPOINT_MAGIC) + 4
+    length = int(np.frombuffer(data, np.uint32, 1, len(CHECKPOINT_MAGIC))[0])
+    header = json.loads(data[offset:offset + length].decode("utf-8"))
+    if header.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"{path}: versión de estado guardado no compatible")
+    offset += length
+
+    columns = {}
+    count = header["count"]
+    for name, dtype, shape in header.pop("columns"):
+        dtype = np.dtype(dtype)
+        shape = (count, *shape)
+        items = int(np.prod(shape))
+        columns[name] = np.frombuffer(data, dtype, items, offset).reshape(shape)
+        offset += items * dtype.itemsize
+        offset += -offset % ALIGNMENT
+    return Checkpoint(header, columns)
+
+
+class CheckpointStore:
+    """
+    Escribe estados guardados en segundo plano y guarda en memoria los
+    últimos leídos o escritos, para que volver a cargarlos sea inmediato.
+
+    Las escrituras van a un único hilo en el orden en que se piden; la
+    lectura de un archivo que aún se está escribiendo usa la copia en
+    memoria, sin esperar al disco.
+    """
+    def __init__(self):
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        self.writes = {}  # Ruta -> Future de su última escritura
+        self.recent = {}  # Ruta -> último Checkpoint leído o escrito
+
+    def save(self, path, checkpoint):
+        self.recent[path] = checkpoint
+        self.writes[path] = self.pool.submit(write_checkpoint, path, checkpoint)
+
+    def load(self, path):
+        checkpoint = self.recent.get(path)
+        if checkpoint is None:
+            checkpoint = self.recent[path] = read_checkpoint(path)
+        return checkpoint
+
+    def state(self, path):
+        """"saving", "saved", "failed" o None si no se ha guardado en esta sesión."""
+        future = self.writes.get(path)
+        if future is None:
+            return None
+        if not future.done():
+            return "saving"
+        return "failed" if future.exception() is not None else "saved"
+
+    def close(self):
+        # Terminar las escrituras pendientes antes de salir
+        self.pool.shutdown(wait=True)
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import math
+import os
+import numpy as np
+
+EPHEMERIS_VERSION = 1
+CHUNK_BYTES = 64 * 1024 * 1024  # Memoria máxima por bloque al precalcular
+
+
+def configuration_hash(engine):
+    """
+    Huella de la configuración del sistema: número de filas y todas las
+    columnas que definen las trayectorias. Si cambia, las efemérides
+    guardadas ya no sirven.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{EPHEMERIS_VERSION}:{engine.count}".encode())
+    for name in engine.ELEMENT_COLUMNS:
+        digest.update(np.ascontiguousarray(getattr(engine, name)[:engine.count]).tobytes())
+    return digest.hexdigest()
+
+
+class EphemerisCache:
+    """
+    Posiciones precalculadas de todos los cuerpos en un archivo `.npy`
+    mapeado en memoria, de forma (muestras, cuerpos, 3) en float32.
+
+    Junto al archivo se guarda un `.json` con la huella de la configuración,
+    el rango y la resolución. Al reproducir solo se leen las dos muestras
+    que rodean cada instante, así que el sistema operativo carga el archivo
+    página a página aunque cubra siglos.
+
+    Args:
+        path: Ruta del archivo `.npy`
+    """
+    def __init__(self, path):
+        self.path = path
+        self.metadata_path = os.path.splitext(path)[0] + ".json"
+        self.positions = None
+        self.start = 0.0
+        self.step = 1.0
+        self.samples = 0
+        self.config = None
+        self.built = False  # True si se calculó en esta sesión (no se reutilizó)
+
+    def matches(self, engine, start, end, step):
+        """True si el archivo existe, es de esta configuración y cubre [start, end] con `step`."""
+        metadata = self._read_metadata()
+        if metadata is None or not os.path.exists(self.path):
+            return False
+        last = metadata["start"] + metadata["step"] * (metadata["samples"] - 1)
+        return (metadata["version"] == EPHEMERIS_VERSION
+                and metadata["config"] == configuration_hash(engine)
+                and metadata["step"] <= step
+                and metadata["start"] <= start and last >= end)
+
+    def build(self, engine, start, end, step):
+        """
+        Calcula las posiciones de [start, end] cada `step` días y las escribe
+        por bloques, sin tener nunca el rango completo en memoria. El estado
+        del motor no se modifica.
+        """
+        samples = max(2, int(math.ceil((end - start) / step)) + 1)
+        bodies = engine.count
+        temporary = self.path + ".tmp.npy"
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        output = np.lib.format.open_memmap(temporary, mode="w+", dtype=np.float32,
+                                           shape=(samples, bodies, 3))
+        chunk = max(1, CHUNK_BYTES // max(1, bodies * 3 * 8))
+        for first in range(0, samples, chunk):
+            last = min(samples, first + chunk)
+            times = start + step * np.arange(first, last)
+            output[first:last] = engine.evaluate(times)
+        output.flush()
+        del output
+
+        # Reemplazar al final: un archivo a medio escribir nunca parece válido
+        if os.path.exists(self.metadata_path):
+            os.remove(self.metadata_path)
+        os.replace(temporary, self.path)
+        with open(self.metadata_path, "w", encoding="utf-8") as metadata:
+            json.dump({"version": EPHEMERIS_VERSION, "config": configuration_hash(engine),
+                       "start": start, "step": step, "samples": samples, "bodies": bodies}, metadata)
+        self.built = True
+        self.open()
+
+    def open(self):
+        """Mapea el archivo en memoria (solo lectura) sin cargarlo."""
+        metadata = self._read_metadata()
+        self.positions = np.load(self.path, mmap_mode="r")
+        self.start = metadata["start"]
+        self.step = metadata["step"]
+        self.samples = metadata["samples"]
+        self.config = metadata["config"]
+
+    def covers(self, time):
+        return self.positions is not None and self.start <= time <= self.end
+
+    @property
+    def end(self):
+        return self.start + self.step * (self.samples - 1)
+
+    def positions_at(self, time, out=None):
+        """Posiciones en `time` interpoladas linealmente entre las dos muestras vecinas."""
+        index = min(max((time - self.start) / self.step, 0.0), self.samples - 1)
+        first = min(int(index), self.samples - 2)
+        alpha = index - first
+        before = self.positions[first]
+        after = self.positions[first + 1]
+        if out is None:
+            out = np.empty(before.shape)
+        np.subtract(after, before, out=out)
+        out *= alpha
+        out += before
+        return out
+
+    def close(self):
+        self.positions = None
+
+    def _read_metadata(self):
+        try:
+            with open(self.metadata_path, encoding="utf-8") as metadata:
+                return json.load(metadata)
+        except (OSError, ValueError):
+            return None
@@ -0,0 +1,346 @@
+import math
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from models.kepler import solve_kepler, orbit_velocities
+
+THETA = 0.5  # Criterio de apertura (tamaño / distancia); menor es más preciso
+LEAF_SIZE = 16
+SOFTENING = 0.5  # Suavizado en unidades de la escena para evitar fuerzas infinitas
+PARALLEL_THRESHOLD = 20000  # Cuerpos a partir de los cuales se reparte el cálculo
+DIRECT_CHUNK = 1 << 17  # Pares (cuerpo, hoja) por bloque de la suma directa
+
+
+def gravitational_parameters(distance, period):
+    """
+    G·M del cuerpo central (unidades de la escena y días) para que una
+    órbita de semieje `distance` dure `period` días, por la tercera ley de
+    Kepler. Con periodo nulo, 0 (sin atracción).
+    """
+    distance = np.asarray(distance, dtype=np.float64)
+    period = np.asarray(period, dtype=np.float64)
+    mean_motion = np.divide(2 * np.pi, period, out=np.zeros(np.broadcast(distance, period).shape),
+                            where=period != 0)
+    return mean_motion ** 2 * distance ** 3
+
+
+class Octree:
+    """
+    Octree de Barnes-Hut guardado en arreglos planos.
+
+    Solo entran los cuerpos con masa. Cada nodo cubre un tramo contiguo de
+    `order`, así que la masa y el centro de masas de todos los nodos salen
+    de sumas acumuladas sin recorrer el árbol.
+
+    Args:
+        positions: Posiciones (n, 3) de todos los cuerpos
+        masses: Masas (n,); las nulas no generan fuerza
+        leaf_size: Cuerpos máximos por hoja
+        max_depth: Profundidad máxima (cuerpos coincidentes)
+    """
+    def __init__(self, positions, masses, leaf_size=LEAF_SIZE, max_depth=32):
+        self.ids = np.flatnonzero(masses > 0)  # Índice global de cada punto del árbol
+        self.points = positions[self.ids]
+        self.masses = masses[self.ids]
+        self.leaf_size = leaf_size
+        self.max_depth = max_depth
+        self._build()
+
+    def _build(self):
+        count = len(self.ids)
+        self.order = np.arange(count)
+        starts, ends, halves, children = [], [], [], []
+        if count:
+            low, high = self.points.min(axis=0), self.points.max(axis=0)
+            stack = [(0, count, (low + high) / 2, max((high - low).max() / 2, 1e-9), 0, -1, 0)]
+        else:
+            stack = []
+
+        # Subdivisión iterativa: los hijos no vacíos cubren el tramo del padre
+        while stack:
+            start, end, center, half, depth, parent, octant = stack.pop()
+            node = len(starts)
+            starts.append(start)
+            ends.append(end)
+            halves.append(half)
+            children.append([-1] * 8)
+            if parent >= 0:
+                children[parent][octant] = node
+            if end - start <= self.leaf_size or depth >= self.max_depth:
+                continue
+
+            members = self.order[start:end]
+            above = self.points[members] > center
+            code = above[:, 0] | (above[:, 1] << 1) | (above[:, 2] << 2)
+            self.order[start:end] = members[np.argsort(code, kind="stable")]
+            bounds = start + np.concatenate(([0], np.cumsum(np.bincount(code, minlength=8))))
+            for child in range(7, -1, -1):
+                if bounds[child + 1] > bounds[child]:
+                    sign = np.array([child & 1, (child >> 1) & 1, (child >> 2) & 1]) * 2 - 1
+                    stack.append((bounds[child], bounds[child + 1], center + sign * half / 2,
+                                  half / 2, depth + 1, node, child))
+
+        self.starts = np.array(starts, dtype=np.int64)
+        self.ends = np.array(ends, dtype=np.int64)
+        self.half = np.array(halves)
+        self.children = np.array(children, dtype=np.int64).reshape(-1, 8)
+        self.is_leaf = (self.children < 0).all(axis=1)
+
+        # Masa y centro de masas de cada nodo a partir de sumas acumuladas
+        masses = self.masses[self.order]
+        weighted = masses[:, None] * self.points[self.order]
+        cumulative_mass = np.concatenate(([0.0], np.cumsum(masses)))
+        cumulative_moment = np.concatenate((np.zeros((1, 3)), np.cumsum(weighted, axis=0)))
+        self.mass = cumulative_mass[self.ends] - cumulative_mass[self.starts]
+        moment = cumulative_moment[self.ends] - cumulative_moment[self.starts]
+        self.center_of_mass = moment / np.maximum(self.mass, 1e-300)[:, None]
+
+    def accelerations(self, targets, positions, theta=THETA, softening=SOFTENING):
+        """
+        Aceleración (sin multiplicar por G) sobre los cuerpos `targets`.
+
+        Recorre el árbol por niveles con todos los pares (cuerpo, nodo)
+        pendientes a la vez: los nodos lejanos se aproximan por su centro de
+        masas, las hojas cercanas se suman cuerpo a cuerpo y el resto se abre.
+        Las coordenadas se separan por eje porque NumPy indexa arreglos 1D
+        bastante más rápido que filas de (n, 3).
+        """
+        count = len(targets)
+        acceleration = np.zeros((3, count))
+        if len(self.starts) == 0 or count == 0:
+            return acceleration.T
+        origin = [np.ascontiguousarray(positions[targets, axis]) for axis in range(3)]
+        centers = [np.ascontiguousarray(self.center_of_mass[:, axis]) for axis in range(3)]
+        points = [np.ascontiguousarray(self.points[self.order, axis]) for axis in range(3)]
+        point_mass = self.masses[self.order]
+        point_id = self.ids[self.order]
+        opening2 = (2 * self.half / theta) ** 2
+        eps2 = softening * softening
+
+        def accumulate(body, source, mass):
+            offset = [source[axis] - origin[axis][body] for axis in range(3)]
+            distance2 = offset[0] * offset[0] + offset[1] * offset[1] + offset[2] * offset[2] + eps2
+            weight = mass / (distance2 * np.sqrt(distance2))
+            for axis in range(3):
+                acceleration[axis] += np.bincount(body, weights=weight * offset[axis], minlength=count)
+
+        body = np.arange(count)
+        node = np.zeros(count, dtype=np.int64)
+        while len(body):
+            distance2 = sum((centers[axis][node] - origin[axis][body]) ** 2 for axis in range(3))
+            far = distance2 > opening2[node]
+            far_body, far_node = body[far], node[far]
+            if len(far_body):
+                accumulate(far_body, [center[far_node] for center in centers], self.mass[far_node])
+
+            body, node = body[~far], node[~far]
+            leaf = self.is_leaf[node]
+            # Hojas cercanas: suma directa excluyendo al propio cuerpo, por
+            # bloques para acotar la memoria
+            leaf_body, leaf_node = body[leaf], node[leaf]
+            for chunk in range(0, len(leaf_body), DIRECT_CHUNK):
+                chunk_body = leaf_body[chunk:chunk + DIRECT_CHUNK]
+                chunk_node = leaf_node[chunk:chunk + DIRECT_CHUNK]
+                counts = self.ends[chunk_node] - self.starts[chunk_node]
+                pair_body = np.repeat(chunk_body, counts)
+                slot = np.arange(len(pair_body)) + np.repeat(self.starts[chunk_node] - (np.cumsum(counts) - counts), counts)
+                mass = np.where(point_id[slot] != targets[pair_body], point_mass[slot], 0.0)
+                accumulate(pair_body, [point[slot] for point in points], mass)
+
+            # Nodos internos cercanos: bajar a sus hijos
+            inner = ~leaf
+            child = self.children[node[inner]].ravel()
+            body = np.repeat(body[inner], 8)
+            keep = child >= 0
+            body, node = body[keep], child[keep]
+        return acceleration.T
+
+
+def _chunk_accelerations(tree, targets, positions, theta, softening):
+    # Función de módulo para poder enviarla a los procesos del pool
+    return tree.accelerations(targets, positions, theta, softening)
+
+
+class GravitySimulation:
+    """
+    Modo físico: integra la gravedad entre el sol, los planetas y las lunas.
+
+    Las distancias y los periodos de la escena no están a escala entre sí
+    (no hay una masa del sol que dé a la vez el año de Mercurio y el de
+    Neptuno, y las lunas quedan muy fuera de la esfera de Hill de su
+    planeta), así que la atracción de cada cuerpo hacia su padre usa el G·M
+    que da su periodo configurado con su semieje (gravitational_parameters):
+    sin perturbaciones cada cuerpo sigue exactamente la órbita del modo
+    cinemático. Encima, los cuerpos que orbitan el sol (planetas y
+    catálogo) se perturban entre sí con un octree de Barnes-Hut
+    (O(N log N)), con su masa en masas solares. Las lunas no se perturban
+    entre sí: las añadidas comparten periodo (resonancia 1:1) a pocas
+    unidades unas de otras y, con las masas de la escena, se dispersarían
+    en pocas órbitas. Cada cuerpo se mueve además con su padre, así que las
+    lunas acompañan a su planeta; el sol no se acelera.
+
+    El movimiento se integra con leapfrog (kick-drift-kick), reversible, así
+    que se puede integrar hacia atrás. El estado vive en las columnas del
+    OrbitalEngine (`position` relativa al sol, `velocity` y `mass`).
+    Las filas nuevas (o todas al activar el modo) arrancan con la velocidad
+    de su órbita de Kepler alrededor de su padre.
+
+    Args:
+        engine: Motor cuyas filas se simulan
+        theta: Criterio de apertura de Barnes-Hut
+        softening: Suavizado de la fuerza a distancias muy cortas
+        workers: Procesos para repartir el cálculo de fuerzas (None: uno por CPU)
+        parallel_threshold: Cuerpos a partir de los cuales se usan los procesos
+    """
+    def __init__(self, engine, theta=THETA, softening=SOFTENING, workers=None,
+                 parallel_threshold=PARALLEL_THRESHOLD):
+        self.engine = engine
+        self.theta = theta
+        self.softening = softening
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+        self.sun_mass = 1.0  # Masas de los planetas en masas solares
+        self.sun_position = np.zeros(3)
+        self.sun_velocity = np.zeros(3)
+        self.shortest_period = math.inf  # Para subdividir los pasos
+        self._acceleration = None
+        self._executor = None
+        engine.dynamic[:engine.count] = False  # Todas las filas parten de órbitas circulares
+
+    def adopt(self):
+        """Da a las filas que aún no la tienen la velocidad de su órbita de Kepler."""
+        engine = self.engine
+        n = engine.count
+        pending = ~engine.dynamic[:n]
+        if not pending.any():
+            return False
+        parent = engine.parent[:n]
+
+        # Por niveles: una luna necesita la velocidad ya asignada de su planeta
+        while pending.any():
+            ready = pending & ((parent < 0) | engine.dynamic[np.maximum(parent, 0)])
+            if not ready.any():
+                raise ValueError("La jerarquía de cuerpos contiene un ciclo")
+            rows = np.flatnonzero(ready)
+            has_parent = parent[rows] >= 0
+            parent_rows = parent[rows][has_parent]
+            base_velocity = np.tile(self.sun_velocity, (len(rows), 1))
+            base_velocity[has_parent] = engine.velocity[parent_rows]
+
+            # Velocidad de la órbita de Kepler de cada fila con su periodo configurado
+            eccentricity = engine.eccentricity[rows]
+            eccentric_anomaly = solve_kepler(engine.angle[rows], eccentricity)
+            parameter = gravitational_parameters(engine.distance[rows], engine.orbital_period[rows])
+            relative_velocity = orbit_velocities(eccentric_anomaly, engine.distance[rows], eccentricity,
+                                                 engine.inclination[rows], engine.periapsis[rows],
+                                                 engine.ascending_node[rows], parameter)
+            engine.velocity[rows] = base_velocity + relative_velocity
+            engine.dynamic[rows] = True
+            pending[rows] = False
+            period = np.abs(engine.orbital_period[rows])
+            self.shortest_period = min(self.shortest_period, float(period[period > 0].min(initial=math.inf)))
+        return True
+
+    def accelerations(self, positions, masses):
+        """
+        Campo de Barnes-Hut (sin multiplicar por G) que crean `masses` sobre
+        cada uno de los cuerpos `positions`.
+        """
+        tree = Octree(positions, masses)
+        targets = np.arange(len(positions))
+        workers = self.workers or os.cpu_count() or 1
+        if len(positions) < self.parallel_threshold or workers < 2:
+            return tree.accelerations(targets, positions, self.theta, self.softening)
+
+        # Muchos cuerpos: repartir los objetivos entre procesos (el árbol se comparte)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        chunks = np.array_split(targets, workers)
+        parts = self._executor.map(_chunk_accelerations, [tree] * len(chunks), chunks,
+                                   [positions] * len(chunks), [self.theta] * len(chunks),
+                                   [self.softening] * len(chunks))
+        return np.concatenate(list(parts))
+
+    def total_accelerations(self, positions):
+        """
+        Aceleraciones de las filas en el sistema inercial (`positions` tiene
+        una fila más al final, la del sol, que no se acelera): la de su
+        padre, más la atracción de Kepler hacia él y, para los que orbitan
+        el sol, las perturbaciones de los demás.
+        """
+        engine = self.engine
+        n = engine.count
+        parent = engine.parent[:n]
+        has_parent = parent >= 0
+        center = np.where(has_parent, parent, n)
+        parameter = gravitational_parameters(engine.distance[:n], engine.orbital_period[:n])
+        acceleration = np.zeros((n + 1, 3))
+
+        # Atracción del padre con el G·M de la órbita configurada de cada fila
+        offset = positions[:n] - positions[center]
+        distance2 = np.maximum(np.einsum("ij,ij->i", offset, offset), self.softening ** 2)
+        acceleration[:n] = -(parameter / (distance2 * np.sqrt(distance2)))[:, None] * offset
+
+        # Perturbaciones entre los cuerpos que orbitan el sol: la G de cada
+        # uno es su G·M / masa del sol, así que cada perturbador pesa según
+        # su fracción de la masa solar
+        solar = np.flatnonzero(~has_parent)
+        masses = engine.mass[solar]
+        if len(solar) > 1 and (masses > 0).any():
+            field = self.accelerations(positions[solar], masses)
+            acceleration[solar] += (parameter[solar] / self.sun_mass)[:, None] * field
+
+        # Cada fila se mueve además con su padre: por niveles, desde los hijos del sol
+        pending = has_parent.copy()
+        while pending.any():
+            ready = pending & ~pending[np.maximum(parent, 0)]
+            if not ready.any():
+                raise ValueError("La jerarquía de cuerpos contiene un ciclo")
+            rows = np.flatnonzero(ready)
+            acceleration[rows] += acceleration[parent[rows]]
+            pending[rows] = False
+        return acceleration
+
+    def step(self, days):
+        """Avanza `days` días con un paso de leapfrog (kick-drift-kick)."""
+        engine = self.engine
+        n = engine.count
+        adopted = self.adopt()
+
+        # Estado en un sistema inercial: las filas del motor más el sol al final
+        positions = np.vstack((engine.position[:n] + self.sun_position, self.sun_position))
+        velocities = np.vstack((engine.velocity[:n], self.sun_velocity))
+        acceleration = self._acceleration
+        if adopted or acceleration is None or len(acceleration) != n + 1:
+            acceleration = self.total_accelerations(positions)
+
+        velocities += acceleration * (days / 2)
+        positions += velocities * days
+        acceleration = self.total_accelerations(positions)
+        velocities += acceleration * (days / 2)
+        self._acceleration = acceleration
+
+        self.sun_position = positions[n]
+        self.sun_velocity = velocities[n]
+        engine.position[:n] = positions[:n] - self.sun_position
+        engine.velocity[:n] = velocities[:n]
+        engine.time += days
+
+    def integrate(self, days, max_angle=0.05):
+        """
+        Avanza (o retrocede, con `days` negativo) en pasos en los que ningún
+        cuerpo recorre más de `max_angle` radianes. El coste crece con el
+        intervalo: a diferencia del modo cinemático no hay forma cerrada.
+        """
+        self.adopt()
+        if days == 0:
+            return
+        max_step = self.shortest_period * max_angle / (2 * math.pi)
+        steps = max(1, math.ceil(abs(days) / max_step)) if math.isfinite(max_step) else 1
+        for _ in range(steps):
+            self.step(days / steps)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
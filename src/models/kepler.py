@@ -0,0 +1,92 @@
+import numpy as np
+
+KEPLER_TOLERANCE = 1e-12  # Error máximo admitido en la anomalía excéntrica (radianes)
+KEPLER_MAX_ITERATIONS = 12  # Con el arranque usado, e <= 0.99 converge en menos de 10
+
+
+def solve_kepler(mean_anomaly, eccentricity, tolerance=KEPLER_TOLERANCE,
+                 max_iterations=KEPLER_MAX_ITERATIONS, stats=None):
+    """
+    Resuelve la ecuación de Kepler M = E - e·sin(E) para todos los cuerpos a
+    la vez con Newton-Raphson y devuelve la anomalía excéntrica E.
+
+    El número de iteraciones está acotado: en cada una solo se recalculan
+    los elementos que aún no han convergido. Las órbitas circulares (e = 0)
+    no iteran. Si se pasa un diccionario `stats`, se rellena con las
+    iteraciones usadas, el mayor residuo |E - e·sin(E) - M| y cuántos
+    elementos no alcanzaron la tolerancia.
+
+    Args:
+        mean_anomaly: Anomalías medias (radianes), de cualquier forma
+        eccentricity: Excentricidades (0 <= e < 1), compatibles por broadcasting
+        tolerance: Paso de Newton por debajo del cual se da por convergido
+        max_iterations: Límite de iteraciones
+        stats: Diccionario opcional para las estadísticas de convergencia
+    """
+    mean_anomaly, eccentricity = np.broadcast_arrays(np.asarray(mean_anomaly, dtype=np.float64),
+                                                     np.asarray(eccentricity, dtype=np.float64))
+    # Reducir M a [-π, π) mejora el arranque y la convergencia
+    mean_anomaly = np.mod(mean_anomaly + np.pi, 2 * np.pi) - np.pi
+    anomaly = mean_anomaly.copy()
+
+    # Arranque de Danby: E0 = M + 0.85·e·signo(sin M)
+    eccentric = np.flatnonzero(eccentricity.ravel() > 0)
+    active = eccentric
+    flat_anomaly = anomaly.reshape(-1)
+    flat_mean = mean_anomaly.ravel()
+    flat_eccentricity = eccentricity.ravel()
+    flat_anomaly[active] += 0.85 * flat_eccentricity[active] * np.sign(np.sin(flat_mean[active]))
+
+    iterations = 0
+    while len(active) and iterations < max_iterations:
+        iterations += 1
+        E = flat_anomaly[active]
+        e = flat_eccentricity[active]
+        step = (E - e * np.sin(E) - flat_mean[active]) / (1.0 - e * np.cos(E))
+        flat_anomaly[active] = E - step
+        active = active[np.abs(step) > tolerance]
+
+    if stats is not None:
+        E = flat_anomaly[eccentric]
+        residual = np.abs(E - flat_eccentricity[eccentric] * np.sin(E) - flat_mean[eccentric])
+        stats["iterations"] = iterations
+        stats["max_error"] = float(residual.max()) if len(residual) else 0.0
+        stats["unconverged"] = len(active)
+    return anomaly
+
+
+def perifocal_basis(inclination, periapsis, ascending_node):
+    """
+    Vectores unitarios P (hacia el periapsis) y Q (90° después, en el
+    sentido del movimiento) del plano orbital, en coordenadas de la escena.
+    Con nodo y periapsis nulos la órbita se inclina girando sobre el eje X.
+    """
+    cos_i, sin_i = np.cos(inclination), np.sin(inclination)
+    cos_w, sin_w = np.cos(periapsis), np.sin(periapsis)
+    cos_n, sin_n = np.cos(ascending_node), np.sin(ascending_node)
+    p = np.stack((cos_n * cos_w - sin_n * sin_w * cos_i,
+                  sin_n * cos_w + cos_n * sin_w * cos_i,
+                  sin_w * sin_i), axis=-1)
+    q = np.stack((-cos_n * sin_w - sin_n * cos_w * cos_i,
+                  -sin_n * sin_w + cos_n * cos_w * cos_i,
+                  cos_w * sin_i), axis=-1)
+    return p, q
+
+
+def orbit_offsets(eccentric_anomaly, semi_major_axis, eccentricity, inclination, periapsis, ascending_node):
+    """Posición relativa al foco (el cuerpo padre) para cada anomalía excéntrica."""
+    p, q = perifocal_basis(inclination, periapsis, ascending_node)
+    x = semi_major_axis * (np.cos(eccentric_anomaly) - eccentricity)
+    y = semi_major_axis * np.sqrt(1.0 - eccentricity * eccentricity) * np.sin(eccentric_anomaly)
+    return x[..., None] * p + y[..., None] * q
+
+
+def orbit_velocities(eccentric_anomaly, semi_major_axis, eccentricity, inclination, periapsis,
+                     ascending_node, gravitational_parameter):
+    """Velocidad relativa al foco de una órbita de Kepler con parámetro G·M."""
+    p, q = perifocal_basis(inclination, periapsis, ascending_node)
+    cos_e, sin_e = np.cos(eccentric_anomaly), np.sin(eccentric_anomaly)
+    speed = np.sqrt(gravitational_parameter / semi_major_axis) / (1.0 - eccentricity * cos_e)
+    x = -speed * sin_e
+    y = speed * np.sqrt(1.0 - eccentricity * eccentricity) * cos_e
+    return x[..., None] * p + y[..., None] * q
@@ -1,29 +1,100 @@
-import pygame
 import math
-import numpy as np
-from OpenGL.GL import *
-from OpenGL.GLU import *
 from models.celestial_body import CelestialBody
+from models.orbital_engine import EngineField, OrbitalEngine
+
+# Masa de una luna añadida (la de la Luna terrestre, en masas solares)
+DEFAULT_MOON_MASS = 3.7e-8
+MOON_POOL_LIMIT = 10000  # Vistas libres que se conservan para reutilizar
+
 
 class Moon(CelestialBody):
-    def __init__(self, distance, radius, color, orbital_period, inclination=0):
+    # Atributos respaldados por una fila del OrbitalEngine
+    x = EngineField("position", 0)
+    y = EngineField("position", 1)
+    z = EngineField("position", 2)
+    angle = EngineField("angle", setter="set_angle")
+    distance = EngineField("distance")
+    orbital_period = EngineField("orbital_period", setter="set_period")
+    inclination = EngineField("inclination")
+    eccentricity = EngineField("eccentricity")
+    periapsis = EngineField("periapsis")
+    ascending_node = EngineField("ascending_node")
+    radius = EngineField("radius")
+    color = EngineField("color")
+    mass = EngineField("mass")
+
+    def __init__(self, distance, radius, color, orbital_period, inclination=0, engine=None, parent=-1,
+                 mass=DEFAULT_MOON_MASS, eccentricity=0.0, periapsis=0, ascending_node=0, mean_anomaly=0):
+        # Reservar la fila antes de que CelestialBody inicialice x/y/z.
+        # `distance` es el semieje mayor; los ángulos llegan en grados
+        self.engine = engine if engine is not None else OrbitalEngine()
+        self.engine_index = self.engine.add(self, distance, orbital_period,
+                                            math.radians(inclination), parent, mass,
+                                            eccentricity, math.radians(periapsis),
+                                            math.radians(ascending_node), math.radians(mean_anomaly))
         super().__init__("Moon", radius, color)
-        self.distance = distance
-        self.orbital_period = orbital_period
-        self.angle = 0
-        self.inclination = inclination * math.pi / 180  # Convertir grados a radianes
-        
+        self.engine.place(self.engine_index)
+
+    @classmethod
+    def attach(cls, engine, index):
+        """Vista sobre una fila que ya existe en el motor (al restaurar un estado guardado)."""
+        moon = cls.__new__(cls)
+        moon.engine = engine
+        moon.engine_index = index
+        moon.name = "Moon"
+        return moon
+
+    def get_render_position(self):
+        # Posición interpolada entre los dos últimos pasos de simulación
+        return tuple(self.engine.render_position[self.engine_index])
+
     def update(self, time_factor, planet_x, planet_y, planet_z):
-        self.angle += (2 * math.pi / self.orbital_period) * time_factor
-        if self.angle > 2 * math.pi:
-            self.angle -= 2 * math.pi
-            
-        # Calcular posición 3D relativa al planeta con inclinación
-        orbit_x = self.distance * math.cos(self.angle)
-        orbit_y = self.distance * math.sin(self.angle) * math.cos(self.inclination)
-        orbit_z = self.distance * math.sin(self.angle) * math.sin(self.inclination)
-        
-        # Posición final relativa al planeta
-        self.x = planet_x + orbit_x
-        self.y = planet_y + orbit_y
-        self.z = planet_z + orbit_z
\ No newline at end of file
+        # Avance individual; SolarSystem avanza todas las filas a la vez con OrbitalEngine.step
+        self.engine.step_row(self.engine_index, time_factor, (planet_x, planet_y, planet_z))
+
+
+class MoonPool:
+    """
+    Lista libre de vistas Moon (una por SolarSystem, compartida por sus planetas).
+
+    Las filas del motor ya se reutilizan: el OrbitalEngine compacta los
+    huecos al quitar filas y solo amplía su capacidad (al doble) cuando se
+    llena. Aquí se guardan las vistas de las lunas quitadas para asociarlas
+    a las filas de las que se añadan después, así que añadir y quitar
+    lunas una y otra vez no crea objetos nuevos. Las lunas no tienen
+    recursos de OpenGL propios (se dibujan en lote desde el motor), así que
+    no hay nada más que reciclar.
+
+    Args:
+        limit: Vistas libres que se conservan como máximo
+    """
+    def __init__(self, limit=MOON_POOL_LIMIT):
+        self.free = []
+        self.limit = limit
+        self.stats = {"created": 0, "reused": 0}
+
+    def acquire(self, engine, rows):
+        """Vistas para las filas `rows` del motor, reutilizando las libres; las registra en `engine.bodies`."""
+        moons = []
+        for row in rows.tolist() if hasattr(rows, "tolist") else rows:
+            if self.free:
+                moon = self.free.pop()
+                moon.engine = engine
+                moon.engine_index = row
+                self.stats["reused"] += 1
+            else:
+                moon = Moon.attach(engine, row)
+                self.stats["created"] += 1
+            engine.bodies[row] = moon
+            moons.append(moon)
+        return moons
+
+    def release(self, moons):
+        """Devuelve a la lista libre las vistas de lunas ya quitadas del motor."""
+        for moon in moons:
+            # Desligar la vista de su fila: ya no pertenece a este motor
+            moon.engine = None
+            moon.engine_index = -1
+        room = self.limit - len(self.free)
+        if room > 0:
+            self.free.extend(moons[:room])
@@ -0,0 +1,397 @@
+import numpy as np
+from models.kepler import solve_kepler, orbit_offsets
+
+TWO_PI = 2 * np.pi
+
+
+class EngineField:
+    """
+    Descriptor que expone una fila de una columna del OrbitalEngine como
+    atributo normal del cuerpo (planet.angle, moon.x, ...).
+
+    Args:
+        column: Nombre del arreglo del motor
+        axis: Componente a leer si la columna es vectorial (posiciones)
+        setter: Método del motor que aplica las escrituras (p. ej. para
+            reajustar la fase al cambiar el ángulo)
+    """
+    def __init__(self, column, axis=None, setter=None):
+        self.column = column
+        self.axis = axis
+        self.setter = setter
+
+    def __get__(self, body, owner=None):
+        if body is None:
+            return self
+        values = getattr(body.engine, self.column)
+        if self.axis is not None:
+            return float(values[body.engine_index, self.axis])
+        value = values[body.engine_index]
+        if value.ndim:
+            return tuple(value.tolist())  # Columnas vectoriales (color)
+        return value.item()
+
+    def __set__(self, body, value):
+        if self.setter is not None:
+            getattr(body.engine, self.setter)(body.engine_index, value)
+            return
+        values = getattr(body.engine, self.column)
+        if self.column in OrbitalEngine.ELEMENT_COLUMNS:
+            body.engine.revision += 1
+        if self.axis is None:
+            values[body.engine_index] = value
+        else:
+            values[body.engine_index, self.axis] = value
+
+
+class OrbitalEngine:
+    """
+    Motor orbital en estructura de arreglos (SoA).
+
+    Guarda los elementos orbitales (semieje mayor en `distance`,
+    excentricidad, inclinación, argumento del periapsis, nodo ascendente y
+    anomalía media en el instante 0 en `phase`), periodos e índices del
+    cuerpo padre de todos los planetas y lunas en arreglos contiguos de
+    NumPy. Las posiciones se calculan en forma cerrada a partir del tiempo
+    absoluto resolviendo la ecuación de Kepler para todas las filas a la
+    vez, así que avanzar o saltar a cualquier fecha cuesta lo mismo. Los objetos
+    Planet/Moon son vistas sobre una fila del motor (ver EngineField). El
+    radio y el color también viven aquí para que el dibujado por instancias
+    no recorra objetos.
+    """
+    COLUMNS = ("phase", "angle", "orbital_period", "inclination", "distance", "parent",
+               "eccentricity", "periapsis", "ascending_node",
+               "position", "previous_position", "render_position", "radius", "color",
+               "mass", "velocity", "dynamic", "catalog")
+    # Columnas que definen las trayectorias (cambiarlas invalida las efemérides)
+    ELEMENT_COLUMNS = ("phase", "orbital_period", "distance", "eccentricity", "inclination",
+                       "periapsis", "ascending_node", "parent")
+
+    def __init__(self, capacity=16):
+        self.count = 0
+        self.time = 0.0  # Tiempo absoluto de la simulación en días
+        self.bodies = []  # Vista (Planet/Moon) asociada a cada fila
+        self.kepler_stats = {"iterations": 0, "max_error": 0.0, "unconverged": 0}
+        self.revision = 0  # Aumenta cada vez que cambian las filas o sus elementos
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        # Reservar (o ampliar) los arreglos conservando las filas existentes
+        n = self.count
+        columns = {
+            "phase": np.zeros(capacity),  # Anomalía media en el instante 0
+            "angle": np.zeros(capacity),  # Anomalía media en el instante actual
+            "orbital_period": np.ones(capacity),
+            "inclination": np.zeros(capacity),
+            "distance": np.zeros(capacity),  # Semieje mayor
+            "eccentricity": np.zeros(capacity),
+            "periapsis": np.zeros(capacity),  # Argumento del periapsis
+            "ascending_node": np.zeros(capacity),  # Longitud del nodo ascendente
+            "parent": np.full(capacity, -1, dtype=np.int64),
+            "position": np.zeros((capacity, 3)),
+            # Estado del paso anterior y posición interpolada que se dibuja
+            "previous_position": np.zeros((capacity, 3)),
+            "render_position": np.zeros((capacity, 3)),
+            "radius": np.zeros(capacity),
+            "color": np.zeros((capacity, 3), dtype=np.uint8),
+            # Estado del modo gravitatorio (ver models.gravity): masa en masas
+            # solares, velocidad en unidades/día y si la fila ya tiene velocidad
+            "mass": np.zeros(capacity),
+            "velocity": np.zeros((capacity, 3)),
+            "dynamic": np.zeros(capacity, dtype=bool),
+            # Filas cargadas en bloque de un catálogo, sin objeto Planet/Moon
+            "catalog": np.zeros(capacity, dtype=bool),
+        }
+        for name, array in columns.items():
+            if n:
+                array[:n] = getattr(self, name)[:n]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def add(self, body, distance, orbital_period, inclination=0.0, parent=-1, mass=0.0,
+            eccentricity=0.0, periapsis=0.0, ascending_node=0.0, mean_anomaly=0.0):
+        """
+        Reserva una fila para un cuerpo y devuelve su índice.
+        Los ángulos se esperan en radianes (la anomalía media es la del
+        instante 0) y la masa en masas solares.
+        """
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+
+        index = self.count
+        self.phase[index] = mean_anomaly
+        self.angle[index] = mean_anomaly
+        self.orbital_period[index] = orbital_period
+        self.inclination[index] = inclination
+        self.distance[index] = distance
+        self.eccentricity[index] = eccentricity
+        self.periapsis[index] = periapsis
+        self.ascending_node[index] = ascending_node
+        self.parent[index] = parent
+        self.position[index] = 0.0
+        self.previous_position[index] = 0.0
+        self.render_position[index] = 0.0
+        self.radius[index] = 0.0
+        self.color[index] = 0
+        self.mass[index] = mass
+        self.velocity[index] = 0.0
+        self.dynamic[index] = False
+        self.catalog[index] = False
+        self.bodies.append(body)
+        self.count += 1
+        self.revision += 1
+        return index
+
+    def remove(self, index):
+        """
+        Libera la fila indicada moviendo la última a su lugar.
+        Actualiza el índice de la vista movida y las referencias de sus hijos.
+        """
+        self.remove_rows([index])
+
+    def remove_rows(self, indices):
+        """
+        Libera varias filas a la vez. Los huecos que quedan por debajo del
+        nuevo número de filas se rellenan con las últimas filas que se
+        conservan (como `remove`, pero moviendo cada columna una sola vez
+        para todas), así que solo cambian de índice las filas movidas.
+        """
+        removed = np.unique(np.asarray(indices, dtype=np.int64))
+        if len(removed) == 0:
+            return
+        n = self.count
+        count = n - len(removed)
+        holes = removed[removed < count]
+        kept = np.ones(n - count, dtype=bool)
+        kept[removed[removed >= count] - count] = False
+        tail = np.arange(count, n)[kept]  # Tantas como huecos
+        for index in removed:
+            body = self.bodies[index]
+            if body is not None:
+                body.engine_index = -1
+
+        if len(holes):
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                column[holes] = column[tail]
+            for hole, row in zip(holes.tolist(), tail.tolist()):
+                moved = self.bodies[row]
+                self.bodies[hole] = moved
+                if moved is not None:
+                    moved.engine_index = hole
+            # Los hijos de las filas movidas apuntan a su nuevo índice
+            renumber = np.arange(n)
+            renumber[tail] = holes
+            parent = self.parent[:count]
+            orbiting = parent >= 0
+            parent[orbiting] = renumber[parent[orbiting]]
+
+        del self.bodies[count:]
+        self.count = count
+        self.revision += 1
+
+    def add_rows(self, distance, orbital_period, inclination=0.0, parent=-1, mass=0.0,
+                 eccentricity=0.0, periapsis=0.0, ascending_node=0.0, mean_anomaly=0.0,
+                 radius=0.0, color=0, catalog=True):
+        """
+        Añade muchas filas a la vez sin crear objetos Planet/Moon y las
+        coloca en su órbita. Cada argumento es un arreglo con un valor por
+        fila o un escalar común; las unidades son las de `add`. Los padres
+        deben ser filas ya existentes. Con `catalog` las filas son cuerpos
+        de catálogo; si no, el llamador asigna sus vistas en `bodies`
+        (ver Planet.add_moons). Devuelve los índices.
+        """
+        distance = np.asarray(distance, dtype=np.float64)
+        n = len(distance)
+        start, end = self.count, self.count + n
+        if end > self.capacity:
+            self._allocate(max(self.capacity * 2, 1 << (end - 1).bit_length()))
+
+        rows = slice(start, end)
+        self.phase[rows] = mean_anomaly
+        self.orbital_period[rows] = orbital_period
+        self.inclination[rows] = inclination
+        self.distance[rows] = distance
+        self.eccentricity[rows] = eccentricity
+        self.periapsis[rows] = periapsis
+        self.ascending_node[rows] = ascending_node
+        self.parent[rows] = parent
+        self.radius[rows] = radius
+        self.color[rows] = color
+        self.mass[rows] = mass
+        self.velocity[rows] = 0.0
+        self.dynamic[rows] = False
+        self.catalog[rows] = catalog
+        self.bodies.extend([None] * n)
+        self.count = end
+        self.revision += 1
+
+        # Colocar las filas nuevas en el instante actual, como `place`
+        indices = np.arange(start, end)
+        self.angle[rows] = self.angles_at(self.time, indices)
+        offsets = self._local_offsets(self.angle[rows], indices)
+        parents = self.parent[rows]
+        orbiting = parents >= 0
+        for column in (self.position, self.previous_position, self.render_position):
+            column[rows] = offsets
+            column[indices[orbiting]] += column[parents[orbiting]]
+        return indices
+
+    def load_rows(self, columns, bodies):
+        """
+        Sustituye todas las filas por las de `columns` (nombre de columna ->
+        arreglo con una fila por cuerpo) sin recorrerlas una a una. Las
+        columnas que falten quedan con su valor inicial. `bodies` son las
+        vistas de cada fila (None para los cuerpos de catálogo); su
+        `engine_index` se actualiza.
+        """
+        count = len(bodies)
+        self.count = 0  # No conservar las filas anteriores al ampliar
+        if count > self.capacity:
+            self._allocate(1 << (count - 1).bit_length())
+        initial = {"orbital_period": 1.0, "parent": -1}
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column[:count] = columns[name] if name in columns else initial.get(name, 0)
+        self.bodies = list(bodies)
+        for index, body in enumerate(self.bodies):
+            if body is not None:
+                body.engine_index = index
+        self.count = count
+        self.revision += 1
+
+    def moon_rows(self):
+        """Índices de las filas que orbitan otro cuerpo (lunas)."""
+        return np.flatnonzero(self.parent[:self.count] >= 0)
+
+    def batched_rows(self):
+        """Filas que se dibujan en lote: lunas y cuerpos de catálogo."""
+        n = self.count
+        return np.flatnonzero((self.parent[:n] >= 0) | self.catalog[:n])
+
+    def angles_at(self, time, rows=None):
+        """
+        Anomalía media de cada fila en el instante absoluto `time` (días).
+        Se calcula en forma cerrada a partir de la fase inicial, sin acumular
+        pasos; `time` puede ser un arreglo para evaluar varios instantes.
+        """
+        rows = slice(0, self.count) if rows is None else rows
+        period = self.orbital_period[rows]
+        # Reducir el tiempo módulo el periodo antes de multiplicar evita
+        # perder precisión con tiempos grandes
+        fraction = np.mod(np.asarray(time, dtype=np.float64)[..., None], period) / period
+        return np.mod(self.phase[rows] + TWO_PI * fraction, TWO_PI)
+
+    def _local_offsets(self, angle, rows):
+        # Posición de cada fila en su órbita, relativa a su cuerpo padre:
+        # anomalía media -> anomalía excéntrica (Kepler) -> posición
+        eccentricity = self.eccentricity[rows]
+        eccentric_anomaly = solve_kepler(angle, eccentricity, stats=self.kepler_stats)
+        return orbit_offsets(eccentric_anomaly, self.distance[rows], eccentricity,
+                             self.inclination[rows], self.periapsis[rows], self.ascending_node[rows])
+
+    def _resolve_hierarchy(self, offsets, position):
+        # Resolver la jerarquía por niveles: primero los cuerpos que orbitan
+        # el origen y luego los que orbitan cuerpos ya resueltos
+        parent = self.parent[:self.count]
+        resolved = parent < 0
+        position[..., resolved, :] = offsets[..., resolved, :]
+        while not resolved.all():
+            ready = ~resolved & resolved[np.maximum(parent, 0)]
+            if not ready.any():
+                raise ValueError("La jerarquía de cuerpos contiene un ciclo")
+            position[..., ready, :] = offsets[..., ready, :] + position[..., parent[ready], :]
+            resolved |= ready
+
+    def set_angle(self, index, angle):
+        # Reajustar la fase para que el cuerpo tenga la anomalía media `angle`
+        # en el instante actual
+        period = self.orbital_period[index]
+        self.phase[index] = angle - TWO_PI * np.mod(self.time, period) / period
+        self.angle[index] = angle
+        self.revision += 1
+
+    def set_period(self, index, orbital_period):
+        # Cambiar el periodo conservando el ángulo actual (sin saltos)
+        angle = self.angle[index]
+        self.orbital_period[index] = orbital_period
+        self.set_angle(index, angle)
+
+    def seek(self, time):
+        """Coloca todos los cuerpos en el instante absoluto `time` (días) en O(1)."""
+        self.time = float(time)
+        self.update_positions()
+
+    def advance(self, days):
+        """Avanza el tiempo absoluto sin recalcular posiciones."""
+        self.time += days
+
+    def step(self, days):
+        """Avanza todas las filas un paso de simulación."""
+        self.seek(self.time + days)
+
+    def store_previous(self):
+        """Guarda el estado actual como punto de partida de la interpolación."""
+        n = self.count
+        self.previous_position[:n] = self.position[:n]
+
+    def interpolate(self, alpha):
+        """Calcula las posiciones a dibujar entre el paso anterior y el actual."""
+        n = self.count
+        previous = self.previous_position[:n]
+        np.subtract(self.position[:n], previous, out=self.render_position[:n])
+        self.render_position[:n] *= alpha
+        self.render_position[:n] += previous
+
+    def snap(self):
+        """Descarta la interpolación tras un salto en el tiempo."""
+        n = self.count
+        self.previous_position[:n] = self.position[:n]
+        self.render_position[:n] = self.position[:n]
+
+    def place(self, index):
+        """
+        Coloca una fila recién creada en su órbita sin avanzar el tiempo,
+        para que no aparezca en el origen ni se interpole desde él.
+        """
+        rows = np.array([index])
+        self.angle[index] = self.angles_at(self.time, rows)[0]
+        offset = self._local_offsets(self.angle[rows], rows)[0]
+        parent = self.parent[index]
+        for column in (self.position, self.previous_position, self.render_position):
+            # Cada estado se coloca respecto al mismo estado de su padre
+            column[index] = offset + (column[parent] if parent >= 0 else 0.0)
+
+    def update_positions(self):
+        """Recalcula ángulos y posiciones absolutas para el instante actual."""
+        n = self.count
+        if n == 0:
+            return
+        rows = slice(0, n)
+        self.angle[:n] = self.angles_at(self.time)
+        self._resolve_hierarchy(self._local_offsets(self.angle[:n], rows), self.position[:n])
+
+    def evaluate(self, times):
+        """
+        Posiciones de todas las filas en varios instantes a la vez.
+        Devuelve un arreglo (len(times), count, 3) sin modificar el estado.
+        """
+        times = np.asarray(times, dtype=np.float64)
+        rows = slice(0, self.count)
+        positions = np.empty(times.shape + (self.count, 3))
+        self._resolve_hierarchy(self._local_offsets(self.angles_at(times), rows), positions)
+        return positions
+
+    def step_row(self, index, time_factor, origin):
+        """
+        Avanza una sola fila y la coloca relativa a `origin`.
+        Mantiene el API por objeto (Planet.update/Moon.update): el avance se
+        guarda como un desfase de la fila respecto al tiempo global.
+        """
+        rows = np.array([index])
+        self.phase[index] = np.mod(self.phase[index] + TWO_PI * time_factor / self.orbital_period[index], TWO_PI)
+        self.revision += 1
+        self.angle[index] = self.angles_at(self.time, rows)[0]
+        self.position[index] = self._local_offsets(self.angle[rows], rows)[0] + origin
+        self.previous_position[index] = self.position[index]
+        self.render_position[index] = self.position[index]
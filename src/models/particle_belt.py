@@ -0,0 +1,135 @@
+import math
+import numpy as np
+from models.kepler import perifocal_basis
+
+DEFAULT_PARTICLE_COLOR = (160, 160, 160)
+MOTION_TOLERANCE = 0.05  # Desplazamiento (unidades de la escena) por debajo del cual no se recalcula
+
+
+class ParticleBelt:
+    """
+    Cinturón o anillo de partículas sin masa (asteroides, objetos del
+    cinturón de Kuiper, anillos de un planeta).
+
+    Las partículas no son cuerpos del OrbitalEngine ni objetos de Python:
+    sus elementos orbitales viven en arreglos NumPy y todas se mueven con
+    una única actualización vectorizada en forma cerrada. Como las órbitas
+    son casi circulares, la ecuación de Kepler se aproxima con la serie de
+    segundo orden E = M + e·sin M·(1 + e·cos M) en lugar de iterar; el
+    error (del orden de e³) no se aprecia como puntos de un píxel.
+
+    Los semiejes se reparten entre `inner` y `outer` y el periodo sigue una
+    ley de potencias que pasa por (inner, inner_period) y (outer,
+    outer_period), así que los cinturones respetan la escala (no física)
+    de las distancias de la escena.
+
+    Las posiciones son relativas al cuerpo padre (el Renderer las traslada
+    al dibujar), así que los anillos siguen a su planeta sin recalcularse.
+    Si desde la última actualización ninguna partícula se ha movido más de
+    MOTION_TOLERANCE tampoco se recalculan: los cinturones lejanos y lentos
+    solo cambian cada varios fotogramas. Con `set_density` se mueve y dibuja
+    solo una fracción de las partículas, para ajustarse al tiempo por
+    fotograma disponible.
+
+    Args:
+        name: Nombre del cinturón
+        count: Número de partículas
+        inner: Semieje mayor mínimo (unidades de la escena)
+        outer: Semieje mayor máximo
+        inner_period: Periodo orbital en `inner` (días)
+        outer_period: Periodo orbital en `outer` (días)
+        color: Color medio (RGB 0-255)
+        eccentricity: Excentricidad máxima de las partículas
+        inclination: Dispersión de la inclinación respecto al plano (grados)
+        plane_inclination: Inclinación del plano del cinturón (grados)
+        plane_node: Nodo ascendente del plano del cinturón (grados)
+        color_variation: Variación aleatoria del brillo (0-1)
+        seed: Semilla para que el cinturón sea siempre el mismo
+        parent: Planet alrededor del que orbita (None: el sol)
+    """
+    def __init__(self, name, count, inner, outer, inner_period, outer_period, color=DEFAULT_PARTICLE_COLOR,
+                 eccentricity=0.0, inclination=0.0, plane_inclination=0.0, plane_node=0.0,
+                 color_variation=0.0, seed=0, parent=None):
+        self.name = name
+        self.parent = parent
+        self.count = int(count)
+        rng = np.random.default_rng(seed)
+
+        # Semiejes repartidos por área, para que la densidad sea uniforme
+        axis = np.sqrt(rng.uniform(inner * inner, outer * outer, self.count))
+        exponent = math.log(outer_period / inner_period) / math.log(outer / inner) if outer > inner else 1.5
+        self.mean_motion = 2 * np.pi / (inner_period * (axis / inner) ** exponent)  # rad/día
+        self.mean_anomaly = rng.uniform(0.0, 2 * np.pi, self.count)
+        self.eccentricity = rng.uniform(0.0, eccentricity, self.count).astype(np.float32)
+        tilt = np.abs(rng.normal(0.0, math.radians(inclination), self.count)) if inclination else 0.0
+        node = rng.uniform(0.0, 2 * np.pi, self.count)
+        periapsis = rng.uniform(0.0, 2 * np.pi, self.count)
+
+        # Ejes de cada elipse ya escalados y girados al plano del cinturón:
+        # posición = foco + P·a·cos E + Q·b·sin E
+        p, q = perifocal_basis(tilt, periapsis, node)
+        plane_p, plane_q = perifocal_basis(math.radians(plane_inclination), 0.0, math.radians(plane_node))
+        plane = np.stack((plane_p, plane_q, np.cross(plane_p, plane_q)), axis=1)
+        minor = axis * np.sqrt(1.0 - self.eccentricity.astype(np.float64) ** 2)
+        self.axis_p = ((p * axis[:, None]) @ plane.T).astype(np.float32)
+        self.axis_q = ((q * minor[:, None]) @ plane.T).astype(np.float32)
+        self.focus_offset = self.axis_p * -self.eccentricity[:, None]
+        self.eccentric = eccentricity > 0
+
+        # Brillo aleatorio alrededor del color medio
+        shade = 1.0 + rng.uniform(-color_variation, color_variation, (self.count, 1))
+        self.colors = np.clip(np.asarray(color, dtype=np.float64) * shade, 0, 255).astype(np.uint8)
+
+        # Esfera que contiene todo el cinturón (respecto a su centro) y
+        # velocidad máxima de sus partículas, en unidades por día
+        self.bounding_radius = float(outer * (1.0 + eccentricity))
+        self.max_speed = float(np.max(axis * self.mean_motion) * (1.0 + eccentricity))
+        self.positions = np.zeros((self.count, 3), dtype=np.float32)
+        self.active = self.count  # Partículas que se mueven y se dibujan (las primeras)
+        self.revision = 0  # Aumenta cada vez que cambian las posiciones
+        self._days = None
+
+    @classmethod
+    def from_data(cls, name, data, parent=None):
+        """
+        Crea el cinturón a partir de una entrada de data/planets_data.py.
+        Si la entrada tiene "name", sustituye a `name`.
+        """
+        options = dict(data)
+        return cls(options.pop("name", name), parent=parent, **options)
+
+    def center(self):
+        """Posición (interpolada) del cuerpo padre, o el origen si orbita el sol."""
+        if self.parent is None:
+            return (0.0, 0.0, 0.0)
+        return self.parent.get_render_position()
+
+    def set_density(self, fraction):
+        """Mueve y dibuja solo `fraction` (0-1) de las partículas. Como su
+        orden es aleatorio, las primeras son una muestra uniforme del cinturón."""
+        active = int(round(self.count * min(max(fraction, 0.0), 1.0)))
+        if active != self.active:
+            self.active = active
+            self._days = None  # Las que vuelven a mostrarse tienen posiciones antiguas
+
+    def update(self, days):
+        """
+        Coloca las partículas activas en el instante `days`, relativas al
+        cuerpo padre. No hace nada si ninguna se movería más de
+        MOTION_TOLERANCE respecto a la última actualización.
+        """
+        if self._days is not None and abs(days - self._days) * self.max_speed < MOTION_TOLERANCE:
+            return
+        self._days = float(days)
+
+        n = self.active
+        # La anomalía media se acumula en float64 y se reduce antes de pasar a float32
+        anomaly = np.mod(self.mean_anomaly[:n] + self.mean_motion[:n] * days, 2 * np.pi).astype(np.float32)
+        if self.eccentric:
+            eccentricity = self.eccentricity[:n]
+            anomaly += eccentricity * np.sin(anomaly) * (1.0 + eccentricity * np.cos(anomaly))
+        positions = self.positions[:n]
+        np.multiply(self.axis_p[:n], np.cos(anomaly)[:, None], out=positions)
+        positions += self.axis_q[:n] * np.sin(anomaly)[:, None]
+        positions += self.focus_offset[:n]
+        self.revision += 1
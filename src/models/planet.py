@@ -1,79 +1,113 @@
-import pygame
 import math
 import numpy as np
-from OpenGL.GL import *
-from OpenGL.GLU import *
 from models.celestial_body import CelestialBody
-from models.moon import Moon
+from models.moon import DEFAULT_MOON_MASS, MoonPool
+from models.orbital_engine import EngineField, OrbitalEngine
+
+DEFAULT_ORBIT_SEGMENTS = 100  # Vértices con los que se dibuja cada órbita
+# Lunas añadidas: radio, color y periodo (días); cada una 5 unidades más lejos que la anterior
+MOON_RADIUS = 2
+MOON_COLOR = (200, 200, 200)
+MOON_PERIOD = 30
+MOON_SPACING = 5
 
 class Planet(CelestialBody):
-    def __init__(self, name, distance, radius, color, orbital_period, inclination=0):
+    # Atributos respaldados por una fila del OrbitalEngine
+    x = EngineField("position", 0)
+    y = EngineField("position", 1)
+    z = EngineField("position", 2)
+    angle = EngineField("angle", setter="set_angle")
+    distance = EngineField("distance")
+    orbital_period = EngineField("orbital_period", setter="set_period")
+    inclination = EngineField("inclination")
+    eccentricity = EngineField("eccentricity")
+    periapsis = EngineField("periapsis")
+    ascending_node = EngineField("ascending_node")
+    radius = EngineField("radius")
+    color = EngineField("color")
+    mass = EngineField("mass")
+
+    def __init__(self, name, distance, radius, color, orbital_period, inclination=0, engine=None, mass=0.0,
+                 eccentricity=0.0, periapsis=0, ascending_node=0, mean_anomaly=0, moon_pool=None):
+        # Reservar la fila antes de que CelestialBody inicialice x/y/z.
+        # `distance` es el semieje mayor; los ángulos llegan en grados
+        self.engine = engine if engine is not None else OrbitalEngine()
+        self.engine_index = self.engine.add(self, distance, orbital_period,
+                                            math.radians(inclination), mass=mass,
+                                            eccentricity=eccentricity,
+                                            periapsis=math.radians(periapsis),
+                                            ascending_node=math.radians(ascending_node),
+                                            mean_anomaly=math.radians(mean_anomaly))
         super().__init__(name, radius, color)
-        self.distance = distance
-        self.orbital_period = orbital_period
-        self.angle = 0
+        self.engine.place(self.engine_index)
         self.moons = []
         self.moon_count = 0
-        self.inclination = inclination * math.pi / 180  # Convertir grados a radianes
+        # Vistas Moon libres, compartidas con los demás planetas del mismo sistema
+        self.moon_pool = moon_pool if moon_pool is not None else MoonPool()
+        self.known_moons = 0  # Lunas conocidas del planeta real (ver data/planets_data.py)
+        self.rings = None  # ParticleBelt de los anillos, si los tiene
+        # Suavidad con la que el Renderer dibuja la órbita
+        self.orbit_segments = DEFAULT_ORBIT_SEGMENTS
         
+    def get_render_position(self):
+        # Posición interpolada entre los dos últimos pasos de simulación
+        return tuple(self.engine.render_position[self.engine_index])
+
     def update(self, time_factor):
-        # Actualiza la posición basada en el periodo orbital
-        self.angle += (2 * math.pi / self.orbital_period) * time_factor
-        if self.angle > 2 * math.pi:
-            self.angle -= 2 * math.pi
-            
-        # Calcular posición en 3D con inclinación orbital
-        self.x = self.distance * math.cos(self.angle)
-        self.y = self.distance * math.sin(self.angle) * math.cos(self.inclination)
-        self.z = self.distance * math.sin(self.angle) * math.sin(self.inclination)
+        # Avance individual; SolarSystem avanza todas las filas a la vez con OrbitalEngine.step
+        self.engine.step_row(self.engine_index, time_factor, (0.0, 0.0, 0.0))
             
         # Actualizar las lunas
         for moon in self.moons:
             moon.update(time_factor, self.x, self.y, self.z)
             
-    def render(self):
-        # Dibujar la órbita
-        glPushMatrix()
-        glColor3f(0.2, 0.2, 0.2)
-        glRotatef(self.inclination * 180 / math.pi, 1, 0, 0)
-        
-        glBegin(GL_LINE_LOOP)
-        for i in range(100):
-            angle = 2 * math.pi * i / 100
-            x = self.distance * math.cos(angle)
-            y = self.distance * math.sin(angle)
-            glVertex3f(x, y, 0)
-        glEnd()
-        glPopMatrix()
-        
-        # Dibujar el planeta
-        super().render()
-        
-        # Dibujar las lunas
-        for moon in self.moons:
-            moon.render()
-            
     def add_moon(self):
-        moon_dist = self.radius * 2 + len(self.moons) * 5
-        new_moon = Moon(moon_dist, 2, (200, 200, 200), 30)
-        self.moons.append(new_moon)
-        self.moon_count += 1
+        self.add_moons(1)
+
+    def add_moons(self, count):
+        """
+        Añade `count` lunas con una sola operación sobre el motor: todas las
+        filas se reservan y se colocan en su órbita a la vez, y las vistas
+        salen de la lista libre (self.moon_pool). Devuelve las lunas nuevas.
+        """
+        if count <= 0:
+            return []
+        first = len(self.moons)
+        distances = self.radius * 2 + np.arange(first, first + count) * MOON_SPACING
+        rows = self.engine.add_rows(distances, MOON_PERIOD, parent=self.engine_index, mass=DEFAULT_MOON_MASS,
+                                    radius=MOON_RADIUS, color=MOON_COLOR, catalog=False)
+        moons = self.moon_pool.acquire(self.engine, rows)
+        self.moons.extend(moons)
+        self.moon_count = len(self.moons)
+        return moons
         
-    def remove_moon(self):
+    def remove_moon(self, moon=None):
+        # Quitar la luna indicada o, por defecto, la última añadida
+        if moon is not None and moon not in self.moons:
+            return
         if self.moons:
-            self.moons.pop()
-            self.moon_count -= 1
+            self.remove_moons([self.moons[-1] if moon is None else moon])
+
+    def remove_moons(self, moons):
+        """Quita varias lunas con una sola compactación del motor y devuelve sus vistas a self.moon_pool."""
+        if not moons:
+            return
+        self.engine.remove_rows([moon.engine_index for moon in moons])
+        if moons == self.moons[len(self.moons) - len(moons):]:
+            del self.moons[len(self.moons) - len(moons):]  # Las últimas: sin recorrer la lista
+        else:
+            removed = set(map(id, moons))
+            self.moons[:] = [moon for moon in self.moons if id(moon) not in removed]
+        self.moon_count = len(self.moons)
+        self.moon_pool.release(moons)
             
     def set_number_of_moons(self, number):
+        # Llegar a `number` lunas en una sola operación, sean cuantas sean
         current = len(self.moons)
         if number > current:
-            # Añadir lunas
-            for _ in range(number - current):
-                self.add_moon()
+            self.add_moons(number - current)
         elif number < current:
-            # Quitar lunas
-            for _ in range(current - number):
-                self.remove_moon()
+            self.remove_moons(self.moons[number:])
                 
     def cleanup(self):
         super().cleanup()
@@ -0,0 +1,53 @@
+import math
+
+# Antes la simulación avanzaba `time_factor` días por fotograma a 60 FPS;
+# el reloj conserva esa equivalencia para que la velocidad no cambie.
+BASE_FRAME_RATE = 60.0
+
+
+class SimulationClock:
+    """
+    Reloj de paso fijo que desacopla la simulación del ritmo de dibujado.
+
+    El tiempo real de cada fotograma se acumula y se consume en pasos de
+    duración fija, así los años simulados por segundo no dependen de lo que
+    tarde el render. El resto acumulado (alpha) sirve para interpolar entre
+    los dos últimos estados simulados.
+
+    Args:
+        step_rate: Pasos de simulación por segundo real (puede ser menor que los FPS)
+        max_substep_angle: Ángulo máximo en radianes que avanza un cuerpo por subpaso
+        max_substeps: Límite de subpasos por paso a velocidades muy altas
+        max_frame_time: Tiempo real máximo consumido por fotograma (evita la espiral
+            de pasos cuando un fotograma se bloquea)
+    """
+    def __init__(self, step_rate=60.0, max_substep_angle=0.05, max_substeps=32, max_frame_time=0.25):
+        self.step_rate = step_rate
+        self.step_seconds = 1.0 / step_rate
+        self.max_substep_angle = max_substep_angle
+        self.max_substeps = max_substeps
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+
+    def days_per_step(self, time_factor):
+        return time_factor * BASE_FRAME_RATE * self.step_seconds
+
+    def substeps(self, days, shortest_period):
+        """Número de subpasos para que ningún cuerpo salte más de max_substep_angle."""
+        angle = 2 * math.pi * abs(days) / shortest_period
+        return min(self.max_substeps, max(1, math.ceil(angle / self.max_substep_angle)))
+
+    def consume(self, wall_seconds):
+        """Acumula tiempo real y devuelve cuántos pasos fijos hay que simular."""
+        self.accumulator += min(wall_seconds, self.max_frame_time)
+        steps = int(self.accumulator / self.step_seconds)
+        self.accumulator -= steps * self.step_seconds
+        return steps
+
+    @property
+    def alpha(self):
+        """Fracción del siguiente paso ya transcurrida (0..1), para interpolar."""
+        return self.accumulator / self.step_seconds
+
+    def reset(self):
+        self.accumulator = 0.0
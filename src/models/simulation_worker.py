@@ -0,0 +1,333 @@
+import multiprocessing
+import queue
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from models.checkpoint import capture
+
+# Cabecera de cada instantánea: `sequence` es impar mientras se escribe y
+# `serial` numera las publicaciones de las dos mitades. `gravity` indica si
+# lleva el estado del modo gravitatorio (velocidades, `dynamic` y el sol)
+SLOT_DTYPE = np.dtype([("sequence", "i8"), ("serial", "i8"), ("layout", "i8"), ("jumps", "i8"),
+                       ("count", "i8"), ("time", "f8"), ("wall", "f8"), ("gravity", "i8"),
+                       ("sun_position", "f8", (3,)), ("sun_velocity", "f8", (3,)), ("shortest_period", "f8")])
+HEADER_BYTES = 8  # Índice (int64) de la instantánea publicada
+MIN_CAPACITY = 1024
+STOP_TIMEOUT = 2.0
+
+# Órdenes que cambian las filas del motor: ambos procesos deben aplicarlas
+# en el mismo orden para que los índices coincidan
+LAYOUT_COMMANDS = ("add_moon", "remove_moon_at", "set_number_of_moons", "load_catalog", "restore")
+# Órdenes tras las que no se interpola desde la instantánea anterior
+JUMP_COMMANDS = ("seek", "set_simulation_mode", "restore")
+
+
+class SnapshotBuffer:
+    """
+    Doble búfer de posiciones (y, en el modo gravitatorio, velocidades) en
+    memoria compartida.
+
+    Un solo escritor (el proceso de simulación) escribe en la instantánea
+    que no está publicada y después cambia el índice de la publicada; el
+    lector (el bucle de dibujo) lee la publicada directamente de la memoria
+    compartida, sin colas ni cerrojos. Cada instantánea lleva un contador
+    de secuencia (seqlock): es impar mientras se escribe, así que si el
+    escritor la alcanza durante una lectura el lector lo detecta y la
+    descarta.
+
+    Args:
+        capacity: Filas máximas por instantánea
+        name: Bloque existente al que conectarse (None: crear uno nuevo)
+    """
+    def __init__(self, capacity, name=None):
+        self.capacity = capacity
+        vectors = 2 * capacity * 3 * 8
+        size = HEADER_BYTES + 2 * SLOT_DTYPE.itemsize + 2 * vectors + 2 * capacity
+        self.memory = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.name = self.memory.name
+        buffer = self.memory.buf
+        offset = HEADER_BYTES + 2 * SLOT_DTYPE.itemsize
+        self.front = np.ndarray((1,), np.int64, buffer=buffer)
+        self.slots = np.ndarray((2,), SLOT_DTYPE, buffer=buffer, offset=HEADER_BYTES)
+        self.positions = np.ndarray((2, capacity, 3), np.float64, buffer=buffer, offset=offset)
+        self.velocities = np.ndarray((2, capacity, 3), np.float64, buffer=buffer, offset=offset + vectors)
+        self.dynamic = np.ndarray((2, capacity), np.bool_, buffer=buffer, offset=offset + 2 * vectors)
+        if name is None:
+            self.front[0] = 0
+            self.slots[:] = 0
+
+    def publish(self, engine, layout, jumps, wall, gravity=None):
+        """
+        Escribe una instantánea de `engine` en la mitad libre y la publica.
+        Con `gravity` (GravitySimulation) copia también su estado.
+        """
+        front = int(self.front[0])
+        back = 1 - front
+        sequence = self.slots["sequence"]
+        sequence[back] += 1  # Impar: escritura en curso
+        self.slots["serial"][back] = self.slots["serial"][front] + 1
+        count = engine.count
+        self.positions[back, :count] = engine.position[:count]
+        self.slots["gravity"][back] = gravity is not None
+        if gravity is not None:
+            self.velocities[back, :count] = engine.velocity[:count]
+            self.dynamic[back, :count] = engine.dynamic[:count]
+            self.slots["sun_position"][back] = gravity.sun_position
+            self.slots["sun_velocity"][back] = gravity.sun_velocity
+            self.slots["shortest_period"][back] = gravity.shortest_period
+        self.slots["layout"][back] = layout
+        self.slots["jumps"][back] = jumps
+        self.slots["count"][back] = count
+        self.slots["time"][back] = engine.time
+        self.slots["wall"][back] = wall
+        sequence[back] += 1
+        self.front[0] = back
+
+    def read(self, out, velocities=None, dynamic=None):
+        """
+        Copia la instantánea publicada en `out` (arreglo (n, 3) con al menos
+        `count` filas) y devuelve su cabecera como diccionario, o None si no
+        hay ninguna todavía o el escritor la estaba sobrescribiendo. Si lleva
+        el estado del modo gravitatorio y se pasan `velocities` y `dynamic`,
+        lo copia también en ellos.
+        """
+        front = int(self.front[0])
+        sequence = int(self.slots["sequence"][front])
+        if sequence == 0 or sequence % 2:
+            return None
+        header = {field: self.slots[field][front].tolist() for field in SLOT_DTYPE.names}
+        count = header["count"]
+        if count > len(out):
+            return None
+        out[:count] = self.positions[front, :count]
+        if header["gravity"] and velocities is not None:
+            velocities[:count] = self.velocities[front, :count]
+            dynamic[:count] = self.dynamic[front, :count]
+        if int(self.slots["sequence"][front]) != sequence:
+            return None  # Sobrescrita durante la copia
+        return header
+
+    def close(self, unlink=False):
+        # Soltar las vistas antes de cerrar el bloque
+        del self.front, self.slots, self.positions, self.velocities, self.dynamic
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+
+class SimulationWorker:
+    """
+    Ejecuta la simulación de un SolarSystem en otro proceso.
+
+    El proceso recibe una copia del sistema y avanza con pasos fijos a su
+    propio ritmo (el del SimulationClock), así que una simulación pesada
+    (muchas lunas, el modo gravitatorio) no frena la entrada ni el dibujado.
+    Tras cada tanda de pasos publica las posiciones en un SnapshotBuffer;
+    el proceso principal las adopta en `sync` e interpola entre las dos
+    últimas, igual que con los pasos locales.
+
+    Los cambios de control (velocidad, lunas, saltos en el tiempo, modo)
+    viajan por una cola de órdenes. Las que cambian las filas del motor se
+    aplican también en el proceso principal, para que la interfaz y la
+    selección con el ratón los vean enseguida; cada instantánea indica
+    cuántas de ellas incluye y solo se adopta cuando coincide con el
+    estado local. Si el proceso termina, `recover` copia la última
+    instantánea (con las velocidades del modo gravitatorio) para seguir
+    simulando en el proceso principal.
+
+    Args:
+        solar_system: Sistema cuya simulación se traslada al proceso
+        context: Método de arranque de multiprocessing ("spawn" por defecto:
+            el proceso no hereda la ventana ni el contexto OpenGL)
+    """
+    def __init__(self, solar_system, context="spawn"):
+        if solar_system.gravity is not None or solar_system.ephemeris is not None:
+            raise ValueError("El proceso de simulación debe iniciarse en modo cinemático y sin efemérides")
+        engine = solar_system.engine
+        self.buffer = SnapshotBuffer(max(MIN_CAPACITY, 2 * engine.count))
+        self.layout = 0  # Órdenes que cambian las filas enviadas
+        self.ready = False  # Ya se adoptó alguna instantánea
+        self.steps = 0  # Instantáneas adoptadas
+        self._header = None
+        self._previous_wall = None
+        self._previous_time = engine.time
+
+        context = multiprocessing.get_context(context)
+        self.commands = context.Queue()
+        self.results = context.Queue()  # Estados guardados que pide la orden "checkpoint"
+        self.process = context.Process(target=_serve, name="simulation",
+                                       args=(solar_system, self.commands, self.results, self.buffer.name,
+                                             self.buffer.capacity), daemon=False)
+        self.process.start()
+
+    def running(self):
+        return self.process.is_alive()
+
+    def send(self, command, *args, count=None):
+        """
+        Envía una orden (nombre de un método de SolarSystem, "time_factor"
+        o "checkpoint", que devuelve una copia del estado por `captures`).
+        `count` es el número de filas del motor local tras aplicarla, para
+        ampliar antes la memoria compartida si hace falta.
+        """
+        if count is not None and count > self.buffer.capacity:
+            self._grow(count)
+        self.commands.put((command, args))
+        if command in LAYOUT_COMMANDS:
+            self.layout += 1
+
+    def captures(self, wait=0):
+        """
+        Copias del estado (Checkpoint) ya recibidas de las órdenes
+        "checkpoint", en orden. Con `wait` espera a recibir al menos esas.
+        """
+        received = []
+        while True:
+            try:
+                if len(received) < wait:
+                    received.append(self.results.get(timeout=STOP_TIMEOUT))
+                else:
+                    received.append(self.results.get_nowait())
+            except queue.Empty:
+                return received
+
+    def _grow(self, count):
+        # Bloque nuevo con el doble de capacidad; el antiguo se desvincula ya
+        # (el proceso de simulación conserva su mapeo hasta cambiar de bloque)
+        capacity = max(2 * self.buffer.capacity, 1 << (count - 1).bit_length())
+        old = self.buffer
+        self.buffer = SnapshotBuffer(capacity)
+        self.commands.put(("buffer", (self.buffer.name, capacity)))
+        old.close(unlink=True)
+
+    def sync(self, engine):
+        """
+        Adopta la última instantánea publicada (si es nueva y corresponde a
+        las filas actuales) y calcula las posiciones a dibujar interpolando
+        entre las dos últimas. Devuelve (instantáneas adoptadas, instante en
+        días de las posiciones dibujadas).
+        """
+        n = engine.count
+        slots = self.buffer.slots
+        front = int(self.buffer.front[0])
+        adopted = 0
+        fresh = self._header is None or int(slots["serial"][front]) != self._header["serial"]
+        if fresh and int(slots["layout"][front]) == self.layout and int(slots["count"][front]) == n:
+            # Una sola copia por instantánea adoptada (no por fotograma): se
+            # copia sobre `previous_position` y después se intercambian los
+            # papeles, así que el estado actual pasa a ser el anterior sin
+            # copiarlo. No se interpola leyendo la memoria compartida: con dos
+            # mitades, la siguiente que escribe el proceso es justo la de la
+            # instantánea anterior, y la interpolación la lee durante varios
+            # fotogramas; la copia, además, es lo que el seqlock valida
+            header = self.buffer.read(engine.previous_position[:n])
+            if header is None:
+                engine.store_previous()  # Copia incompleta: descartarla
+            else:
+                engine.previous_position, engine.position = engine.position, engine.previous_position
+                jumped = self._header is None or header["jumps"] != self._header["jumps"]
+                if jumped:
+                    # Sin interpolar desde antes de un salto en el tiempo
+                    engine.previous_position[:n] = engine.position[:n]
+                    self._previous_time = header["time"]
+                    self._previous_wall = None
+                else:
+                    self._previous_time = engine.time
+                    self._previous_wall = self._header["wall"]
+                engine.time = header["time"]
+                self._header = header
+                self.ready = True
+                self.steps += 1
+                adopted = 1
+
+        if self._header is None:
+            return 0, engine.time
+        # Interpolar según el tiempo real desde la instantánea actual,
+        # con la separación entre las dos últimas como duración del paso
+        alpha = 1.0
+        if self._previous_wall is not None:
+            interval = self._header["wall"] - self._previous_wall
+            if interval > 0:
+                alpha = min(max((time.monotonic() - self._header["wall"]) / interval, 0.0), 1.0)
+        engine.interpolate(alpha)
+        return adopted, self._previous_time + (engine.time - self._previous_time) * alpha
+
+    def recover(self, engine):
+        """
+        Copia en `engine` la última instantánea publicada: posiciones y, en el
+        modo gravitatorio, velocidades y `dynamic`. Devuelve su cabecera, o
+        None si no hay ninguna que corresponda a las filas actuales (el
+        proceso no llegó a aplicar las últimas órdenes). Se llama tras `stop`.
+        """
+        n = engine.count
+        slots = self.buffer.slots
+        front = int(self.buffer.front[0])
+        if int(slots["layout"][front]) != self.layout or int(slots["count"][front]) != n:
+            return None
+        return self.buffer.read(engine.position[:n], engine.velocity[:n], engine.dynamic[:n])
+
+    def stop(self):
+        """Detiene el proceso; la última instantánea sigue disponible hasta `close`."""
+        if self.process.is_alive():
+            self.commands.put(("stop", ()))
+            self.process.join(STOP_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+
+    def close(self):
+        """Detiene el proceso y libera la memoria compartida."""
+        self.stop()
+        self.commands.close()
+        self.results.close()
+        self.buffer.close(unlink=True)
+
+
+def _serve(solar_system, commands, results, buffer_name, capacity):
+    """Bucle del proceso de simulación: órdenes, pasos fijos y publicación."""
+    buffer = SnapshotBuffer(capacity, buffer_name)
+    engine = solar_system.engine
+    clock = solar_system.clock
+    clock.reset()
+    layout = jumps = 0
+    last = time.monotonic()
+    publish = True
+    try:
+        while True:
+            # Esperar al siguiente paso, o menos si llega una orden
+            timeout = max(clock.step_seconds - clock.accumulator, 0.0)
+            try:
+                command, args = commands.get(timeout=timeout)
+            except queue.Empty:
+                command = None
+            while command is not None:
+                if command == "stop":
+                    return
+                if command == "buffer":
+                    buffer.close()
+                    buffer = SnapshotBuffer(args[1], args[0])
+                elif command == "time_factor":
+                    solar_system.time_factor = args[0]
+                elif command == "checkpoint":
+                    results.put(capture(solar_system))
+                else:
+                    getattr(solar_system, command)(*args)
+                    layout += command in LAYOUT_COMMANDS
+                    jumps += command in JUMP_COMMANDS
+                publish = True
+                try:
+                    command, args = commands.get_nowait()
+                except queue.Empty:
+                    command = None
+
+            now = time.monotonic()
+            steps = clock.consume(now - last)
+            last = now
+            for _ in range(steps):
+                solar_system.step(clock.days_per_step(solar_system.time_factor))
+            if steps or publish:
+                buffer.publish(engine, layout, jumps, time.monotonic(), solar_system.gravity)
+                publish = False
+    finally:
+        buffer.close()
+        solar_system.cleanup()
@@ -1,82 +1,501 @@
-import pygame
-import math
 import numpy as np
-from OpenGL.GL import *
-from OpenGL.GLU import *
 from models.planet import Planet
+from models.moon import MoonPool
+from models.particle_belt import ParticleBelt
+from models.checkpoint import CheckpointStore, capture
+from models.simulation_worker import SimulationWorker
+from models.orbital_engine import OrbitalEngine
+from models.simulation_clock import SimulationClock
+from models.gravity import GravitySimulation
+from models.ephemeris import EphemerisCache
+from data.loader import load_planets, read_catalog
+from data.planets_data import load_belts_data
+from animation.camera import CameraState
+from animation.culling import BoundingSphereBVH, ray_sphere_distances
+from diagnostics.profiler import profiler
 
 class SolarSystem:
-    def __init__(self):
+    """
+    Sistema solar: el sol, los planetas (con sus lunas) y los cuerpos de
+    catálogo, todos como filas del mismo OrbitalEngine, más los cinturones
+    de partículas (asteroides, Kuiper, anillos), que se mueven aparte.
+
+    Args:
+        planets_path: Archivo JSON con los planetas (por defecto los de
+            data/planets_data.py)
+    """
+    def __init__(self, planets_path=None):
         self.sun_radius = 30
         self.planets = []
-        self.time_factor = 1.0
+        self._time_factor = 1.0
+        # Proceso de simulación (ver start_worker); None: se simula aquí
+        self.worker = None
+        # Estados guardados (escritos en segundo plano) y capturas pedidas
+        # al proceso de simulación que aún no han llegado: (ruta, vista)
+        self.checkpoints = CheckpointStore()
+        self._pending_captures = []
+        # Motor compartido: planetas y lunas viven como filas de los mismos arreglos
+        self.engine = OrbitalEngine()
+        # Vistas Moon libres para reutilizar al añadir lunas o restaurar estados
+        self.moon_pool = MoonPool()
+        # Reloj de paso fijo; el tiempo simulado vive en el motor (elapsed_days)
+        self.clock = SimulationClock()
+        # Cámara del último fotograma dibujado (la fija el Renderer) e índice
+        # espacial de los cuerpos, para el descarte y la selección con el ratón
+        self.camera = CameraState()
+        self.spatial_index = BoundingSphereBVH()
+        # Modo de simulación: órbitas cinemáticas o gravedad N cuerpos
+        self.simulation_mode = "kinematic"
+        self.gravity = None
+        # Efemérides precalculadas (opcionales) para reproducir sin calcular
+        self.ephemeris = None
+        self._ephemeris_revision = None
         
-        # Crear planetas con inclinaciones reales aproximadas
-        # (nombre, distancia al sol, radio, color, periodo orbital, inclinación)
-        self.planets.append(Planet("Mercurio", 70, 5, (200, 200, 200), 88, 7))
-        self.planets.append(Planet("Venus", 100, 8, (255, 190, 0), 225, 3.4))
-        self.planets.append(Planet("Tierra", 130, 10, (0, 100, 255), 365, 0))
-        self.planets.append(Planet("Marte", 170, 7, (255, 50, 0), 687, 1.9))
-        self.planets.append(Planet("Júpiter", 230, 20, (255, 200, 100), 4333, 1.3))
-        self.planets.append(Planet("Saturno", 290, 17, (255, 220, 150), 10759, 2.5))
-        self.planets.append(Planet("Urano", 340, 14, (180, 220, 255), 30687, 0.8))
-        self.planets.append(Planet("Neptuno", 380, 14, (50, 50, 255), 60190, 1.8))
-
-        # Cuadric para el sol
-        self.sun_quad = gluNewQuadric()
+        # Crear los planetas con sus elementos orbitales (ver data/planets_data.py)
+        self.planet_rows = {}  # Clave y nombre de cada planeta -> fila del motor
+        for key, data in load_planets(planets_path).items():
+            self.planets.append(Planet(data["name"], data["distance"], data["radius"], data["color"],
+                                       data["orbital_period"], data["inclination"], engine=self.engine,
+                                       mass=data["mass"], eccentricity=data["eccentricity"],
+                                       periapsis=data["periapsis"], ascending_node=data["ascending_node"],
+                                       mean_anomaly=data["mean_anomaly"], moon_pool=self.moon_pool))
+            self.planet_rows[key] = self.planet_rows[data["name"]] = self.planets[-1].engine_index
+            self.planets[-1].known_moons = data.get("moons", 0)
+            if "rings" in data:
+                self.planets[-1].rings = ParticleBelt.from_data(f"Anillos de {data['name']}", data["rings"],
+                                                                parent=self.planets[-1])
+
+        # Cinturones de partículas: los del sol y los anillos de los planetas
+        self.belts = [ParticleBelt.from_data(name, data) for name, data in load_belts_data().items()]
+        self.belts.extend(planet.rings for planet in self.planets if planet.rings is not None)
+        self.belts_enabled = True
+        self._update_belts(self.engine.time)
         
         # Inicializar rotación de la vista
         self.rotation_x = 0
         self.rotation_y = 0
 
+    @property
+    def time_factor(self):
+        return self._time_factor
+
+    @time_factor.setter
+    def time_factor(self, value):
+        self._time_factor = value
+        self._forward("time_factor", value)
+
+    def __getstate__(self):
+        # Copia que recibe el proceso de simulación: los cinturones se
+        # mueven en el proceso principal y el proceso no se copia a sí mismo
+        state = self.__dict__.copy()
+        state["belts"] = []
+        state["worker"] = None
+        state["checkpoints"] = None
+        state["_pending_captures"] = []
+        return state
+
+    def start_worker(self):
+        """
+        Traslada la simulación a un proceso aparte (ver SimulationWorker).
+        Mientras arranca, el sistema se queda quieto; si el proceso termina
+        inesperadamente, la simulación vuelve a este proceso.
+        """
+        if self.worker is None:
+            self.worker = SimulationWorker(self)
+
+    def stop_worker(self):
+        """
+        Detiene el proceso de simulación y sigue simulando aquí desde su
+        última instantánea: el instante, las posiciones y, en el modo
+        gravitatorio, las velocidades y el estado del sol.
+        """
+        if self.worker is None:
+            return
+        if self._pending_captures:
+            print("Se perdieron los estados pendientes de guardar del proceso de simulación")
+            self._pending_captures.clear()
+        worker, self.worker = self.worker, None
+        worker.stop()
+        engine = self.engine
+        n = engine.count
+        if self.simulation_mode == "gravity":
+            self._start_gravity()  # Antes de copiar `dynamic`, que GravitySimulation reinicia
+        header = worker.recover(engine)
+        worker.close()
+        if header is not None:
+            engine.time = header["time"]
+        if self.gravity is None or header is None or not header["gravity"]:
+            # Modo cinemático, o la instantánea no llegó a incluir las últimas
+            # órdenes: posiciones en forma cerrada (en gravedad, de nuevo
+            # desde órbitas de Kepler)
+            engine.update_positions()
+        else:
+            engine.angle[:n] = engine.angles_at(engine.time)
+            self.gravity.sun_position = np.array(header["sun_position"])
+            self.gravity.sun_velocity = np.array(header["sun_velocity"])
+            self.gravity.shortest_period = header["shortest_period"]
+        engine.snap()
+        self.clock.reset()
+        self._refresh_spatial_index()
+
+    def _forward(self, command, *args):
+        # Reenviar una orden al proceso de simulación, si lo hay
+        if self.worker is not None:
+            self.worker.send(command, *args, count=self.engine.count)
+
+    def step(self, days):
+        """Un paso de simulación de `days` días, sin interpolar ni reajustar el índice espacial."""
+        self.engine.store_previous()
+        self._simulate(days)
+
     def update(self):
+        # Un paso de `time_factor` días, sin interpolación (modo sin ventana)
+        with profiler.section("update.simulate"):
+            self.step(self.time_factor)
+            self.engine.interpolate(1.0)
+        with profiler.section("update.index"):
+            self._refresh_spatial_index()
+        self._update_belts(self.engine.time)
+
+    def advance(self, wall_seconds):
+        """
+        Avanza la simulación según el tiempo real transcurrido usando pasos
+        fijos y deja listas las posiciones interpoladas para dibujar.
+        Devuelve el número de pasos simulados (con el proceso de
+        simulación, el de instantáneas nuevas adoptadas).
+        """
+        if self.worker is not None and not self.worker.running():
+            print("El proceso de simulación terminó; se continúa en el proceso principal")
+            self.stop_worker()
+        if self.worker is not None:
+            with profiler.section("update.simulate"):
+                steps, render_days = self.worker.sync(self.engine)
+            if self._pending_captures:
+                self._collect_captures()
+        else:
+            steps = self.clock.consume(wall_seconds)
+            with profiler.section("update.simulate"):
+                for _ in range(steps):
+                    self.step(self.clock.days_per_step(self.time_factor))
+                self.engine.interpolate(self.clock.alpha)
+            # Mismo instante que las posiciones interpoladas de los cuerpos
+            render_days = self.engine.time - (1.0 - self.clock.alpha) * self.clock.days_per_step(self.time_factor)
+        with profiler.section("update.index"):
+            self._refresh_spatial_index()
+        self._update_belts(render_days)
+        return steps
+
+    def _simulate(self, days):
+        if self.gravity is not None:
+            # La integración numérica sí necesita subpasos a velocidades altas
+            substeps = self.clock.substeps(days, self.gravity.shortest_period)
+            for _ in range(substeps):
+                self.gravity.step(days / substeps)
+            return
+        # Las posiciones son exactas en forma cerrada: no hace falta subdividir
+        cache = self._ephemeris_for(self.engine.time + days)
+        if cache is not None:
+            self._play_ephemeris(cache, self.engine.time + days)
+            return
+        self.engine.step(days)
+
+    def _play_ephemeris(self, cache, days):
+        # Posiciones desde el archivo precalculado; las anomalías, en forma
+        # cerrada, para que `angle` siga al día (al cambiar a gravedad, etc.)
+        engine = self.engine
+        engine.time = float(days)
+        engine.angle[:engine.count] = engine.angles_at(engine.time)
+        cache.positions_at(engine.time, out=engine.position[:engine.count])
+
+    def precompute_ephemeris(self, path, start_days, end_days, step_days=1.0):
+        """
+        Precalcula las posiciones de todos los cuerpos entre `start_days` y
+        `end_days` cada `step_days` días en un archivo mapeado en memoria, o
+        reutiliza el existente si corresponde a esta misma configuración.
+        Mientras la configuración no cambie, el modo cinemático reproduce
+        las posiciones desde el archivo dentro de ese rango. Con el proceso
+        de simulación lo hace él (y devuelve None).
+        """
+        if self.worker is not None:
+            self._forward("precompute_ephemeris", path, start_days, end_days, step_days)
+            return None
+        cache = EphemerisCache(path)
+        if cache.matches(self.engine, start_days, end_days, step_days):
+            cache.open()
+        else:
+            cache.build(self.engine, start_days, end_days, step_days)
+        self.ephemeris = cache
+        self._ephemeris_revision = self.engine.revision
+        return cache
+
+    def _ephemeris_for(self, days):
+        # Solo en modo cinemático, con la misma configuración y dentro del rango
+        cache = self.ephemeris
+        if cache is None or self.gravity is not None:
+            return None
+        if self.engine.revision != self._ephemeris_revision:
+            # Se añadieron lunas o cambió alguna órbita: el archivo quedó obsoleto
+            cache.close()
+            self.ephemeris = None
+            return None
+        return cache if cache.covers(days) else None
+
+    def set_simulation_mode(self, mode):
+        """
+        Cambia entre "kinematic" (órbitas circulares en forma cerrada) y
+        "gravity" (N cuerpos con Barnes-Hut). Al activar la gravedad cada
+        cuerpo parte de su posición actual en órbita circular; al volver al
+        modo cinemático los cuerpos regresan a sus órbitas fijas.
+        """
+        if mode not in ("kinematic", "gravity"):
+            raise ValueError(f"Modo de simulación desconocido: {mode}")
+        if mode == self.simulation_mode:
+            return
+        if self.worker is not None:
+            # El cambio lo hace el proceso de simulación, como los saltos en el tiempo
+            self._forward("set_simulation_mode", mode)
+            self.simulation_mode = mode
+            return
+        if mode == "gravity":
+            self._start_gravity()
+        else:
+            self.gravity.close()
+            self.gravity = None
+            self.engine.update_positions()
+        self.simulation_mode = mode
+        self.engine.snap()
+        self.clock.reset()
+        self._refresh_spatial_index()
+
+    def _start_gravity(self):
+        self.gravity = GravitySimulation(self.engine)
+
+    def toggle_simulation_mode(self):
+        self.set_simulation_mode("kinematic" if self.simulation_mode == "gravity" else "gravity")
+
+    @property
+    def elapsed_days(self):
+        # Tiempo absoluto de la simulación en días
+        return self.engine.time
+
+    def seek(self, days):
+        """
+        Salta al instante `days` sin interpolar: en tiempo constante en el
+        modo cinemático; integrando paso a paso en el modo gravitatorio.
+        Con el proceso de simulación el salto lo hace él.
+        """
+        if self.worker is not None:
+            self._forward("seek", days)
+            return
+        cache = self._ephemeris_for(days)
+        if self.gravity is not None:
+            self.gravity.integrate(days - self.engine.time, self.clock.max_substep_angle)
+        elif cache is not None:
+            self._play_ephemeris(cache, days)
+        else:
+            self.engine.seek(days)
+        self.engine.snap()
+        self.clock.reset()
+        self._refresh_spatial_index()
+        self._update_belts(self.engine.time)
+
+    def save_checkpoint(self, path):
+        """
+        Guarda el estado actual en `path` (ver models/checkpoint.py). Aquí
+        solo se copian los arreglos; el archivo se escribe en segundo plano.
+        Con el proceso de simulación, la copia la hace él (tiene las
+        velocidades del modo gravitatorio) y se escribe al recibirla.
+        """
+        if self.worker is not None:
+            self._pending_captures.append((path, [self.rotation_x, self.rotation_y]))
+            self.worker.send("checkpoint")
+        else:
+            self.checkpoints.save(path, capture(self))
+
+    def _collect_captures(self, wait=False):
+        # Escribir las copias que ya envió el proceso de simulación, con la
+        # vista del momento en que se pidieron
+        for checkpoint in self.worker.captures(wait and len(self._pending_captures)):
+            path, rotation = self._pending_captures.pop(0)
+            checkpoint.header["rotation"] = rotation
+            self.checkpoints.save(path, checkpoint)
+
+    def checkpoint_state(self, path):
+        """"saving", "saved", "failed" o None si `path` no se ha guardado en esta sesión."""
+        if any(pending == path for pending, _ in self._pending_captures):
+            return "saving"
+        return self.checkpoints.state(path)
+
+    def load_checkpoint(self, path):
+        """Restaura el estado guardado en `path` (los últimos usados se leen de memoria)."""
+        if self._pending_captures:
+            self._collect_captures(wait=True)
+        self.restore(self.checkpoints.load(path))
+
+    def restore(self, checkpoint):
+        """
+        Sustituye el estado actual por el de un Checkpoint: las filas del
+        motor se copian en bloque y las vistas Moon salen de `moon_pool`.
+        Los planetas deben ser los mismos que al guardarlo.
+        """
+        header = checkpoint.header
+        if header["planets"] != [planet.name for planet in self.planets]:
+            raise ValueError("El estado guardado es de otro sistema de planetas")
+        if self.gravity is not None:
+            self.gravity.close()
+            self.gravity = None
         for planet in self.planets:
-            planet.update(self.time_factor)
-            
-    def render(self):
-        # Aplicar rotación de la vista
-        glRotatef(self.rotation_x, 1, 0, 0)
-        glRotatef(self.rotation_y, 0, 1, 0)
-        
-        # Dibujar el sol
-        glPushMatrix()
-        glColor3f(1.0, 1.0, 0.0)
-        
-        # Configurar luz para el sol
-        light_position = [0, 0, 0, 1.0]
-        light_ambient = [0.2, 0.2, 0.2, 1.0]
-        light_diffuse = [1.0, 1.0, 0.8, 1.0]
-        light_specular = [1.0, 1.0, 1.0, 1.0]
-        
-        glLightfv(GL_LIGHT0, GL_POSITION, light_position)
-        glLightfv(GL_LIGHT0, GL_AMBIENT, light_ambient)
-        glLightfv(GL_LIGHT0, GL_DIFFUSE, light_diffuse)
-        glLightfv(GL_LIGHT0, GL_SPECULAR, light_specular)
-        
-        # Material para el sol
-        ambient = [1.0, 1.0, 0.0, 1.0]
-        diffuse = [1.0, 1.0, 0.0, 1.0]
-        specular = [1.0, 1.0, 1.0, 1.0]
-        
-        glMaterialfv(GL_FRONT, GL_AMBIENT, ambient)
-        glMaterialfv(GL_FRONT, GL_DIFFUSE, diffuse)
-        glMaterialfv(GL_FRONT, GL_SPECULAR, specular)
-        glMaterialf(GL_FRONT, GL_SHININESS, 100.0)
-        
-        gluSphere(self.sun_quad, self.sun_radius, 32, 32)
-        glPopMatrix()
-        
-        # Dibujar planetas
-        for planet in self.planets:
-            planet.render()
+            self.moon_pool.release(planet.moons)
+        bodies = list(self.planets) + [None] * (checkpoint.count - len(self.planets))
+        self.engine.load_rows(checkpoint.columns, bodies)
+        row = len(self.planets)
+        for planet, moons in zip(self.planets, header["moons"]):
+            planet.moons = self.moon_pool.acquire(self.engine, range(row, row + moons))
+            planet.moon_count = moons
+            row += moons
+        self.engine.time = header["time"]
+        gravity = header["gravity"]
+        if gravity is None:
+            self.engine.update_positions()
+        else:
+            # Las filas ya tienen posición y velocidad: no partir de órbitas circulares
+            n = self.engine.count
+            self.engine.angle[:n] = self.engine.angles_at(self.engine.time)
+            if self.worker is None:  # Con el proceso de simulación, es él quien integra
+                self._start_gravity()
+                self.engine.dynamic[:n] = checkpoint.columns["dynamic"]
+                self.gravity.sun_position = np.array(gravity["sun_position"])
+                self.gravity.sun_velocity = np.array(gravity["sun_velocity"])
+                self.gravity.shortest_period = gravity["shortest_period"]
+        self.simulation_mode = header["simulation_mode"]
+        self._time_factor = header["time_factor"]
+        self.rotation_x, self.rotation_y = header["rotation"]
+
+        self.engine.snap()
+        self.clock.reset()
+        self._refresh_spatial_index()
+        self._update_belts(self.engine.time)
+        self._forward("restore", checkpoint)
+
+    def _update_belts(self, days):
+        # Partículas sin masa: siempre en forma cerrada, también en el modo gravitatorio
+        if not self.belts_enabled:
+            return
+        with profiler.section("update.belts"):
+            for belt in self.belts:
+                belt.update(days)
+
+    def set_belt_density(self, fraction):
+        """Fracción (0-1) de las partículas de cada cinturón que se mueven y se dibujan."""
+        for belt in self.belts:
+            belt.set_density(fraction)
+        self._update_belts(self.engine.time)
+
+    def set_belts_enabled(self, enabled):
+        """Activa o desactiva los cinturones de partículas (ni se mueven ni se dibujan)."""
+        self.belts_enabled = enabled
+        self._update_belts(self.engine.time)
+
+    def _refresh_spatial_index(self):
+        # Reajustar (o reconstruir) el índice con las posiciones que se dibujan
+        n = self.engine.count
+        self.spatial_index.update(self.engine.render_position[:n], self.engine.radius[:n])
+
+    def current_spatial_index(self):
+        """Índice espacial al día (se reconstruye si cambió el número de cuerpos)."""
+        if self.spatial_index.count != self.engine.count:
+            self._refresh_spatial_index()  # Cambió el número de lunas
+        return self.spatial_index
+
+    def jump_to_year(self, year):
+        self.seek(year * 365.0)
+
+    def positions_at(self, days):
+        """
+        Posiciones de todos los cuerpos en uno o varios instantes (días),
+        sin alterar el estado actual. Útil para análisis fuera de línea.
+        Usa siempre el modelo cinemático.
+        """
+        return self.engine.evaluate(days)
             
+    def pick(self, x, y):
+        """
+        Cuerpo (Planet o Moon) bajo el píxel (x, y) de la ventana, o None.
+
+        Usa la cámara del último fotograma dibujado: el índice espacial
+        descarta casi todo el sistema y solo los cuerpos de las hojas que
+        corta el rayo se prueban con la intersección exacta rayo-esfera.
+        El sol tapa lo que queda detrás de él.
+        """
+        origin, direction = self.camera.ray(x, y)
+        rows = self.current_spatial_index().ray_candidates(origin, direction)
+        rows = rows[~self.engine.catalog[rows]]  # Los cuerpos de catálogo no se seleccionan
+        if len(rows) == 0:
+            return None
+        distances = ray_sphere_distances(origin, direction, self.engine.render_position[rows],
+                                         self.engine.radius[rows])
+        nearest = np.argmin(distances)
+        sun = ray_sphere_distances(origin, direction, np.zeros((1, 3)), np.array([self.sun_radius]))[0]
+        if distances[nearest] == np.inf or sun < distances[nearest]:
+            return None
+        return self.engine.bodies[rows[nearest]]
+
+    def planet_of(self, body):
+        """Índice del planeta al que pertenece `body` (él mismo o su planeta padre)."""
+        row = body.engine_index
+        parent = int(self.engine.parent[row])
+        if parent >= 0:
+            body = self.engine.bodies[parent]
+        return self.planets.index(body)
+
+    def load_catalog(self, path):
+        """
+        Añade los cuerpos de un catálogo (`.csv` o `.npy`, ver
+        data/loader.py) como filas del motor, sin un objeto por cuerpo: se
+        dibujan en lote y no se pueden seleccionar. Devuelve sus índices.
+        """
+        catalog = read_catalog(path)
+        parents = np.full(len(catalog), -1, dtype=np.int64)
+        for name in np.unique(catalog["parent"]):
+            if not name:
+                continue
+            if name not in self.planet_rows:
+                raise ValueError(f"{path}: cuerpo padre desconocido '{name}'")
+            parents[catalog["parent"] == name] = self.planet_rows[name]
+        rows = self.engine.add_rows(catalog["distance"], catalog["orbital_period"],
+                                    np.radians(catalog["inclination"]), parents, catalog["mass"],
+                                    catalog["eccentricity"], np.radians(catalog["periapsis"]),
+                                    np.radians(catalog["ascending_node"]),
+                                    np.radians(catalog["mean_anomaly"]), catalog["radius"],
+                                    np.column_stack((catalog["red"], catalog["green"], catalog["blue"])))
+        self._refresh_spatial_index()
+        self._forward("load_catalog", path)
+        return rows
+
     def add_moon(self, planet_index):
         if 0 <= planet_index < len(self.planets):
             self.planets[planet_index].add_moon()
+            self._forward("add_moon", planet_index)
             
-    def remove_moon(self, planet_index):
+    def remove_moon(self, planet_index, moon=None):
+        # Sin `moon` se quita la última luna del planeta
+        if 0 <= planet_index < len(self.planets):
+            moons = self.planets[planet_index].moons
+            if moon is None or moon in moons:
+                self.remove_moon_at(planet_index, None if moon is None else moons.index(moon))
+
+    def remove_moon_at(self, planet_index, position=None):
+        """Quita la luna número `position` del planeta (la última si es None)."""
+        planet = self.planets[planet_index]
+        if planet.moons:
+            planet.remove_moon(None if position is None else planet.moons[position])
+            self._forward("remove_moon_at", planet_index, position)
+
+    def set_number_of_moons(self, planet_index, number):
+        # En una sola operación (ver Planet.set_number_of_moons)
         if 0 <= planet_index < len(self.planets):
-            self.planets[planet_index].remove_moon()
+            self.planets[planet_index].set_number_of_moons(number)
+            self._forward("set_number_of_moons", planet_index, number)
             
     def get_planet_count(self):
         return len(self.planets)
@@ -97,6 +516,11 @@ class SolarSystem:
                 return planet
         return None
         
+    def set_orbit_segments(self, segments):
+        # Cambiar la suavidad de las órbitas; cada VBO se reconstruye una vez
+        for planet in self.planets:
+            planet.orbit_segments = segments
+
     def rotate_view(self, dx, dy):
         # Rotar la vista basado en el arrastre del ratón
         self.rotation_y += dx * 0.5
@@ -109,7 +533,11 @@ class SolarSystem:
             self.rotation_x = -90
             
     def cleanup(self):
-        # Limpiar recursos de OpenGL
-        gluDeleteQuadric(self.sun_quad)
+        # Los recursos de OpenGL los libera Renderer.release
+        self.stop_worker()
+        if self.checkpoints is not None:
+            self.checkpoints.close()
+        if self.gravity is not None:
+            self.gravity.close()
         for planet in self.planets:
             planet.cleanup()
\ No newline at end of file
@@ -1,15 +1,26 @@
+import os
 import pygame
 from pygame.locals import *
+from ui.hud import CachedText, get_font
 
 class ControlPanel:
     def __init__(self, solar_system):
         self.solar_system = solar_system
         self.selected_planet = 0
-        self.font = pygame.font.SysFont('Arial', 14)
-        self.title_font = pygame.font.SysFont('Arial', 18, bold=True)
+        self.selected_moon = None  # Luna elegida con el ratón (None: ninguna)
+        self.font = get_font('Arial', 14)
+        self.title_font = get_font('Arial', 18, bold=True)
         self.dragging = False
         self.last_mouse_pos = (0, 0)
+        self.press_pos = None  # Dónde empezó el clic, para distinguirlo de un arrastre
+        self.click_tolerance = 4  # Píxeles que puede moverse el ratón en un clic
+        self.ignore_rects = []  # Zonas de la interfaz donde un clic no selecciona cuerpos
         self.needs_refresh = False
+        self.max_moons = None  # Límite de lunas por planeta con las flechas (None: sin límite)
+        # Estados guardados: F5 guarda y F9 carga la ranura elegida con 1-9
+        self.checkpoint_directory = "checkpoints"
+        self.checkpoint_slot = 1
+        self.checkpoint_message = ""  # Resultado de la última carga
         
         # Panel lateral izquierdo
         self.panel_width = 200
@@ -27,6 +38,38 @@ class ControlPanel:
         self.elapsed_years = 0
         self.days_per_update = 1  # Días simulados por actualización
         self.days_in_year = 365
+        self.jump_years = 10  # Años que avanzan/retroceden RePág/AvPág
+        
+        # Instrucciones de control
+        self.instructions = [
+            "← / →: Cambiar planeta",
+            "Clic: Seleccionar cuerpo",
+            "↑: Agregar luna",
+            "↓: Quitar luna",
+            "M: Lunas reales / ninguna",
+            "Arrastrar: Rotar vista",
+            "Z/X: Acercar/Alejar",
+            "RePág/AvPág: ±10 años",
+            "G: Gravedad / órbitas fijas",
+            "B: Cinturones y anillos",
+            "1-9: Elegir ranura",
+            "F5/F9: Guardar/cargar estado",
+            "F3: Tiempos por fase"
+        ]
+        
+        # Panel en modo retenido: capa estática, campos cacheados y superficie
+        # compuesta que se reutiliza entre fotogramas
+        self._static_layer = None
+        self._panel_surface = None
+        self._composed_handle = None
+        self.years_text = CachedText(self.font, (255, 255, 255))
+        self.days_text = CachedText(self.font, (255, 255, 255))
+        self.factor_text = CachedText(self.font, (255, 255, 255))
+        self.planet_text = CachedText(self.font, (255, 255, 255))
+        self.moons_text = CachedText(self.font, (255, 255, 255))
+        self.moon_text = CachedText(self.font, (255, 255, 255))
+        self.mode_text = CachedText(self.font, (255, 255, 255))
+        self.checkpoint_text = CachedText(self.font, (255, 255, 255))
 
     def display(self, screen):
         """
@@ -60,7 +103,8 @@ class ControlPanel:
     def update_moons(self, planet_name, number_of_moons):
         planet = self.solar_system.get_planet(planet_name)
         if planet:
-            planet.set_number_of_moons(number_of_moons)
+            self.solar_system.set_number_of_moons(self.solar_system.planets.index(planet), number_of_moons)
+            self.selected_moon = None  # Su vista puede reutilizarse para otra luna
             self.refresh_display()
 
     def refresh_display(self):
@@ -130,10 +174,18 @@ class ControlPanel:
             else:
                 self.dragging = True
                 self.last_mouse_pos = event.pos
+                self.press_pos = event.pos
                 
         elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            # Un clic sin apenas movimiento selecciona el cuerpo bajo el ratón
+            if self.dragging and self.press_pos is not None:
+                dx = event.pos[0] - self.press_pos[0]
+                dy = event.pos[1] - self.press_pos[1]
+                if max(abs(dx), abs(dy)) <= self.click_tolerance:
+                    self.select_at(event.pos)
             self.slider_dragging = False
             self.dragging = False
+            self.press_pos = None
             
         elif event.type == pygame.MOUSEMOTION:
             if self.slider_dragging:
@@ -158,13 +210,86 @@ class ControlPanel:
             # Cambiar planeta seleccionado
             if event.key == pygame.K_LEFT:
                 self.selected_planet = (self.selected_planet - 1) % self.solar_system.get_planet_count()
+                self.selected_moon = None
             elif event.key == pygame.K_RIGHT:
                 self.selected_planet = (self.selected_planet + 1) % self.solar_system.get_planet_count()
-            # Agregar/quitar lunas
+                self.selected_moon = None
+            # Agregar/quitar lunas (si hay una luna seleccionada, se quita esa)
             elif event.key == pygame.K_UP:
-                self.solar_system.add_moon(self.selected_planet)
+                planet = self.solar_system.planets[self.selected_planet]
+                if self.max_moons is None or len(planet.moons) < self.max_moons:
+                    self.solar_system.add_moon(self.selected_planet)
             elif event.key == pygame.K_DOWN:
-                self.solar_system.remove_moon(self.selected_planet)
+                self.solar_system.remove_moon(self.selected_planet, self.selected_moon)
+                self.selected_moon = None
+            # Todas las lunas conocidas del planeta real (79 en Júpiter) de una vez, o ninguna
+            elif event.key == pygame.K_m:
+                planet = self.solar_system.planets[self.selected_planet]
+                self.update_moons(planet.name, 0 if len(planet.moons) == planet.known_moons else planet.known_moons)
+            # Saltar en el tiempo (posiciones en forma cerrada, coste constante)
+            elif event.key == pygame.K_PAGEUP:
+                self.solar_system.seek(self.solar_system.elapsed_days + self.jump_years * 365.0)
+            elif event.key == pygame.K_PAGEDOWN:
+                self.solar_system.seek(max(0.0, self.solar_system.elapsed_days - self.jump_years * 365.0))
+            elif event.key == pygame.K_HOME:
+                self.solar_system.jump_to_year(0)
+            # Alternar entre órbitas cinemáticas y gravedad N cuerpos
+            elif event.key == pygame.K_g:
+                self.solar_system.toggle_simulation_mode()
+            # Mostrar u ocultar los cinturones de partículas
+            elif event.key == pygame.K_b:
+                self.solar_system.set_belts_enabled(not self.solar_system.belts_enabled)
+            # Estados guardados
+            elif pygame.K_1 <= event.key <= pygame.K_9:
+                self.checkpoint_slot = event.key - pygame.K_0
+                self.checkpoint_message = ""
+            elif event.key == pygame.K_F5:
+                self.solar_system.save_checkpoint(self.checkpoint_path())
+                self.checkpoint_message = ""
+            elif event.key == pygame.K_F9:
+                self.load_checkpoint()
+
+    def checkpoint_path(self, slot=None):
+        """Archivo de la ranura `slot` (por defecto la elegida)."""
+        slot = self.checkpoint_slot if slot is None else slot
+        return os.path.join(self.checkpoint_directory, f"ranura{slot}.checkpoint")
+
+    def load_checkpoint(self):
+        path = self.checkpoint_path()
+        try:
+            self.solar_system.load_checkpoint(path)
+        except FileNotFoundError:
+            self.checkpoint_message = "vacía"
+        except ValueError as error:
+            print(f"No se pudo cargar {path}: {error}")
+            self.checkpoint_message = "no compatible"
+        else:
+            self.selected_moon = None
+            self.checkpoint_message = "cargada"
+            self.refresh_display()
+
+    def select_at(self, pos):
+        """
+        Selecciona el planeta o la luna que hay bajo `pos`. Un clic en el
+        panel, en otra zona de la interfaz o en el vacío no cambia nada.
+        """
+        if pos[0] < self.panel_width or any(rect.collidepoint(pos) for rect in self.ignore_rects):
+            return
+        body = self.solar_system.pick(*pos)
+        if body is None:
+            return
+        self.selected_planet = self.solar_system.planet_of(body)
+        self.selected_moon = body if body is not self.solar_system.planets[self.selected_planet] else None
+
+    def selected_moon_number(self):
+        """Posición (desde 1) de la luna seleccionada en su planeta, o None."""
+        if self.selected_moon is None:
+            return None
+        planet = self.solar_system.planets[self.selected_planet]
+        if self.selected_moon not in planet.moons:
+            self.selected_moon = None  # La luna ya no existe
+            return None
+        return planet.moons.index(self.selected_moon) + 1
 
     def _update_slider_position(self):
         """
@@ -173,69 +298,89 @@ class ControlPanel:
         ratio = (self.solar_system.time_factor - self.min_time_factor) / (self.max_time_factor - self.min_time_factor)
         self.slider_handle_rect.centerx = self.slider_rect.left + ratio * self.slider_rect.width
 
-    def render(self, screen):
-        # Dibujar panel lateral
-        panel_surface = pygame.Surface((self.panel_width, screen.get_height()), pygame.SRCALPHA)
-        panel_surface.fill(self.panel_color)
-        
-        # Título del panel
-        title = self.title_font.render("CONTROL DE SISTEMA", True, (255, 255, 255))
-        panel_surface.blit(title, (20, 20))
-        
-        # Información de tiempo
-        time_title = self.font.render("TIEMPO TRANSCURRIDO:", True, (200, 200, 255))
-        panel_surface.blit(time_title, (20, 60))
-        
-        years_text = self.font.render(f"Años: {self.elapsed_years:.1f}", True, (255, 255, 255))
-        panel_surface.blit(years_text, (20, 80))
+    def _build_static_layer(self, height):
+        """
+        Dibuja una sola vez el fondo del panel y todas las etiquetas que no
+        cambian (títulos, instrucciones, pista del deslizador).
+        """
+        layer = pygame.Surface((self.panel_width, height), pygame.SRCALPHA)
+        layer.fill(self.panel_color)
         
-        days_text = self.font.render(f"Días: {self.elapsed_days:.1f}", True, (255, 255, 255))
-        panel_surface.blit(days_text, (20, 100))
+        labels = [
+            (self.title_font, "CONTROL DE SISTEMA", (255, 255, 255), (20, 20)),
+            (self.font, "TIEMPO TRANSCURRIDO:", (200, 200, 255), (20, 60)),
+            (self.font, "VELOCIDAD DE SIMULACIÓN:", (200, 200, 255), (20, 160)),
+            (self.font, f"{self.min_time_factor}x", (255, 255, 255),
+             (self.slider_rect.left - 5, self.slider_rect.bottom + 5)),
+            (self.font, f"{self.max_time_factor}x", (255, 255, 255),
+             (self.slider_rect.right - 25, self.slider_rect.bottom + 5)),
+            (self.font, "PLANETA SELECCIONADO:", (200, 200, 255), (20, 260)),
+            (self.font, "CONTROLES:", (200, 200, 255), (20, 340)),
+        ]
+        for i, text in enumerate(self.instructions):
+            labels.append((self.font, text, (220, 220, 220), (20, 360 + i * 20)))
+        for font, text, color, position in labels:
+            layer.blit(font.render(text, True, color), position)
         
-        # Control de velocidad
-        speed_title = self.font.render("VELOCIDAD DE SIMULACIÓN:", True, (200, 200, 255))
-        panel_surface.blit(speed_title, (20, 160))
+        # Pista del deslizador
+        pygame.draw.rect(layer, (100, 100, 100), self.slider_rect)
+        return layer
+
+    def _update_dynamic_fields(self):
+        # Solo se vuelve a renderizar el texto de los campos que cambiaron
+        changed = self.years_text.update(f"Años: {self.elapsed_years:.1f}")
+        changed |= self.days_text.update(f"Días: {self.elapsed_days:.1f}")
+        mode = "gravedad" if self.solar_system.simulation_mode == "gravity" else "órbitas fijas"
+        changed |= self.mode_text.update(f"Modo: {mode}")
+        changed |= self.factor_text.update(f"Factor: x{self.solar_system.time_factor:.2f}")
+        changed |= self.planet_text.update(f"{self.solar_system.get_planet_name(self.selected_planet)}")
+        changed |= self.moons_text.update(f"Lunas: {self.solar_system.get_moon_count(self.selected_planet)}")
+        moon_number = self.selected_moon_number()
+        changed |= self.moon_text.update(f"Luna seleccionada: {moon_number}" if moon_number else "")
+        states = {"saving": "guardando...", "saved": "guardada", "failed": "error al guardar"}
+        status = self.checkpoint_message or states.get(self.solar_system.checkpoint_state(self.checkpoint_path()), "")
+        changed |= self.checkpoint_text.update(f"Ranura {self.checkpoint_slot}: {status}" if status
+                                               else f"Ranura {self.checkpoint_slot}")
+        return changed
+
+    def compose(self, height):
+        """
+        Prepara la superficie del panel. Devuelve True si su contenido cambió
+        desde la última vez (hay que volver a mostrarla).
+        """
+        # Reconstruir la capa estática solo si cambia el alto de la pantalla
+        rebuilt = False
+        if self._static_layer is None or self._static_layer.get_height() != height:
+            self._static_layer = self._build_static_layer(height)
+            self._panel_surface = pygame.Surface(self._static_layer.get_size(), pygame.SRCALPHA)
+            rebuilt = True
         
-        factor_text = self.font.render(f"Factor: x{self.solar_system.time_factor:.2f}", True, (255, 255, 255))
-        panel_surface.blit(factor_text, (20, 180))
+        # Recomponer el panel solo cuando algún campo o el deslizador cambian
+        changed = self._update_dynamic_fields()
+        if not (rebuilt or changed or self._composed_handle != self.slider_handle_rect.topleft):
+            return False
         
-        # Dibujar deslizador
-        pygame.draw.rect(panel_surface, (100, 100, 100), self.slider_rect)
+        panel_surface = self._panel_surface
+        panel_surface.fill((0, 0, 0, 0))
+        panel_surface.blit(self._static_layer, (0, 0))
+        panel_surface.blit(self.years_text.surface, (20, 80))
+        panel_surface.blit(self.days_text.surface, (20, 100))
+        panel_surface.blit(self.mode_text.surface, (20, 120))
+        panel_surface.blit(self.factor_text.surface, (20, 180))
         pygame.draw.rect(panel_surface, (200, 200, 200), self.slider_handle_rect)
-        
-        # Etiquetas min/max
-        min_label = self.font.render(f"{self.min_time_factor}x", True, (255, 255, 255))
-        panel_surface.blit(min_label, (self.slider_rect.left - 5, self.slider_rect.bottom + 5))
-        
-        max_label = self.font.render(f"{self.max_time_factor}x", True, (255, 255, 255))
-        panel_surface.blit(max_label, (self.slider_rect.right - 25, self.slider_rect.bottom + 5))
-        
-        # Mostrar información del planeta seleccionado
-        planet_info_title = self.font.render("PLANETA SELECCIONADO:", True, (200, 200, 255))
-        panel_surface.blit(planet_info_title, (20, 260))
-        
-        planet_name = self.solar_system.get_planet_name(self.selected_planet)
-        planet_text = self.font.render(f"{planet_name}", True, (255, 255, 255))
-        panel_surface.blit(planet_text, (20, 280))
-        
-        moons_text = self.font.render(f"Lunas: {self.solar_system.get_moon_count(self.selected_planet)}", True, (255, 255, 255))
-        panel_surface.blit(moons_text, (20, 300))
-        
-        # Instrucciones de control
-        instructions_title = self.font.render("CONTROLES:", True, (200, 200, 255))
-        panel_surface.blit(instructions_title, (20, 340))
-        
-        instructions = [
-            "← / →: Cambiar planeta",
-            "↑: Agregar luna",
-            "↓: Quitar luna",
-            "Arrastrar: Rotar vista",
-            "Z/X: Acercar/Alejar"
-        ]
-        
-        for i, text in enumerate(instructions):
-            instr_text = self.font.render(text, True, (220, 220, 220))
-            panel_surface.blit(instr_text, (20, 360 + i * 20))
-        
+        panel_surface.blit(self.planet_text.surface, (20, 280))
+        panel_surface.blit(self.moons_text.surface, (20, 300))
+        panel_surface.blit(self.moon_text.surface, (20, 320))
+        panel_surface.blit(self.checkpoint_text.surface, (20, 370 + len(self.instructions) * 20))
+        self._composed_handle = self.slider_handle_rect.topleft
+        return True
+
+    def render(self, screen):
         # Mostrar el panel en la pantalla
-        screen.blit(panel_surface, (0, 0))
\ No newline at end of file
+        self.compose(screen.get_height())
+        screen.blit(self._panel_surface, (0, 0))
+
+    def render_overlay(self, overlay):
+        """Actualiza el panel en la capa de textura solo cuando cambia."""
+        if self.compose(overlay.size[1]) or overlay.is_new("control_panel"):
+            overlay.put("control_panel", self._panel_surface, (0, 0), layer=1)
@@ -0,0 +1,43 @@
+import pygame
+
+_fonts = {}
+
+
+def get_font(name, size, bold=False):
+    """
+    Devuelve una fuente del sistema cargada una sola vez.
+    pygame.font.SysFont busca y abre el archivo en cada llamada, así que
+    nunca debe llamarse dentro del bucle de dibujado.
+    """
+    key = (name, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.SysFont(name, size, bold=bold)
+        _fonts[key] = font
+    return font
+
+
+class CachedText:
+    """
+    Texto de la interfaz que solo se vuelve a renderizar cuando cambia.
+
+    Args:
+        font: Fuente de pygame
+        color: Color RGB del texto
+        text: Texto inicial (opcional)
+    """
+    def __init__(self, font, color, text=None):
+        self.font = font
+        self.color = color
+        self.text = None
+        self.surface = None
+        if text is not None:
+            self.update(text)
+
+    def update(self, text):
+        """Actualiza el contenido. Devuelve True si hubo que renderizar."""
+        if text == self.text:
+            return False
+        self.text = text
+        self.surface = self.font.render(text, True, self.color)
+        return True
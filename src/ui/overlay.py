@@ -0,0 +1,121 @@
+import pygame
+from OpenGL.GL import *
+
+
+class GLOverlay:
+    """
+    Capa 2D de la interfaz compuesta como una textura OpenGL.
+
+    Los widgets entregan su imagen (pygame, con transparencia) solo cuando
+    cambian y la capa recompone el rectángulo afectado. En cada fotograma únicamente se
+    suben a la textura los rectángulos sucios y la capa se dibuja como un
+    solo quad en pantalla, en lugar de hacer blit sobre la superficie de
+    pygame dentro de un fotograma OpenGL.
+
+    Args:
+        size: Tamaño (ancho, alto) de la pantalla en píxeles
+    """
+    def __init__(self, size):
+        self.texture = None
+        self.surface = None
+        self.resize(size)
+
+    def resize(self, size):
+        """Recrea la capa para un nuevo tamaño; todo queda por redibujar."""
+        self.size = tuple(size)
+        self.surface = pygame.Surface(self.size, pygame.SRCALPHA)
+        self.surface.fill((0, 0, 0, 0))
+        self._placed = {}
+        self._dirty = []
+        self._allocated = False
+
+    def mark_dirty(self, rect):
+        rect = pygame.Rect(rect).clip(self.surface.get_rect())
+        if rect.width and rect.height:
+            self._dirty.append(rect)
+
+    def is_new(self, key):
+        """True si `key` aún no se ha colocado (p. ej. tras cambiar de tamaño)."""
+        return key not in self._placed
+
+    def put(self, key, surface, position, layer=0):
+        """
+        Coloca `surface` sustituyendo lo que se colocó antes con la misma
+        clave y recompone solo la región afectada respetando el orden de
+        capas (las de `layer` mayor quedan encima). Debe llamarse solo cuando
+        el contenido cambia.
+        """
+        rect = surface.get_rect(topleft=position)
+        previous = self._placed.get(key)
+        self._placed[key] = (layer, surface, rect)
+        self._repaint(rect if previous is None else rect.union(previous[2]))
+
+    def remove(self, key):
+        """Quita lo colocado con `key` (si existe) y recompone su región."""
+        placed = self._placed.pop(key, None)
+        if placed is not None:
+            self._repaint(placed[2])
+
+    def _repaint(self, region):
+        region = region.clip(self.surface.get_rect())
+        self.surface.fill((0, 0, 0, 0), region)
+        for layer, surface, rect in sorted(self._placed.values(), key=lambda item: item[0]):
+            overlap = rect.clip(region)
+            if overlap.width and overlap.height:
+                area = overlap.move(-rect.x, -rect.y)
+                self.surface.blit(surface, overlap, area)
+        self.mark_dirty(region)
+
+    def upload(self):
+        """Sube a la textura solo las regiones modificadas desde el último fotograma."""
+        if self.texture is None:
+            self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+
+        if not self._allocated:
+            # Primera subida (o tras cambiar de tamaño): textura completa
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, self.size[0], self.size[1], 0,
+                         GL_RGBA, GL_UNSIGNED_BYTE, pygame.image.tobytes(self.surface, "RGBA"))
+            self._allocated = True
+        else:
+            for rect in self._dirty:
+                pixels = pygame.image.tobytes(self.surface.subsurface(rect), "RGBA")
+                glTexSubImage2D(GL_TEXTURE_2D, 0, rect.x, rect.y, rect.width, rect.height,
+                                GL_RGBA, GL_UNSIGNED_BYTE, pixels)
+        self._dirty.clear()
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def draw(self):
+        """
+        Dibuja la capa como un quad de pantalla completa. Espera una
+        proyección ortográfica con el origen arriba a la izquierda.
+        """
+        width, height = self.size
+        glPushAttrib(GL_ENABLE_BIT | GL_CURRENT_BIT)
+        glDisable(GL_LIGHTING)
+        glDisable(GL_DEPTH_TEST)
+        glEnable(GL_TEXTURE_2D)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glColor4f(1.0, 1.0, 1.0, 1.0)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+
+        # La fila 0 de la textura es la parte superior de la pantalla
+        glBegin(GL_QUADS)
+        glTexCoord2f(0, 0); glVertex2f(0, 0)
+        glTexCoord2f(1, 0); glVertex2f(width, 0)
+        glTexCoord2f(1, 1); glVertex2f(width, height)
+        glTexCoord2f(0, 1); glVertex2f(0, height)
+        glEnd()
+
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glPopAttrib()
+
+    def release(self):
+        if self.texture is not None:
+            glDeleteTextures([self.texture])
+            self.texture = None
+            self._allocated = False
@@ -0,0 +1,105 @@
+import pygame
+from ui.hud import get_font
+
+PHASE_COLORS = [(80, 160, 255), (255, 170, 60), (120, 220, 120), (240, 90, 90),
+                (200, 120, 255), (240, 230, 90), (90, 220, 220), (200, 200, 200)]
+
+
+class ProfilerGraph:
+    """
+    Gráfica de tiempos por fotograma para la capa de interfaz.
+
+    Las fases principales (sin punto en el nombre) se apilan en una barra
+    por fotograma, con una línea de referencia en el presupuesto por
+    fotograma (16,7 ms a 60 FPS). Debajo se listan todas las fases con sus
+    percentiles 50/95/99. La imagen se recompone cada `refresh_frames`
+    fotogramas, no en todos.
+
+    Args:
+        profiler: FrameProfiler del que se leen los datos
+        width: Ancho de la zona de barras (un píxel por fotograma)
+        height: Alto de la zona de barras en píxeles
+        budget_ms: Presupuesto por fotograma en milisegundos (1000 / frame_rate)
+        scale_ms: Milisegundos que ocupan todo el alto (por defecto, el doble del presupuesto)
+        refresh_frames: Fotogramas entre recomposiciones de la imagen
+    """
+    def __init__(self, profiler, width=300, height=100, budget_ms=1000.0 / 60.0, scale_ms=None,
+                 refresh_frames=15):
+        self.profiler = profiler
+        self.width = width
+        self.height = height
+        self.budget_ms = budget_ms
+        self.scale_ms = scale_ms if scale_ms is not None else 2.0 * budget_ms
+        self.refresh_frames = refresh_frames
+        self.font = get_font('Courier New,DejaVu Sans Mono,Liberation Mono', 12)  # Monoespaciada para alinear columnas
+        self.visible = False
+        self.always_record = profiler.enabled  # Grabando desde el inicio (p. ej. --profile)
+        self.surface = None
+        self._drawn_at = None
+
+    def toggle(self):
+        """Muestra u oculta la gráfica; mientras se ve, el perfilador graba (desde el próximo fotograma)."""
+        self.visible = not self.visible
+        self.profiler.set_enabled(self.visible or self.always_record)
+        self._drawn_at = None
+
+    def render_overlay(self, overlay):
+        if not self.visible:
+            if not overlay.is_new("profiler"):
+                overlay.remove("profiler")
+            return
+        frames = self.profiler.frames
+        if (self._drawn_at is not None and frames - self._drawn_at < self.refresh_frames
+                and not overlay.is_new("profiler")):
+            return
+        self._drawn_at = frames
+        self._compose()
+        position = (overlay.size[0] - self.surface.get_width() - 10,
+                    overlay.size[1] - self.surface.get_height() - 10)
+        overlay.put("profiler", self.surface, position, layer=2)
+
+    def _compose(self):
+        phases = self.profiler.phases
+        history = self.profiler.history()[-self.width:]
+        percentiles = self.profiler.percentiles()
+        line_height = self.font.get_linesize()
+        size = (self.width + 20, self.height + 20 + line_height * (len(phases) + 1))
+        if self.surface is None or self.surface.get_size() != size:
+            self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.surface.fill((20, 20, 30, 200))
+
+        # Barras apiladas de las fases principales, de abajo a arriba
+        top = 10
+        pixels_per_ms = self.height / self.scale_ms
+        main = [column for column, name in enumerate(phases) if "." not in name]
+        offset = self.width - len(history)
+        for x, row in enumerate(history):
+            base = top + self.height
+            for order, column in enumerate(main):
+                bar = int(round(row[column] * pixels_per_ms))
+                if bar <= 0:
+                    continue
+                bar = min(bar, base - top)
+                color = PHASE_COLORS[order % len(PHASE_COLORS)]
+                pygame.draw.line(self.surface, color, (10 + offset + x, base - 1), (10 + offset + x, base - bar))
+                base -= bar
+                if base <= top:
+                    break
+        budget = top + self.height - int(round(self.budget_ms * pixels_per_ms))
+        pygame.draw.line(self.surface, (255, 255, 255, 120), (10, budget), (10 + self.width, budget))
+
+        # Percentiles por fase; las subfases van sangradas y en gris
+        y = top + self.height + 6
+        header = self.font.render(f"{'fase (ms)':<14}{'p50':>7} {'p95':>7} {'p99':>7}", True, (255, 255, 255))
+        self.surface.blit(header, (10, y))
+        order = 0
+        for name in phases:
+            y += line_height
+            values = percentiles.get(name, {})
+            if "." in name:
+                color, label = (170, 170, 170), "  " + name.split(".", 1)[1]
+            else:
+                color, label = PHASE_COLORS[order % len(PHASE_COLORS)], name
+                order += 1
+            text = f"{label:<14}{values.get('p50', 0.0):7.2f} {values.get('p95', 0.0):7.2f} {values.get('p99', 0.0):7.2f}"
+            self.surface.blit(self.font.render(text, True, color), (10, y))
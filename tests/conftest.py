@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos se importan como en src/main.py (from models.x import ...)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
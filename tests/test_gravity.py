@@ -0,0 +1,43 @@
+import numpy as np
+
+from models.solar_system import SolarSystem
+
+DAYS = 365
+MOONS = 8
+
+
+def run_gravity(days=DAYS, moons=MOONS):
+    system = SolarSystem()
+    for index in range(len(system.planets)):
+        system.set_number_of_moons(index, moons)
+    system.set_simulation_mode("gravity")
+    for _ in range(days):
+        system.step(1.0)
+    return system
+
+
+def test_moons_stay_near_their_semi_major_axis():
+    system = run_gravity()
+    try:
+        engine = system.engine
+        n = engine.count
+        parent = engine.parent[:n]
+        moons = parent >= 0
+        distance = np.linalg.norm(engine.position[:n][moons] - engine.position[parent[moons]], axis=1)
+        ratio = distance / engine.distance[:n][moons]
+        assert moons.sum() == MOONS * len(system.planets)
+        assert ratio.min() > 0.9 and ratio.max() < 1.1
+    finally:
+        system.cleanup()
+
+
+def test_planets_follow_their_kinematic_orbits():
+    system = run_gravity()
+    try:
+        engine = system.engine
+        rows = [planet.engine_index for planet in system.planets]
+        reference = engine.evaluate(engine.time)[rows]
+        offset = np.linalg.norm(engine.position[rows] - reference, axis=1)
+        assert (offset < 0.05 * engine.distance[rows]).all()
+    finally:
+        system.cleanup()
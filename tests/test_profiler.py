@@ -0,0 +1,30 @@
+from diagnostics.profiler import FrameProfiler
+
+
+def test_enabling_mid_frame_waits_for_the_next_frame():
+    profiler = FrameProfiler(capacity=4)
+    profiler.begin_frame()
+    profiler.set_enabled(True)
+    with profiler.section("render"):  # Resto del fotograma en el que se enciende
+        pass
+    assert profiler.frames == 0 and profiler.phases == []
+
+    profiler.begin_frame()
+    with profiler.section("render"):
+        pass
+    history = profiler.history()
+    assert profiler.frames == 1 and history.shape == (1, 1)
+
+
+def test_disabling_mid_frame_keeps_the_frame_complete():
+    profiler = FrameProfiler(capacity=4, enabled=True)
+    profiler.begin_frame()
+    profiler.set_enabled(False)
+    with profiler.section("render"):
+        pass
+    assert profiler.frames == 1 and profiler.history()[0, 0] > 0.0
+
+    profiler.begin_frame()
+    with profiler.section("render"):
+        pass
+    assert profiler.frames == 1 and not profiler.enabled
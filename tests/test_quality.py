@@ -0,0 +1,38 @@
+from animation.quality import QualityGovernor, WINDOW_FRAMES
+
+FRAME_RATE = 60
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def run_frames(governor, clock, work, swap, windows=4):
+    """Fotogramas con `work` segundos de trabajo y `swap` de espera en flip."""
+    for _ in range(windows * WINDOW_FRAMES):
+        governor.begin_frame()
+        clock.now += work
+        governor.end_work()
+        clock.now += swap  # pygame.display.flip() con sincronía vertical
+        governor.end_frame()
+
+
+def test_swap_wait_does_not_downgrade():
+    clock = FakeClock()
+    governor = QualityGovernor(FRAME_RATE, "alta", clock=clock)
+    budget = 1.0 / FRAME_RATE
+    run_frames(governor, clock, work=0.3 * budget, swap=0.7 * budget)
+    assert governor.tier["name"] in ("alta", "ultra")
+    assert governor.load < 0.5
+
+
+def test_slow_work_downgrades():
+    clock = FakeClock()
+    governor = QualityGovernor(FRAME_RATE, "alta", clock=clock)
+    budget = 1.0 / FRAME_RATE
+    run_frames(governor, clock, work=0.95 * budget, swap=0.05 * budget, windows=1)
+    assert governor.tier["name"] == "media"